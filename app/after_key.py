@@ -2,16 +2,23 @@
 
 Algorithm:
 1. Walk the filtered English rows in order.
-2. For each new Test ID (not in existing Japanese Test IDs),
-   look backwards for the nearest Test ID that is either:
+2. For each new Test ID (not in existing Japanese Test IDs), the after_key is
+   the nearest preceding Test ID that is either:
    - already existing in the Japanese sheet, OR
    - already queued as an insert
 3. Use that Test ID as the after_key.
 4. If none found, raise an error (strict) or append to end with warning (lenient).
+
+Every preceding ID is existing or already queued, so the nearest known ID is
+simply the previous one in English order: a single forward pass, linear in
+the number of rows. The pass resolves any number of target masters at once,
+each with its own existing-ID set.
 """
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+
 
 def determine_after_keys(
     english_order: list[str],
@@ -30,28 +37,43 @@ def determine_after_keys(
         Dict mapping each NEW Test ID to the Test ID it should be inserted after.
         If after_key cannot be determined in lenient mode, value is None (append to end).
     """
-    result: dict[str, str | None] = {}
-    # Track which IDs are "known" (existing + already scheduled inserts)
-    known_ids: set[str] = set(existing_ids)
-
-    for i, test_id in enumerate(english_order):
-        if test_id in existing_ids:
-            # This is an update, not an insert
-            continue
-        # Look backwards for the nearest known ID
-        after_key: str | None = None
-        for j in range(i - 1, -1, -1):
-            prev_id = english_order[j]
-            if prev_id in known_ids:
-                after_key = prev_id
-                break
-        if after_key is None and strict:
-            raise ValueError(
-                f"Cannot determine after_key for Test ID '{test_id}': "
-                "no preceding known Test ID found."
-            )
-        result[test_id] = after_key
-        # This ID is now "known" for subsequent inserts
-        known_ids.add(test_id)
+    return determine_after_keys_multi(
+        english_order, {"": existing_ids}, strict=strict
+    )[""]
+
+
+def determine_after_keys_multi(
+    english_order: list[str],
+    existing_by_master: Mapping[str, set[str]],
+    *,
+    strict: bool = False,
+) -> dict[str, dict[str, str | None]]:
+    """determine_after_keys for several masters in one pass.
+
+    Args:
+        english_order: Ordered list of Test IDs from the filtered English sheet.
+        existing_by_master: Existing Test IDs of each target master, by name.
+        strict: If True, raise ValueError when no after_key can be determined.
+
+    Returns:
+        For each master name, its new_test_id → after_key mapping.
+    """
+    result: dict[str, dict[str, str | None]] = {name: {} for name in existing_by_master}
+    masters = [(existing, result[name]) for name, existing in existing_by_master.items()]
+    # Nearest known ID so far (existing in, or queued for, every master)
+    previous: str | None = None
+
+    for test_id in english_order:
+        for existing, after_keys in masters:
+            if test_id in existing:
+                # This is an update, not an insert
+                continue
+            if previous is None and strict:
+                raise ValueError(
+                    f"Cannot determine after_key for Test ID '{test_id}': "
+                    "no preceding known Test ID found."
+                )
+            after_keys[test_id] = previous
+        previous = test_id
 
     return result
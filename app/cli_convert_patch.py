@@ -0,0 +1,40 @@
+"""CLI: Convert a patch file between YAML and JSON Lines.
+
+The format of each side is taken from its extension (.jsonl = JSON Lines,
+.yml/.yaml = YAML).
+
+Usage:
+    python -m app.cli_convert_patch out/patch.jsonl out/patch.yml
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from app.patch_io import patch_format, read_patch, write_patch
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Convert a patch file between YAML and JSON Lines"
+    )
+    parser.add_argument("source", help="Input patch (.yml/.yaml or .jsonl)")
+    parser.add_argument("dest", help="Output patch (.yml/.yaml or .jsonl)")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    patch = read_patch(args.source)
+    write_patch(patch, args.dest)
+    print(
+        f"Converted {len(patch.operations)} operations: "
+        f"{args.source} ({patch_format(args.source)}) -> "
+        f"{args.dest} ({patch_format(args.dest)})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -11,17 +11,29 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import hashlib
 import sys
 from pathlib import Path
 
 from app.after_key import determine_after_keys
 from app.diff_report import generate_generator_report
-from app.excel_read import read_shikenkomoku_test_ids, read_test_items
-from app.filter_rules import is_target_row
+from app.excel_read import READERS, read_shikenkomoku_test_ids, read_test_items_table
+from app.filter_rules import RowFilter, legacy_filter, load_filter
+from app.gen_manifest import (
+    STATUSES,
+    GenerationManifest,
+    commit_pending,
+    pending_path,
+    source_hash,
+)
+from app.http_translator import HttpTranslator, TranslationError
 from app.normalizer import normalize_cell_text
 from app.patch_io import write_patch
 from app.patch_model import InsertOperation, PatchFile, UpdateOperation
-from app.translator import RuleBasedTranslator
+from app.profiling import Profiler, count, stage
+from app.read_cache import ReadCache
+from app.translation_memory import TranslationMemory
+from app.translator import MemoryTranslator, RuleBasedTranslator, Translator
 
 
 # Column mapping: English (Test Items) → Japanese (試験項目)
@@ -35,6 +47,12 @@ _COLUMN_MAP = {
 _PASSTHROUGH_COLUMNS = ["Test ID", "Section", "Sub-section", "Test Title"]
 
 
+def _translator_version(translator: Translator) -> str:
+    """Manifest key for everything besides the source text that shapes a row."""
+    config = repr((translator.fingerprint, _COLUMN_MAP, _PASSTHROUGH_COLUMNS))
+    return hashlib.blake2b(config.encode("utf-8"), digest_size=16).hexdigest()
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Generate patch.yml from English Excel Test Items"
@@ -63,6 +81,89 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--team-value", default="QC(Verification)", help="Team column filter value"
     )
+    filter_group = parser.add_mutually_exclusive_group()
+    filter_group.add_argument(
+        "--filter", default=None,
+        help='Row filter expression, e.g. \'tag "#MR" and team in ("QC(Verification)")\' '
+             "(replaces --target-tag/--exclude-tag/--team-value)"
+    )
+    filter_group.add_argument(
+        "--filter-file", default=None,
+        help="YAML file with a 'filter:' expression"
+    )
+    parser.add_argument(
+        "--end-empty-rows", type=int, default=None,
+        help="Consecutive empty Test ID rows to detect data end (default: read all rows)"
+    )
+    parser.add_argument(
+        "--reader", choices=READERS, default="openpyxl",
+        help="Excel read backend (fast = direct XML parsing)"
+    )
+    parser.add_argument(
+        "--cache-dir", default=".cache/excel_read",
+        help="Directory for cached workbook reads"
+    )
+    parser.add_argument(
+        "--cache-max-mb", type=int, default=64,
+        help="Size limit of the read cache in MB (oldest entries evicted first)"
+    )
+    parser.add_argument(
+        "--rules", default="config/rules.yml",
+        help="Pattern rules YAML path (built-in rules if the file does not exist)"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None,
+        help="Worker processes for rule-based translation (default 1; output is identical to --jobs 1)"
+    )
+    parser.add_argument(
+        "--translator-url", default=None,
+        help="Translate with a remote HTTP translation service instead of the rules and glossary"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=32,
+        help="Texts per request to the translation service"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4,
+        help="Requests to the translation service in flight at once"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=3,
+        help="Retries per failed translation request (exponential backoff)"
+    )
+    parser.add_argument(
+        "--memo-size", type=int, default=None,
+        help="Translated lines kept in the rule-based translator's LRU memo (default 4096; 0 disables it)"
+    )
+    parser.add_argument(
+        "--memory", default=None,
+        help="SQLite translation memory shared across runs (recalled lines are not re-translated)"
+    )
+    parser.add_argument(
+        "--glossary-cache-dir", default=".cache/glossary",
+        help="Directory for the compiled glossary, keyed by the glossary's hash"
+    )
+    parser.add_argument(
+        "--manifest", default=None,
+        help="Generation manifest path; emit a delta patch of new/changed rows only"
+    )
+    parser.add_argument(
+        "--commit-manifest", action="store_true",
+        help="The patch of the previous --manifest run has been applied: "
+             "make its pending manifest current before this run"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Always re-read the workbooks and recompile the glossary; do not use or update the caches"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Print wall time, CPU time and peak memory per stage, and cell counters"
+    )
+    parser.add_argument(
+        "--metrics-out", default=None,
+        help="Write the per-stage measurements and counters as JSON"
+    )
     return parser
 
 
@@ -70,39 +171,114 @@ def main(argv: list[str] | None = None) -> None:
     parser = build_parser()
     args = parser.parse_args(argv)
 
-    # Initialize translator
-    glossary_path = Path(args.glossary)
-    translator = RuleBasedTranslator(
-        glossary_path if glossary_path.exists() else None
+    if not (args.profile or args.metrics_out):
+        _generate(parser, args)
+        return
+    # Failed runs are profiled too, up to the failure
+    profiler = Profiler()
+    try:
+        with profiler:
+            _generate(parser, args)
+    finally:
+        if args.profile:
+            print(profiler.table())
+        if args.metrics_out:
+            profiler.write_json(args.metrics_out, command="generate")
+            print(f"Metrics written: {args.metrics_out}")
+
+
+def _generate(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if args.commit_manifest and not args.manifest:
+        parser.error("--commit-manifest requires --manifest")
+
+    # Initialize translator (engine), behind the translation memory if any
+    engine: RuleBasedTranslator | HttpTranslator
+    if args.translator_url:
+        ignored = [
+            flag for flag, value in (("--jobs", args.jobs), ("--memo-size", args.memo_size))
+            if value is not None
+        ]
+        if ignored:
+            parser.error(
+                f"{'/'.join(ignored)}: only for rule-based translation, not --translator-url"
+            )
+        engine = HttpTranslator(
+            args.translator_url,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            retries=args.retries,
+        )
+    else:
+        glossary_path = Path(args.glossary)
+        engine = RuleBasedTranslator(
+            glossary_path if glossary_path.exists() else None,
+            glossary_cache_dir=None if args.no_cache else args.glossary_cache_dir,
+            rules_path=args.rules,
+            memo_size=4096 if args.memo_size is None else args.memo_size,
+            jobs=args.jobs or 1,
+        )
+    try:
+        memory = TranslationMemory(args.memory) if args.memory else None
+    except ValueError as e:
+        parser.error(str(e))
+    translator: Translator = (
+        MemoryTranslator(engine, memory) if memory is not None else engine
     )
 
+    # Compile the row filter (before reading anything, so syntax errors fail fast)
+    try:
+        if args.filter:
+            filter_source = args.filter
+        elif args.filter_file:
+            filter_source = load_filter(args.filter_file)
+        else:
+            filter_source = legacy_filter(
+                target_tag=args.target_tag,
+                exclude_tag=args.exclude_tag,
+                team_value=args.team_value,
+            )
+        row_filter = RowFilter(filter_source)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    cache = None
+    if not args.no_cache:
+        cache = ReadCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+
     # 1. Read English Test Items
     print(f"Reading English Excel: {args.english_xlsx}")
-    all_rows, _ = read_test_items(args.english_xlsx)
-    total_rows = len(all_rows)
+    with stage("load"):
+        table, _ = read_test_items_table(
+            args.english_xlsx,
+            end_empty_rows=args.end_empty_rows,
+            reader=args.reader,
+            cache=cache,
+        )
+    total_rows = len(table)
+    count("rows_read", total_rows)
     print(f"  Total rows: {total_rows}")
 
     # 2. Apply filters
-    filtered_rows = [
-        row for row in all_rows
-        if is_target_row(
-            row.get("Remark", ""),
-            row.get("チーム分担", ""),
-            target_tag=args.target_tag,
-            exclude_tag=args.exclude_tag,
-            team_value=args.team_value,
-        )
-    ]
-    print(f"  After filter: {len(filtered_rows)}")
+    with stage("filter"):
+        filtered = table.compress(row_filter.mask(table))
+    count("rows_filtered", len(filtered))
+    print(f"  After filter: {len(filtered)}")
 
     # 3. Read existing Japanese Test IDs
     print(f"Reading Japanese Excel: {args.base_xlsx}")
-    existing_ids = set(read_shikenkomoku_test_ids(args.base_xlsx))
+    with stage("load"):
+        existing_ids = set(read_shikenkomoku_test_ids(
+            args.base_xlsx,
+            end_empty_rows=args.end_empty_rows,
+            reader=args.reader,
+            cache=cache,
+        ))
     print(f"  Existing Test IDs: {len(existing_ids)}")
 
     # 4. Determine update/insert and after_keys
-    english_order = [row["Test ID"] for row in filtered_rows]
-    after_key_map = determine_after_keys(english_order, existing_ids)
+    english_order = filtered.column("Test ID")
+    with stage("after_key"):
+        after_key_map = determine_after_keys(english_order, existing_ids)
 
     # 5. Build patch operations
     warnings: list[str] = []
@@ -110,20 +286,68 @@ def main(argv: list[str] | None = None) -> None:
     update_count = 0
     insert_count = 0
 
-    for row in filtered_rows:
-        test_id = row["Test ID"]
+    manifest = None
+    if args.commit_manifest:
+        if commit_pending(args.manifest):
+            print(f"Manifest committed: {args.manifest}")
+        else:
+            print(f"  No pending manifest to commit for {args.manifest}")
+    if args.manifest:
+        manifest = GenerationManifest(args.manifest, _translator_version(translator))
+        if manifest.translator_changed:
+            print("  Translator rules changed since the manifest; re-translating all rows")
+    statuses: dict[str, list[str]] = {status: [] for status in STATUSES}
+    source_columns = [*_COLUMN_MAP, *_PASSTHROUGH_COLUMNS]
 
-        # Build translated values
-        translated: dict[str, str] = {}
-        for eng_col, jpn_col in _COLUMN_MAP.items():
-            raw = row.get(eng_col, "")
-            translated[jpn_col] = translator.translate(raw)
+    # (row position, translated values or None while still to translate, source hash)
+    emitted: list[tuple[int, dict[str, str] | None, str | None]] = []
+    for i, test_id in enumerate(english_order):
+        if manifest is None:
+            emitted.append((i, None, None))
+            continue
+        source = source_hash(filtered.row(i), source_columns)
+        status = manifest.classify(test_id, source)
+        statuses[status].append(test_id)
+        if status != "unchanged":
+            emitted.append((i, None, source))
+            continue
+        translated = manifest.output(test_id)
+        manifest.record(test_id, source, translated)
+        if test_id not in existing_ids:
+            # Insert not applied to the master yet: re-emit from the manifest
+            emitted.append((i, translated, source))
+
+    # Translate all pending cells in one batch (each distinct text once)
+    pending = [n for n, (_, translated, _) in enumerate(emitted) if translated is None]
+    source_texts = [filtered.column(eng_col) for eng_col in _COLUMN_MAP]
+    count("cells_translated", len(pending) * len(source_texts))
+    try:
+        with stage("translate"):
+            texts = translator.translate_batch([
+                values[emitted[n][0]] for n in pending for values in source_texts
+            ])
+    except TranslationError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    width = len(_COLUMN_MAP)
+    for k, n in enumerate(pending):
+        i, _, source = emitted[n]
+        translated = dict(zip(_COLUMN_MAP.values(), texts[k * width:(k + 1) * width]))
+        emitted[n] = (i, translated, source)
+        if manifest is not None:
+            manifest.record(english_order[i], source, translated)
+
+    passthrough_columns = [
+        (col, filtered.column(col)) for col in _PASSTHROUGH_COLUMNS if col in filtered.names
+    ]
+    for i, translated, _ in emitted:
+        test_id = english_order[i]
 
         # Passthrough columns
         passthrough: dict[str, str] = {}
-        for col in _PASSTHROUGH_COLUMNS:
-            if col in row and row[col]:
-                passthrough[col] = row[col]
+        for col, values in passthrough_columns:
+            if values[i]:
+                passthrough[col] = values[i]
 
         if test_id in existing_ids:
             # Update operation
@@ -148,22 +372,55 @@ def main(argv: list[str] | None = None) -> None:
             operations.append(op)
             insert_count += 1
 
+    if manifest is not None:
+        statuses["vanished"] = manifest.vanished()
+        print("  " + ", ".join(f"{k.capitalize()}: {len(v)}" for k, v in statuses.items()))
+
     # 6. Write patch.yml
     patch = PatchFile(operations=operations)
-    write_patch(patch, args.out_patch)
+    with stage("save"):
+        write_patch(patch, args.out_patch)
+    count("operations", len(operations))
     print(f"Patch written: {args.out_patch}")
     print(f"  Updates: {update_count}, Inserts: {insert_count}")
+    rule_based = isinstance(engine, RuleBasedTranslator)
+    if rule_based:
+        hits, misses = engine.memo_info()
+        print(f"  Translation memo: {hits} hits, {misses} misses")
+    else:
+        print(f"  Translation requests: {engine.requests} ({engine.retried} retried)")
+    memory_stats = None
+    if memory is not None:
+        memory_stats = (memory.recalled, memory.pinned, memory.stored)
+        memory.close()
+        print(
+            f"  Translation memory: {memory.recalled} recalled "
+            f"({memory.pinned} pinned), {memory.stored} stored"
+        )
+    if manifest is not None:
+        # Only after the patch is on disk, so a failed run is retried in full;
+        # pending until --commit-manifest, so a regenerated patch keeps its rows
+        with stage("save"):
+            manifest.save()
+        print(f"Pending manifest written: {pending_path(args.manifest)}")
 
     # 7. Write report
-    generate_generator_report(
-        total_rows=total_rows,
-        filtered_rows=len(filtered_rows),
-        update_count=update_count,
-        insert_count=insert_count,
-        after_key_map=after_key_map,
-        warnings=warnings,
-        output_path=args.out_report,
-    )
+    with stage("report"):
+        generate_generator_report(
+            total_rows=total_rows,
+            filtered_rows=len(filtered),
+            update_count=update_count,
+            insert_count=insert_count,
+            after_key_map=after_key_map,
+            warnings=warnings,
+            output_path=args.out_report,
+            row_statuses=statuses if manifest is not None else None,
+            rule_hits=engine.rules.hits if rule_based else None,
+            rule_lines=engine.rules.lines if rule_based else 0,
+            memo_stats=engine.memo_info() if rule_based else None,
+            memory_stats=memory_stats,
+            request_stats=None if rule_based else (engine.requests, engine.retried),
+        )
     print(f"Report written: {args.out_report}")
 
 
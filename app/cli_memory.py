@@ -0,0 +1,85 @@
+"""CLI: Manage the SQLite translation memory.
+
+Usage:
+    python -m app.cli_memory --memory config/memory.sqlite pin \
+        "Reboot the device." "端末を再起動する。"
+    python -m app.cli_memory --memory config/memory.sqlite unpin "Reboot the device."
+    python -m app.cli_memory --memory config/memory.sqlite pins
+    python -m app.cli_memory --memory config/memory.sqlite prune
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.http_translator import HttpTranslator
+from app.translation_memory import TranslationMemory
+from app.translator import RuleBasedTranslator
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Pin reviewed translations and maintain the translation memory"
+    )
+    parser.add_argument(
+        "--memory", required=True, help="SQLite translation memory path"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pin = commands.add_parser("pin", help="Pin a hand-corrected translation for a line")
+    pin.add_argument("source", help="English source line, without its bullet or number marker")
+    pin.add_argument("target", help="Japanese translation to use for it")
+
+    unpin = commands.add_parser("unpin", help="Remove a pinned translation")
+    unpin.add_argument("source", help="English source line")
+
+    commands.add_parser("pins", help="List pinned translations")
+
+    prune = commands.add_parser(
+        "prune", help="Drop entries computed by other rules/glossary versions"
+    )
+    prune.add_argument(
+        "--glossary", default="config/glossary.yml", help="Glossary YAML path"
+    )
+    prune.add_argument(
+        "--rules", default="config/rules.yml", help="Pattern rules YAML path"
+    )
+    prune.add_argument(
+        "--translator-url", default=None,
+        help="Keep the entries of this translation service instead of the rules/glossary"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        memory = TranslationMemory(args.memory)
+    except ValueError as e:
+        parser.error(str(e))
+    with memory:
+        if args.command == "pin":
+            memory.pin(args.source, args.target)
+            print(f"Pinned: {args.source}")
+        elif args.command == "unpin":
+            if not memory.unpin(args.source):
+                print(f"Not pinned: {args.source}")
+                sys.exit(1)
+            print(f"Unpinned: {args.source}")
+        elif args.command == "pins":
+            for source, target in memory.pins().items():
+                print(f"{source}\t{target}")
+        elif args.command == "prune":
+            if args.translator_url:
+                version = HttpTranslator(args.translator_url).fingerprint
+            else:
+                version = RuleBasedTranslator(args.glossary, rules_path=args.rules).fingerprint
+            removed = memory.prune(version)
+            print(f"Removed {removed} entries of other translator versions")
+
+
+if __name__ == "__main__":
+    main()
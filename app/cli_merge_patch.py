@@ -0,0 +1,55 @@
+"""CLI: Merge several patch files (in application order) into one.
+
+Usage:
+    python -m app.cli_merge_patch \
+        out/patch_week1.yml out/patch_week2.yml out/patch_week3.jsonl \
+        --out out/patch_merged.yml
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from app.patch_io import read_patch, write_patch
+from app.patch_merge import merge_patches
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Merge patch files into one patch equivalent to applying them in order"
+    )
+    parser.add_argument(
+        "patches", nargs="+", help="Patch files (.yml/.yaml or .jsonl), oldest first"
+    )
+    parser.add_argument(
+        "--out", required=True, help="Merged patch output path (.yml/.yaml or .jsonl)"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    patches = []
+    for path in args.patches:
+        print(f"Reading patch: {path}")
+        patches.append(read_patch(path))
+
+    try:
+        result = merge_patches(patches)
+    except ValueError as e:
+        parser.error(str(e))
+    for warning in result.warnings:
+        print(f"  WARNING: {warning}")
+
+    write_patch(result.patch, args.out)
+    print(
+        f"Merged {result.input_operations} operations from {len(patches)} patches "
+        f"into {len(result.patch.operations)}"
+    )
+    print(f"Patch written: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
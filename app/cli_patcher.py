@@ -7,6 +7,12 @@ Usage:
         --sheet "試験項目" \
         --output "out/master_updated.xlsx" \
         --report "out/diff.md"
+
+    # One patch, many workbooks (process pool, one combined report)
+    python -m app.cli_patcher \
+        --patch "out/patch.yml" \
+        --base-glob "input/masters/*.xlsx" --output-dir "out/masters" \
+        --workers 4 --report "out/diff.md"
 """
 
 from __future__ import annotations
@@ -15,12 +21,11 @@ import argparse
 import sys
 from pathlib import Path
 
-import openpyxl
-
-from app.diff_report import generate_diff_report
-from app.excel_write import apply_patch
+from app.diff_report import DiffReportWriter, generate_multi_diff_report
+from app.excel_write import WRITERS
+from app.multi_target import apply_to_targets, patch_workbook, resolve_targets
 from app.patch_io import read_patch
-from app.renumber import renumber_sheet
+from app.profiling import Profiler, count, stage
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -28,7 +33,7 @@ def build_parser() -> argparse.ArgumentParser:
         description="Apply patch.yml to Japanese Excel 試験項目 sheet"
     )
     parser.add_argument(
-        "--base", required=True, help="Path to base Japanese Excel"
+        "--base", help="Path to base Japanese Excel"
     )
     parser.add_argument(
         "--patch", required=True, help="Path to patch.yml"
@@ -37,85 +42,161 @@ def build_parser() -> argparse.ArgumentParser:
         "--sheet", default="試験項目", help="Target sheet name"
     )
     parser.add_argument(
-        "--output", required=True, help="Output Excel path"
+        "--output", help="Output Excel path"
+    )
+    parser.add_argument(
+        "--target", nargs=2, action="append", metavar=("BASE", "OUTPUT"),
+        help="Base/output pair to patch (repeatable; multi-target mode)"
+    )
+    parser.add_argument(
+        "--base-glob", help="Glob of base workbooks to patch (multi-target mode)"
+    )
+    parser.add_argument(
+        "--output-dir", help="Output directory for --base-glob matches"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Worker processes for multi-target mode (default: CPU count)"
     )
     parser.add_argument(
         "--report", default="out/diff.md", help="Diff report output path"
     )
+    parser.add_argument(
+        "--report-jsonl", default=None,
+        help="Also write every diff entry as JSON Lines, flushed as the patch is applied"
+    )
     parser.add_argument(
         "--end-empty-rows", type=int, default=3,
         help="Consecutive empty rows to detect data end"
     )
+    parser.add_argument(
+        "--writer", choices=WRITERS, default="openpyxl",
+        help="Output backend (surgical = rewrite only the patched sheet in the zip)"
+    )
     parser.add_argument(
         "--dry-run", action="store_true",
         help="Only generate diff report without writing Excel"
     )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Print wall time, CPU time and peak memory per stage, and cell counters"
+    )
+    parser.add_argument(
+        "--metrics-out", default=None,
+        help="Write the per-stage measurements and counters as JSON"
+    )
     return parser
 
 
+def _run_multi(args: argparse.Namespace, patch, targets: list[tuple[str, str]]) -> None:
+    print(f"Applying patch to {len(targets)} workbooks")
+    # Only in-process runs (--workers 1) break this down into stages
+    with stage("targets"):
+        results = apply_to_targets(
+            patch, targets,
+            workers=args.workers,
+            writer=args.writer,
+            end_empty_rows=args.end_empty_rows,
+            dry_run=args.dry_run,
+        )
+    for t in results:
+        if t.ok:
+            print(f"  OK      {t.base} -> {t.output} (renumbered {t.result.renumbered} rows)")
+        else:
+            print(f"  FAILED  {t.base}: {t.error}")
+
+    with stage("report"):
+        generate_multi_diff_report(
+            [(t.base, t.output, t.result.diff_entries if t.ok else None, t.error)
+             for t in results],
+            args.report,
+        )
+    print(f"Report written: {args.report}")
+
+    failed = sum(1 for t in results if not t.ok)
+    if failed:
+        print(f"{failed} of {len(results)} workbooks failed.", file=sys.stderr)
+        sys.exit(1)
+
+
 def main(argv: list[str] | None = None) -> None:
     parser = build_parser()
     args = parser.parse_args(argv)
 
+    multi = bool(args.target or args.base_glob)
+    if multi and (args.base or args.output):
+        parser.error("--base/--output cannot be combined with --target/--base-glob")
+    if not multi and not (args.base and args.output):
+        parser.error("--base and --output are required (or use --target/--base-glob)")
+    if args.base_glob and not args.output_dir:
+        parser.error("--base-glob requires --output-dir")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if multi and args.report_jsonl:
+        parser.error("--report-jsonl is only supported with --base/--output")
+
+    if not (args.profile or args.metrics_out):
+        _patch(parser, args, multi)
+        return
+    # Failed runs are profiled too, up to the failure
+    profiler = Profiler()
+    try:
+        with profiler:
+            _patch(parser, args, multi)
+    finally:
+        if args.profile:
+            print(profiler.table())
+        if args.metrics_out:
+            profiler.write_json(args.metrics_out, command="patch", writer=args.writer)
+            print(f"Metrics written: {args.metrics_out}")
+
+
+def _patch(parser: argparse.ArgumentParser, args: argparse.Namespace, multi: bool) -> None:
     # 1. Read patch
     print(f"Reading patch: {args.patch}")
-    patch = read_patch(args.patch)
+    with stage("read patch"):
+        patch = read_patch(args.patch)
     patch.sheet = args.sheet
+    count("operations", len(patch.operations))
     print(f"  Operations: {len(patch.operations)}")
 
+    if multi:
+        try:
+            targets = resolve_targets(args.target, args.base_glob, args.output_dir)
+        except ValueError as e:
+            parser.error(str(e))
+        if not targets:
+            parser.error(f"No workbooks matched: {args.base_glob}")
+        _run_multi(args, patch, targets)
+        return
+
+    # Diff entries stream to the report writers while the patch is applied
+    report = DiffReportWriter(args.report, args.report_jsonl)
+
     if args.dry_run:
         print("Dry run mode: skipping Excel write.")
-        # TODO: Implement dry-run diff
+        with report:
+            result = patch_workbook(
+                args.base, args.output, patch,
+                end_empty_rows=args.end_empty_rows, dry_run=True, sink=report,
+            )
+        print(f"  Would renumber {result.renumbered} rows.")
+        print(f"Report written: {args.report}")
         return
 
-    # 2. Apply patch
+    # 2-4. Apply patch, renumber No. column, save and write the diff report
     print(f"Applying patch to: {args.base}")
-    diff_entries = apply_patch(
-        args.base, patch, args.output,
-        end_empty_rows=args.end_empty_rows,
-    )
-
-    # 3. Renumber No. column
-    print(f"Renumbering No. column...")
-    wb = openpyxl.load_workbook(str(args.output))
-    ws = wb[args.sheet]
-
-    # Detect header for renumbering
-    header_row = None
-    no_col = None
-    test_id_col = None
-    for row_idx in range(1, 201):
-        found_no = False
-        found_tid = False
-        for col_idx in range(1, ws.max_column + 1 if ws.max_column else 100):
-            val = ws.cell(row=row_idx, column=col_idx).value
-            if val is not None:
-                s = str(val).strip()
-                if s == "No.":
-                    no_col = col_idx
-                    found_no = True
-                elif s == "Test ID":
-                    test_id_col = col_idx
-                    found_tid = True
-        if found_no and found_tid:
-            header_row = row_idx
-            break
-
-    if header_row and no_col and test_id_col:
-        count = renumber_sheet(
-            ws, header_row, no_col, test_id_col,
+    with report:
+        result = patch_workbook(
+            args.base, args.output, patch,
+            writer=args.writer,
             end_empty_rows=args.end_empty_rows,
+            sink=report,
         )
-        print(f"  Renumbered {count} rows.")
-        wb.save(str(args.output))
-    else:
-        print("  Warning: Could not detect No./Test ID headers for renumbering.")
-
-    wb.close()
-
-    # 4. Generate diff report
-    generate_diff_report(diff_entries, args.report)
+    print(f"  Renumbered {result.renumbered} rows.")
     print(f"Report written: {args.report}")
+    if args.report_jsonl:
+        print(f"Diff entries written: {args.report_jsonl}")
     print(f"Output written: {args.output}")
 
 
@@ -1,9 +1,63 @@
-"""Generate Markdown diff reports."""
+"""Generate Markdown diff reports.
+
+Reports are written line by line as they are built. The patcher's diff
+report can also be fed entry by entry while the patch is applied
+(DiffReportWriter): Markdown sections are spooled to temporary files and
+assembled on close, and a JSON Lines copy of every entry is written (and
+flushed) immediately, so dashboards can tail it during a run.
+"""
 
 from __future__ import annotations
 
+import json
+import shutil
+import tempfile
+from collections.abc import Iterable
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Protocol
+
+from app.profiling import stage
+
+# Diff entry types, in report section order
+_SECTIONS = (("update", "Updates"), ("insert", "Inserts"), ("warning", "Warnings"))
+
+
+class DiffSink(Protocol):
+    """Receives diff entries as the patcher produces them."""
+
+    def emit(self, entry: dict[str, Any]) -> None: ...
+
+
+class _MarkdownFile:
+    """Line-oriented UTF-8 writer; lines are separated (not terminated) by newlines."""
+
+    def __init__(self, output_path: str | Path) -> None:
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(output_path, "wb")
+        self._first = True
+
+    def line(self, text: str = "") -> None:
+        if not self._first:
+            self._f.write(b"\n")
+        self._first = False
+        self._f.write(text.encode("utf-8"))
+
+    def lines(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            self.line(text)
+
+    def block(self, src: IO[bytes]) -> None:
+        """Copy newline-terminated lines from src as lines of this file."""
+        self.line()
+        src.seek(0)
+        shutil.copyfileobj(src, self._f)
+        # Drop the last terminator; the next line() writes the separator
+        self._f.seek(-1, 1)
+        self._f.truncate()
+
+    def close(self) -> None:
+        self._f.close()
 
 
 def _truncate(text: str, max_len: int = 80) -> str:
@@ -13,51 +67,168 @@ def _truncate(text: str, max_len: int = 80) -> str:
     return text[:max_len] + "..."
 
 
+def _entry_lines(entry: dict[str, Any], h: str) -> list[str]:
+    """Markdown lines of one entry inside its section (h = section heading)."""
+    kind = entry.get("type")
+    if kind == "update":
+        lines = [f"{h}# Test ID: `{entry['test_id']}`\n"]
+        for col, change in entry.get("changes", {}).items():
+            old = _truncate(change["old"])
+            new = _truncate(change["new"])
+            lines.append(f"- **{col}**: `{old}` → `{new}`")
+        lines.append("")
+        return lines
+    if kind == "insert":
+        return [
+            f"- `{entry['test_id']}` inserted after `{entry['after_key']}` "
+            f"(row {entry.get('row_num', '?')})"
+        ]
+    if kind == "warning":
+        return [f"- **{entry.get('test_id', '?')}**: {entry['message']}"]
+    return []
+
+
+def _section_tail(kind: str) -> list[str]:
+    # Update entries end with their own blank line; other sections get one
+    return [] if kind == "update" else [""]
+
+
+def _diff_lines(diff_entries: list[dict[str, Any]], level: int = 2) -> list[str]:
+    """Summary counts and Updates/Inserts/Warnings sections at heading level."""
+    h = "#" * level
+    by_kind = {
+        kind: [e for e in diff_entries if e.get("type") == kind] for kind, _ in _SECTIONS
+    }
+    lines = [f"- {title}: {len(by_kind[kind])}" for kind, title in _SECTIONS]
+    lines.append("")
+    for kind, title in _SECTIONS:
+        if by_kind[kind]:
+            lines.append(f"{h} {title}\n")
+            for entry in by_kind[kind]:
+                lines.extend(_entry_lines(entry, h))
+            lines.extend(_section_tail(kind))
+    return lines
+
+
+class DiffReportWriter:
+    """Streaming DiffSink writing the Markdown diff report and optional JSON Lines.
+
+    Every entry is written to the JSON Lines file as one object per line when
+    it is emitted; close() appends a ``{"type": "summary", ...}`` line. The
+    Markdown report (same layout as generate_diff_report) is assembled on
+    close from per-section temporary files, so no entries are kept in memory.
+    """
+
+    def __init__(
+        self,
+        output_path: str | Path,
+        jsonl_path: str | Path | None = None,
+    ) -> None:
+        self.output_path = Path(output_path)
+        self.counts = {kind: 0 for kind, _ in _SECTIONS}
+        self._spools: dict[str, IO[bytes]] = {}
+        self._jsonl: IO[str] | None = None
+        if jsonl_path is not None:
+            jsonl_path = Path(jsonl_path)
+            jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            self._jsonl = open(jsonl_path, "w", encoding="utf-8", buffering=1)
+
+    def emit(self, entry: dict[str, Any]) -> None:
+        kind = entry.get("type")
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        if kind not in self.counts:
+            return
+        self.counts[kind] += 1
+        spool = self._spools.get(kind)
+        if spool is None:
+            spool = self._spools[kind] = tempfile.TemporaryFile()
+        for line in _entry_lines(entry, "##"):
+            spool.write(line.encode("utf-8") + b"\n")
+
+    def close(self) -> None:
+        with stage("report"):
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps({"type": "summary", **self.counts}) + "\n")
+                self._jsonl.close()
+                self._jsonl = None
+            out = _MarkdownFile(self.output_path)
+            try:
+                out.line("# Patch Application Report\n")
+                out.lines([f"- {title}: {self.counts[kind]}" for kind, title in _SECTIONS])
+                out.line()
+                for kind, title in _SECTIONS:
+                    spool = self._spools.pop(kind, None)
+                    if spool is None:
+                        continue
+                    with spool:
+                        out.line(f"## {title}\n")
+                        out.block(spool)
+                    out.lines(_section_tail(kind))
+            finally:
+                out.close()
+                for spool in self._spools.values():
+                    spool.close()
+                self._spools.clear()
+
+    def __enter__(self) -> DiffReportWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
 def generate_diff_report(
     diff_entries: list[dict[str, Any]],
     output_path: str | Path,
+    jsonl_path: str | Path | None = None,
 ) -> None:
-    """Write a Markdown diff report from patcher results."""
-    lines: list[str] = []
-    lines.append("# Patch Application Report\n")
+    """Write a Markdown diff report (and optional JSON Lines) from patcher results."""
+    with DiffReportWriter(output_path, jsonl_path) as writer:
+        for entry in diff_entries:
+            writer.emit(entry)
 
-    updates = [e for e in diff_entries if e.get("type") == "update"]
-    inserts = [e for e in diff_entries if e.get("type") == "insert"]
-    warnings = [e for e in diff_entries if e.get("type") == "warning"]
 
-    lines.append(f"- Updates: {len(updates)}")
-    lines.append(f"- Inserts: {len(inserts)}")
-    lines.append(f"- Warnings: {len(warnings)}")
-    lines.append("")
+def generate_multi_diff_report(
+    targets: list[tuple[str, str, list[dict[str, Any]] | None, str | None]],
+    output_path: str | Path,
+) -> None:
+    """Write one Markdown report for a patch applied to several workbooks.
 
-    if updates:
-        lines.append("## Updates\n")
-        for entry in updates:
-            lines.append(f"### Test ID: `{entry['test_id']}`\n")
-            for col, change in entry.get("changes", {}).items():
-                old = _truncate(change["old"])
-                new = _truncate(change["new"])
-                lines.append(f"- **{col}**: `{old}` → `{new}`")
-            lines.append("")
-
-    if inserts:
-        lines.append("## Inserts\n")
-        for entry in inserts:
-            lines.append(
-                f"- `{entry['test_id']}` inserted after `{entry['after_key']}` "
-                f"(row {entry.get('row_num', '?')})"
-            )
-        lines.append("")
+    Each target is (base, output, diff_entries or None, error or None).
+    """
+    failed = sum(1 for _, _, _, error in targets if error is not None)
+    out = _MarkdownFile(output_path)
+    out.line("# Patch Application Report\n")
+    out.line(f"- Workbooks: {len(targets)}")
+    out.line(f"- Succeeded: {len(targets) - failed}")
+    out.line(f"- Failed: {failed}")
+    out.line("")
 
-    if warnings:
-        lines.append("## Warnings\n")
-        for entry in warnings:
-            lines.append(f"- **{entry.get('test_id', '?')}**: {entry['message']}")
-        lines.append("")
+    out.line("| Base | Output | Status | Updates | Inserts | Warnings |")
+    out.line("|---|---|---|---|---|---|")
+    for base, output, entries, error in targets:
+        if error is not None:
+            out.line(f"| `{base}` | `{output}` | FAILED | - | - | - |")
+            continue
+        counts = [
+            sum(1 for e in entries or [] if e.get("type") == kind)
+            for kind in ("update", "insert", "warning")
+        ]
+        out.line(
+            f"| `{base}` | `{output}` | OK | {counts[0]} | {counts[1]} | {counts[2]} |"
+        )
+    out.line("")
 
-    output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\n".join(lines), encoding="utf-8")
+    for base, output, entries, error in targets:
+        out.line(f"## `{base}`\n")
+        if error is not None:
+            out.line(f"**FAILED**: {error}")
+            out.line("")
+            continue
+        out.line(f"- Output: `{output}`")
+        out.lines(_diff_lines(entries or [], level=3))
+    out.close()
 
 
 def generate_generator_report(
@@ -68,30 +239,77 @@ def generate_generator_report(
     after_key_map: dict[str, str | None],
     warnings: list[str],
     output_path: str | Path,
+    row_statuses: dict[str, list[str]] | None = None,
+    rule_hits: dict[str, int] | None = None,
+    rule_lines: int = 0,
+    memo_stats: tuple[int, int] | None = None,
+    memory_stats: tuple[int, int, int] | None = None,
+    request_stats: tuple[int, int] | None = None,
 ) -> None:
-    """Write a Markdown generation report."""
-    lines: list[str] = []
-    lines.append("# Generator Report\n")
-    lines.append(f"- Total rows in Test Items: {total_rows}")
-    lines.append(f"- After filter: {filtered_rows}")
-    lines.append(f"- Update: {update_count}")
-    lines.append(f"- Insert: {insert_count}")
-    lines.append("")
+    """Write a Markdown generation report.
+
+    row_statuses (incremental runs) maps new/changed/unchanged/vanished to
+    Test IDs; rule_hits maps each translator pattern rule to the number of
+    lines it rewrote (out of rule_lines, the lines not served by the line
+    memo); memo_stats is the memo's (hits, misses) and memory_stats the
+    translation memory's (recalled, pinned, stored) line counts.
+    request_stats is an HTTP translator's (requests, retried), reported
+    instead of the rule-based line counts.
+    """
+    out = _MarkdownFile(output_path)
+    out.line("# Generator Report\n")
+    out.line(f"- Total rows in Test Items: {total_rows}")
+    out.line(f"- After filter: {filtered_rows}")
+    out.line(f"- Update: {update_count}")
+    out.line(f"- Insert: {insert_count}")
+    out.line("")
+
+    if row_statuses is not None:
+        out.line("## Incremental Generation\n")
+        for status, ids in row_statuses.items():
+            out.line(f"- {status.capitalize()}: {len(ids)}")
+        out.line("")
+        for status, ids in row_statuses.items():
+            if ids and status != "unchanged":
+                out.line(f"### {status.capitalize()}\n")
+                out.lines(f"- `{test_id}`" for test_id in ids)
+                out.line("")
 
     if after_key_map:
-        lines.append("## Insert after_key Mapping\n")
-        lines.append("| New Test ID | after_key |")
-        lines.append("|---|---|")
+        out.line("## Insert after_key Mapping\n")
+        out.line("| New Test ID | after_key |")
+        out.line("|---|---|")
         for new_id, after_id in after_key_map.items():
-            lines.append(f"| `{new_id}` | `{after_id or '(end of sheet)'}` |")
-        lines.append("")
+            out.line(f"| `{new_id}` | `{after_id or '(end of sheet)'}` |")
+        out.line("")
+
+    if rule_hits or memo_stats or memory_stats or request_stats:
+        out.line("## Translation Stats\n")
+        if request_stats:
+            requests, retried = request_stats
+            out.line(f"- Translation requests: {requests} ({retried} retried)")
+        if memo_stats:
+            hits, misses = memo_stats
+            out.line(f"- Line memo: {hits} hits, {misses} misses")
+        if memory_stats:
+            recalled, pinned, stored = memory_stats
+            out.line(
+                f"- Translation memory: {recalled} recalled ({pinned} pinned), "
+                f"{stored} stored"
+            )
+        if request_stats is None:
+            out.line(f"- Lines translated: {rule_lines}")
+        out.line("")
+    if rule_hits:
+        out.line("| Rule | Hits |")
+        out.line("|---|---|")
+        for name, hits in rule_hits.items():
+            out.line(f"| `{name}` | {hits}{' (unused)' if not hits else ''} |")
+        out.line("")
 
     if warnings:
-        lines.append("## Warnings\n")
+        out.line("## Warnings\n")
         for w in warnings:
-            lines.append(f"- {w}")
-        lines.append("")
-
-    output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\n".join(lines), encoding="utf-8")
+            out.line(f"- {w}")
+        out.line("")
+    out.close()
@@ -2,17 +2,49 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Any
+from typing import Any, Protocol
 
 import openpyxl
-from openpyxl.worksheet.worksheet import Worksheet
 
-from app.normalizer import normalize_cell_text
+from app.normalizer import normalize_column
+from app.profiling import count, stage
+from app.read_cache import ReadCache
+from app.test_items_table import TestItemsTable
+from app.xlsx_fast import FastWorkbook
 
+# Available read backends ("openpyxl" is the reference implementation)
+READERS = ("openpyxl", "fast")
 
-def _detect_header_row(
-    ws: Worksheet,
+
+class RowSource(Protocol):
+    """Minimal worksheet interface needed by the readers below.
+
+    Satisfied by openpyxl worksheets and ``app.xlsx_fast.FastWorksheet``.
+    """
+
+    def iter_rows(
+        self,
+        min_row: int = ...,
+        max_row: int | None = ...,
+        min_col: int = ...,
+        max_col: int | None = ...,
+        values_only: bool = ...,
+    ) -> Iterator[tuple[Any, ...]]: ...
+
+
+def _open_workbook(xlsx_path: str | Path, reader: str) -> Any:
+    """Open a workbook for value-only reading with the selected backend."""
+    if reader == "fast":
+        return FastWorkbook(xlsx_path)
+    if reader == "openpyxl":
+        return openpyxl.load_workbook(str(xlsx_path), read_only=True, data_only=True)
+    raise ValueError(f"Unknown reader '{reader}'. Choose from: {', '.join(READERS)}")
+
+
+def detect_header_row(
+    ws: RowSource,
     required_headers: list[str],
     max_scan: int = 200,
 ) -> tuple[int, dict[str, int]]:
@@ -21,33 +53,128 @@ def _detect_header_row(
     Returns (header_row_number, {header_name: column_index}).
     Column index is 1-based (openpyxl convention).
     """
-    for row_idx in range(1, max_scan + 1):
-        row_values: dict[str, int] = {}
-        for col_idx in range(1, ws.max_column + 1 if ws.max_column else 100):
-            cell_val = ws.cell(row=row_idx, column=col_idx).value
-            if cell_val is not None:
-                row_values[str(cell_val).strip()] = col_idx
-        if all(h in row_values for h in required_headers):
-            return row_idx, row_values
+    with stage("header detection"):
+        for row_idx, values in enumerate(
+            ws.iter_rows(min_row=1, max_row=max_scan, values_only=True), start=1
+        ):
+            row_values: dict[str, int] = {}
+            for col_idx, cell_val in enumerate(values, start=1):
+                if cell_val is not None:
+                    row_values[str(cell_val).strip()] = col_idx
+            if all(h in row_values for h in required_headers):
+                return row_idx, row_values
     raise ValueError(
         f"Header row not found within first {max_scan} rows. "
         f"Required headers: {required_headers}"
     )
 
 
+def iter_projected_rows(
+    ws: RowSource,
+    header_row: int,
+    columns: list[int],
+    *,
+    key_index: int = 0,
+    end_empty_rows: int | None = None,
+) -> Iterator[tuple[int, tuple[Any, ...]]]:
+    """Stream the data rows below header_row, projected onto the given columns.
+
+    The sheet is walked once with ``iter_rows`` (no per-cell lookups), which
+    keeps read-only worksheets linear in the size of the sheet XML.
+
+    Args:
+        ws: Worksheet to read (openpyxl or fast backend).
+        header_row: Header row number; data starts on the next row.
+        columns: 1-based column indices to project, in output order.
+        key_index: Position in ``columns`` of the key (Test ID) column.
+        end_empty_rows: Stop after this many consecutive rows with an empty
+            key cell (same rule as the patcher). None reads to the last row.
+
+    Yields:
+        (row_number, values) for every row with a non-empty key cell, where
+        values holds the raw cell values in ``columns`` order.
+    """
+    if not columns:
+        return
+    max_col = max(columns)
+    offsets = [c - 1 for c in columns]
+    key_offset = offsets[key_index]
+    empty_streak = 0
+
+    for row_idx, values in enumerate(
+        ws.iter_rows(min_row=header_row + 1, max_col=max_col, values_only=True),
+        start=header_row + 1,
+    ):
+        key_val = values[key_offset] if key_offset < len(values) else None
+        if key_val is None or str(key_val).strip() == "":
+            empty_streak += 1
+            if end_empty_rows is not None and empty_streak >= end_empty_rows:
+                break
+            continue
+        empty_streak = 0
+        yield row_idx, tuple(
+            values[o] if o < len(values) else None for o in offsets
+        )
+
+
 def read_test_items(
     xlsx_path: str | Path,
     sheet_name: str = "Test Items",
+    *,
+    end_empty_rows: int | None = None,
+    reader: str = "openpyxl",
+    cache: ReadCache | None = None,
 ) -> tuple[list[dict[str, str]], dict[str, int]]:
     """Read Test Items sheet and return list of row dicts + header map.
 
+    Row-dict view of read_test_items_table.
+    """
+    table, header_map = read_test_items_table(
+        xlsx_path, sheet_name,
+        end_empty_rows=end_empty_rows, reader=reader, cache=cache,
+    )
+    return list(table.rows()), header_map
+
+
+def read_test_items_table(
+    xlsx_path: str | Path,
+    sheet_name: str = "Test Items",
+    *,
+    end_empty_rows: int | None = None,
+    reader: str = "openpyxl",
+    cache: ReadCache | None = None,
+) -> tuple[TestItemsTable, dict[str, int]]:
+    """Read Test Items sheet into a columnar table + header map.
+
     Header detection: looks for row containing Test ID, Test Procedure, Check item.
+    When a cache is given, unchanged files are served without opening the workbook.
     """
-    wb = openpyxl.load_workbook(str(xlsx_path), read_only=True, data_only=True)
+    if cache is not None:
+        columns, header_map = cache.get_or_compute(
+            xlsx_path, "test_items_table",
+            {"sheet": sheet_name, "end_empty_rows": end_empty_rows, "reader": reader},
+            lambda: _read_test_items_columns(
+                xlsx_path, sheet_name, end_empty_rows, reader,
+            ),
+        )
+        return TestItemsTable(columns), header_map
+    columns, header_map = _read_test_items_columns(
+        xlsx_path, sheet_name, end_empty_rows, reader,
+    )
+    return TestItemsTable(columns), header_map
+
+
+def _read_test_items_columns(
+    xlsx_path: str | Path,
+    sheet_name: str,
+    end_empty_rows: int | None,
+    reader: str,
+) -> tuple[dict[str, list[str]], dict[str, int]]:
+    wb = _open_workbook(xlsx_path, reader)
     ws = wb[sheet_name]
 
     required = ["Test ID", "Test Procedure", "Check item"]
-    header_row, header_map = _detect_header_row(ws, required, max_scan=50)
+    header_row, header_map = detect_header_row(ws, required, max_scan=50)
 
     # Columns to extract
     columns_of_interest = [
@@ -55,46 +182,59 @@ def read_test_items(
         "Pre-Condition", "Test Procedure", "Check item",
         "Remark", "チーム分担",
     ]
-    col_indices: dict[str, int] = {}
-    for col_name in columns_of_interest:
-        if col_name in header_map:
-            col_indices[col_name] = header_map[col_name]
-
-    rows: list[dict[str, str]] = []
-    for row_idx in range(header_row + 1, ws.max_row + 1 if ws.max_row else 10000):
-        test_id_col = col_indices.get("Test ID")
-        if test_id_col is None:
-            break
-        test_id_val = ws.cell(row=row_idx, column=test_id_col).value
-        if test_id_val is None or str(test_id_val).strip() == "":
-            continue
-        row_data: dict[str, str] = {}
-        for col_name, col_idx in col_indices.items():
-            raw = ws.cell(row=row_idx, column=col_idx).value
-            row_data[col_name] = normalize_cell_text(raw)
-        rows.append(row_data)
+    col_names = [name for name in columns_of_interest if name in header_map]
+    col_indices = [header_map[name] for name in col_names]
+
+    raw_columns = list(zip(*(
+        values for _, values in iter_projected_rows(
+            ws, header_row, col_indices,
+            key_index=col_names.index("Test ID"),
+            end_empty_rows=end_empty_rows,
+        )
+    ))) or [()] * len(col_names)
+    count("cells_read", len(col_names) * len(raw_columns[0]))
+    columns = {
+        name: normalize_column(values)
+        for name, values in zip(col_names, raw_columns)
+    }
 
     wb.close()
-    return rows, header_map
+    return columns, header_map
 
 
 def read_shikenkomoku_test_ids(
     xlsx_path: str | Path,
     sheet_name: str = "試験項目",
+    *,
+    end_empty_rows: int | None = None,
+    reader: str = "openpyxl",
+    cache: ReadCache | None = None,
 ) -> list[str]:
     """Read the Test IDs from the Japanese Excel's 試験項目 sheet."""
-    wb = openpyxl.load_workbook(str(xlsx_path), read_only=True, data_only=True)
+    if cache is not None:
+        return cache.get_or_compute(
+            xlsx_path, "test_ids",
+            {"sheet": sheet_name, "end_empty_rows": end_empty_rows, "reader": reader},
+            lambda: read_shikenkomoku_test_ids(
+                xlsx_path, sheet_name,
+                end_empty_rows=end_empty_rows, reader=reader,
+            ),
+        )
+
+    wb = _open_workbook(xlsx_path, reader)
     ws = wb[sheet_name]
 
     required = ["No.", "Test ID", "Test Title"]
-    header_row, header_map = _detect_header_row(ws, required, max_scan=200)
-
-    test_id_col = header_map["Test ID"]
-    ids: list[str] = []
-    for row_idx in range(header_row + 1, ws.max_row + 1 if ws.max_row else 10000):
-        val = ws.cell(row=row_idx, column=test_id_col).value
-        if val is not None and str(val).strip():
-            ids.append(str(val).strip())
+    header_row, header_map = detect_header_row(ws, required, max_scan=200)
+
+    ids: list[str] = [
+        str(values[0]).strip()
+        for _, values in iter_projected_rows(
+            ws, header_row, [header_map["Test ID"]],
+            end_empty_rows=end_empty_rows,
+        )
+    ]
+    count("cells_read", len(ids))
 
     wb.close()
     return ids
@@ -1,19 +1,32 @@
-"""Excel writing utilities for the patcher (update/insert with format preservation)."""
+"""Excel writing utilities for the patcher (update/insert with format preservation).
+
+The planning helpers (RowIndex, preflight_missing_keys, plan_operations,
+emit_planned, protected_columns) are public: xlsx_surgical plans patches with
+them too, so both writers report the same entries.
+"""
 
 from __future__ import annotations
 
+import bisect
 import copy
 import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import openpyxl
 from openpyxl.cell.cell import Cell
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Protection, Side
-from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.workbook.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 
-from app.patch_model import InsertOperation, PatchFile, UpdateOperation
+from app.diff_report import DiffSink
+from app.patch_model import InsertOperation, PatchFile, RowValues, UpdateOperation
+from app.profiling import count, stage
+from app.renumber import renumber_sheet
+
+# Available output backends ("openpyxl" re-saves the whole workbook)
+WRITERS = ("openpyxl", "surgical")
 
 # Headers that should never be overwritten
 _PROTECTED_HEADER_PATTERNS = [
@@ -36,187 +49,518 @@ def _is_protected_header(header: str) -> bool:
     return False
 
 
+def protected_columns(header_map: dict[str, int]) -> set[int]:
+    """Column indices whose header is protected."""
+    return {
+        col_idx for name, col_idx in header_map.items()
+        if _is_protected_header(name)
+    }
+
+
 def _detect_header_row(
     ws: Worksheet,
     required_headers: list[str],
     max_scan: int = 200,
 ) -> tuple[int, dict[str, int]]:
     """Same as excel_read but for write context (not read_only)."""
-    for row_idx in range(1, max_scan + 1):
-        row_values: dict[str, int] = {}
-        for col_idx in range(1, ws.max_column + 1 if ws.max_column else 100):
-            cell_val = ws.cell(row=row_idx, column=col_idx).value
-            if cell_val is not None:
-                row_values[str(cell_val).strip()] = col_idx
-        if all(h in row_values for h in required_headers):
-            return row_idx, row_values
+    with stage("header detection"):
+        for row_idx in range(1, max_scan + 1):
+            row_values: dict[str, int] = {}
+            for col_idx in range(1, ws.max_column + 1 if ws.max_column else 100):
+                cell_val = ws.cell(row=row_idx, column=col_idx).value
+                if cell_val is not None:
+                    row_values[str(cell_val).strip()] = col_idx
+            if all(h in row_values for h in required_headers):
+                return row_idx, row_values
     raise ValueError(
         f"Header row not found within first {max_scan} rows. "
         f"Required: {required_headers}"
     )
 
 
-def _find_row_by_test_id(
-    ws: Worksheet,
-    test_id: str,
-    header_row: int,
-    test_id_col: int,
-    *,
-    end_empty_rows: int = 3,
-) -> int | None:
-    """Find the row number for a given Test ID."""
-    empty_streak = 0
-    max_row = ws.max_row or (header_row + 10000)
-    for row_idx in range(header_row + 1, max_row + 1):
-        val = ws.cell(row=row_idx, column=test_id_col).value
-        if val is not None and str(val).strip() == test_id:
-            return row_idx
-        if val is None or str(val).strip() == "":
-            empty_streak += 1
-            if empty_streak >= end_empty_rows:
-                break
-        else:
-            empty_streak = 0
-    return None
+class RowIndex:
+    """Test ID → row number map that stays valid while rows are inserted.
 
+    Built with one scan of the Test ID column. Every scanned row is a slot;
+    rows inserted later are attached to the slot of the original row they
+    follow, and a Fenwick tree over slots counts the attached rows. The
+    current row number of any key is therefore an O(log n) prefix sum
+    instead of a rescan of the sheet.
+    """
 
-def _copy_cell_style(src: Cell, dst: Cell) -> None:
-    """Copy formatting from source cell to destination cell."""
-    dst.font = copy.copy(src.font)
-    dst.border = copy.copy(src.border)
-    dst.fill = copy.copy(src.fill)
-    dst.number_format = src.number_format
-    dst.protection = copy.copy(src.protection)
-    dst.alignment = copy.copy(src.alignment)
+    def __init__(self, header_row: int, last_row: int) -> None:
+        self._base = header_row
+        self._size = max(last_row - header_row, 0)
+        self._tree = [0] * (self._size + 1)
+        # Tokens of inserted rows attached after each original slot, in sheet order
+        self._attached: dict[int, list[int]] = {}
+        self._next_token = 0
+        self._payloads: dict[int, RowValues] = {}
+        # key → (slot, inserted-row token or None for the original row)
+        self._keys: dict[str, tuple[int, int | None]] = {}
+        # Original rows holding a Test ID, ascending
+        self._id_rows: list[int] = []
+        # First original row whose No. is out of sequence (None: all in order)
+        self.numbered_until: int | None = None
+
+    @classmethod
+    def build(
+        cls,
+        ws: Worksheet,
+        header_row: int,
+        test_id_col: int,
+        *,
+        no_col: int | None = None,
+        end_empty_rows: int = 3,
+    ) -> RowIndex:
+        """Scan the Test ID column once (same end-of-data rule as before).
+
+        When no_col is given, the same pass also records the first row whose
+        No. value breaks the 1, 2, 3... sequence, so renumbering can skip the
+        already-correct prefix.
+        """
+        cols = [test_id_col] if no_col is None else [test_id_col, no_col]
+        min_col, max_col = min(cols), max(cols)
+        tid_off = test_id_col - min_col
+        no_off = None if no_col is None else no_col - min_col
+
+        ids: list[tuple[int, str]] = []
+        numbered_until: int | None = None
+        empty_streak = 0
+        last_row = header_row
+        max_row = ws.max_row or (header_row + 10000)
+        for row_idx, values in enumerate(
+            ws.iter_rows(
+                min_row=header_row + 1, max_row=max_row,
+                min_col=min_col, max_col=max_col, values_only=True,
+            ),
+            start=header_row + 1,
+        ):
+            last_row = row_idx
+            val = values[tid_off]
+            if val is None or str(val).strip() == "":
+                empty_streak += 1
+                if empty_streak >= end_empty_rows:
+                    break
+            else:
+                empty_streak = 0
+                ids.append((row_idx, str(val).strip()))
+                if (
+                    no_off is not None and numbered_until is None
+                    and values[no_off] != len(ids)
+                ):
+                    numbered_until = row_idx
+        count("cells_read", (last_row - header_row) * len(cols))
+
+        index = cls(header_row, last_row)
+        for row_idx, test_id in ids:
+            index._keys.setdefault(test_id, (row_idx - header_row, None))
+        index._id_rows = [row_idx for row_idx, _ in ids]
+        index.numbered_until = numbered_until
+        return index
+
+    def __contains__(self, test_id: str) -> bool:
+        return test_id in self._keys
+
+    def keys(self) -> set[str]:
+        return set(self._keys)
+
+    def _prefix(self, slot: int) -> int:
+        """Number of inserted rows attached to slots 1..slot."""
+        total = 0
+        while slot > 0:
+            total += self._tree[slot]
+            slot -= slot & -slot
+        return total
+
+    def _add(self, slot: int) -> None:
+        while slot <= self._size:
+            self._tree[slot] += 1
+            slot += slot & -slot
+
+    def _row(self, slot: int, token: int | None) -> int:
+        row = self._base + slot + self._prefix(slot - 1)
+        if token is not None:
+            row += self._attached[slot].index(token) + 1
+        return row
+
+    def locate(self, test_id: str) -> tuple[int, int | None] | None:
+        """Return (slot, inserted-row token or None) for test_id."""
+        return self._keys.get(test_id)
+
+    def attached_tokens(self, slot: int) -> list[int]:
+        """Tokens of rows inserted after slot, in sheet order."""
+        return self._attached.get(slot, [])
+
+    def payload(self, token: int) -> RowValues:
+        return self._payloads[token]
+
+    @property
+    def header_row(self) -> int:
+        return self._base
+
+    def row_of(self, test_id: str) -> int | None:
+        """Return the current row number of test_id, or None if unknown."""
+        entry = self._keys.get(test_id)
+        if entry is None:
+            return None
+        return self._row(*entry)
+
+    def insert_after(
+        self,
+        after_id: str,
+        new_id: str | None,
+        payload: RowValues | None = None,
+    ) -> int:
+        """Record a row inserted directly below after_id; return its row number.
+
+        The returned number is the row at the time of this insert; later
+        inserts above it shift it further down (see ``inserted_rows``).
+        """
+        slot, token = self._keys[after_id]
+        attached = self._attached.setdefault(slot, [])
+        pos = 0 if token is None else attached.index(token) + 1
+        new_token = self._next_token
+        self._next_token += 1
+        attached.insert(pos, new_token)
+        self._payloads[new_token] = payload if payload is not None else RowValues((), ())
+        self._add(slot)
+        row = self._row(slot, new_token)
+        if new_id:
+            # A lookup returns the first matching row, as the linear scan did
+            current = self.row_of(new_id)
+            if current is None or row < current:
+                self._keys[new_id] = (slot, new_token)
+        return row
+
+    @property
+    def inserted_count(self) -> int:
+        return self._prefix(self._size)
+
+    def row_shifts(self) -> list[int]:
+        """Return shifts[slot] = rows inserted above original slot (1-based).
+
+        shifts[size + 1] is the total, which applies to every row past the
+        indexed range.
+        """
+        shifts = [0] * (self._size + 2)
+        running = 0
+        for slot in range(1, self._size + 2):
+            shifts[slot] = running
+            running += len(self._attached.get(slot, ()))
+        return shifts
+
+    def inserted_rows(self) -> list[tuple[int, int, RowValues]]:
+        """Return (template original row, final row, payload) per inserted row.
+
+        The template is the original row the insert chain hangs off.
+        """
+        shifts = self.row_shifts()
+        result: list[tuple[int, int, RowValues]] = []
+        for slot, tokens in self._attached.items():
+            first = self._base + slot + shifts[slot] + 1
+            for offset, token in enumerate(tokens):
+                result.append((self._base + slot, first + offset, self._payloads[token]))
+        return result
+
+    def renumber_start(self, first_changed: int | None) -> tuple[int, int]:
+        """Return (start_row, numbers_already_assigned) for renumbering.
+
+        Rows above the first changed (or mis-numbered) row are untouched and
+        already numbered, so renumbering resumes just after the last Test ID
+        row above it, seeded with the count of Test IDs up to there.
+        """
+        candidates = [r for r in (first_changed, self.numbered_until) if r is not None]
+        if not candidates:
+            count = len(self._id_rows)
+        else:
+            count = bisect.bisect_left(self._id_rows, min(candidates))
+        start_row = self._id_rows[count - 1] + 1 if count else self._base + 1
+        return start_row, count
 
+    def original_row_mapper(self) -> Callable[[int], int]:
+        """Return a function mapping an original row number to its current row."""
+        shifts = self.row_shifts()
+        base, size, total = self._base, self._size, shifts[-1]
 
-def _copy_cell_formula_or_clear(src: Cell, dst: Cell) -> None:
-    """Copy formula from source (if it has one), otherwise leave value to be set later."""
-    if isinstance(src.value, str) and src.value.startswith("="):
-        dst.value = src.value
-    # Otherwise leave dst.value as None (to be set by patch data)
+        def moved(row: int) -> int:
+            slot = row - base
+            if slot <= 0:
+                return row
+            return row + (shifts[slot] if slot <= size else total)
 
+        return moved
 
-def _insert_row_after(
-    ws: Worksheet,
-    after_row: int,
-    header_map: dict[str, int],
-    row_data: dict[str, str],
-) -> int:
-    """Insert a row after the given row, copying style from after_row as template.
 
-    Returns the new row number.
+def preflight_missing_keys(
+    operations: list[UpdateOperation | InsertOperation],
+    known_ids: set[str],
+) -> dict[int, str]:
+    """Validate all keys up front; return {operation index: warning message}.
+
+    Insert operations make their own Test ID known to later operations.
+    """
+    known = set(known_ids)
+    missing: dict[int, str] = {}
+    for i, op in enumerate(operations):
+        if isinstance(op, UpdateOperation):
+            if op.test_id not in known:
+                missing[i] = "Test ID not found for update; skipped."
+        elif isinstance(op, InsertOperation):
+            if op.after_test_id not in known:
+                missing[i] = f"after_key '{op.after_test_id}' not found; skipped."
+            elif str(op.row.get("Test ID") or "").strip():
+                known.add(str(op.row["Test ID"]).strip())
+    return missing
+
+
+def plan_operations(
+    index: RowIndex,
+    operations: list[UpdateOperation | InsertOperation],
+    missing: dict[int, str],
+) -> list[dict[str, Any] | None]:
+    """Record warnings and plan every insert in index; return per-op entries.
+
+    Update entries are left as None for the caller to fill in once the rows
+    are at their final positions.
+    """
+    entries: list[dict[str, Any] | None] = [None] * len(operations)
+    for op_idx, message in missing.items():
+        op = operations[op_idx]
+        test_id = (
+            op.test_id if isinstance(op, UpdateOperation)
+            else op.row.get("Test ID", "?")
+        )
+        entries[op_idx] = {"type": "warning", "test_id": test_id, "message": message}
+
+    # Plan every insert first (after_key may be a row inserted by this patch)
+    for op_idx, op in enumerate(operations):
+        if not isinstance(op, InsertOperation) or op_idx in missing:
+            continue
+        new_row_num = index.insert_after(
+            op.after_test_id,
+            str(op.row.get("Test ID") or "").strip() or None,
+            op.row,
+        )
+        entries[op_idx] = {
+            "type": "insert",
+            "test_id": op.row.get("Test ID", "?"),
+            "after_key": op.after_test_id,
+            "row_num": new_row_num,
+        }
+    return entries
+
+
+def emit_planned(
+    entries: list[dict[str, Any] | None],
+    sink: DiffSink,
+) -> list[dict[str, Any] | None]:
+    """Emit the planned warning/insert entries; return empty per-op slots."""
+    for entry in entries:
+        if entry is not None:
+            sink.emit(entry)
+    return [None] * len(entries)
+
+
+class _RowTemplate:
+    """Style IDs, formulas and height of one template row.
+
+    Only cells that actually carry a style or formula are recorded, so a
+    stray formatted cell far to the right does not widen every insert.
+    The recorded StyleArrays reference the workbook's shared style table;
+    applying a template copies those few integers and never allocates new
+    Font/Border/Fill objects.
     """
-    new_row = after_row + 1
-    ws.insert_rows(new_row)
-
-    # Copy style and formulas from the template row (after_row)
-    max_col = ws.max_column or 50
-    for col_idx in range(1, max_col + 1):
-        src_cell = ws.cell(row=after_row, column=col_idx)
-        dst_cell = ws.cell(row=new_row, column=col_idx)
-        _copy_cell_style(src_cell, dst_cell)
-        _copy_cell_formula_or_clear(src_cell, dst_cell)
-
-    # Copy row height
-    if after_row in ws.row_dimensions:
-        src_rd = ws.row_dimensions[after_row]
-        dst_rd = ws.row_dimensions[new_row]
-        dst_rd.height = src_rd.height
-
-    # Set values from patch data
-    for col_name, value in row_data.items():
-        if col_name in header_map:
-            col_idx = header_map[col_name]
-            # Don't overwrite protected columns unless explicitly in row_data
-            ws.cell(row=new_row, column=col_idx).value = value
 
-    return new_row
+    __slots__ = ("styles", "formulas", "height")
 
+    def __init__(self, cells: list[Cell], height: float | None) -> None:
+        self.styles = [(c.column, c._style) for c in cells if c.has_style]
+        self.formulas = [
+            (c.column, c.value) for c in cells
+            if isinstance(c.value, str) and c.value.startswith("=")
+        ]
+        self.height = height
 
-def apply_patch(
-    xlsx_path: str | Path,
+    def apply(self, ws: Worksheet, row: int) -> None:
+        for col_idx, style in self.styles:
+            # Own copy of the ID array: openpyxl mutates it in place on restyle
+            ws.cell(row=row, column=col_idx)._style = copy.copy(style)
+        for col_idx, formula in self.formulas:
+            ws.cell(row=row, column=col_idx).value = formula
+        if self.height is not None:
+            ws.row_dimensions[row].height = self.height
+
+
+def _rebuild_with_inserts(
+    ws: Worksheet,
+    index: RowIndex,
+    header_map: dict[str, int],
+) -> None:
+    """Materialize all planned inserts in one pass over the sheet.
+
+    Every existing cell and row dimension below the header is moved exactly
+    once to its final row; the cells of template rows are collected on the
+    way. Inserted rows then get their template's style, formulas and row
+    height, plus their patch values.
+    """
+    if not index.inserted_count:
+        return
+
+    new_row_of = index.original_row_mapper()
+    inserted = index.inserted_rows()
+    template_cells: dict[int, list[Cell]] = {row: [] for row, _, _ in inserted}
+
+    moved: dict[tuple[int, int], Cell] = {}
+    for (row, col), cell in ws._cells.items():
+        if row in template_cells:
+            template_cells[row].append(cell)
+        new_row = new_row_of(row)
+        cell.row = new_row
+        moved[(new_row, col)] = cell
+    ws._cells = moved
+
+    heights: dict[int, float | None] = {
+        row: ws.row_dimensions[row].height if row in ws.row_dimensions else None
+        for row in template_cells
+    }
+    dims = [(r, rd) for r, rd in ws.row_dimensions.items() if new_row_of(r) != r]
+    for r, _ in dims:
+        del ws.row_dimensions[r]
+    for r, rd in dims:
+        rd.index = new_row_of(r)
+        ws.row_dimensions[rd.index] = rd
+
+    templates = {
+        row: _RowTemplate(cells, heights[row])
+        for row, cells in template_cells.items()
+    }
+    for template_row, new_row, row_data in inserted:
+        templates[template_row].apply(ws, new_row)
+        for col_name, value in row_data.items():
+            if col_name in header_map:
+                ws.cell(row=new_row, column=header_map[col_name]).value = value
+
+
+@dataclass
+class PatchResult:
+    """Outcome of applying a patch to a worksheet."""
+    diff_entries: list[dict[str, Any]] = field(default_factory=list)
+    # Total numbered rows after renumbering (None if renumbering was skipped)
+    renumbered: int | None = None
+
+
+def apply_patch_to_sheet(
+    ws: Worksheet,
     patch: PatchFile,
-    output_path: str | Path,
     *,
     end_empty_rows: int = 3,
-) -> list[dict[str, Any]]:
-    """Apply a patch to an Excel file and save to output_path.
-
-    Returns a list of diff entries for reporting.
+    renumber: bool = True,
+    sink: DiffSink | None = None,
+) -> PatchResult:
+    """Apply patch operations to an in-memory worksheet.
+
+    Inserts are planned up front and materialized in one rebuild pass,
+    updates are written at their final rows, and (optionally) the No.
+    column is renumbered from the first row that changed.
+
+    With a sink, diff entries are emitted to it as they are produced
+    (warnings and inserts first, then updates) instead of being collected
+    in the result.
     """
-    wb = openpyxl.load_workbook(str(xlsx_path))
-    ws = wb[patch.sheet]
-
     required = ["No.", "Test ID", "Test Title"]
     header_row, header_map = _detect_header_row(ws, required)
     test_id_col = header_map["Test ID"]
+    no_col = header_map["No."]
 
-    # Identify protected columns
-    protected_cols: set[int] = set()
-    for name, col_idx in header_map.items():
-        if _is_protected_header(name):
-            protected_cols.add(col_idx)
-
-    diff_entries: list[dict[str, Any]] = []
+    protected_cols = protected_columns(header_map)
 
-    for op in patch.operations:
-        if isinstance(op, UpdateOperation):
-            row_num = _find_row_by_test_id(
-                ws, op.test_id, header_row, test_id_col,
-                end_empty_rows=end_empty_rows,
-            )
-            if row_num is None:
-                diff_entries.append({
-                    "type": "warning",
-                    "test_id": op.test_id,
-                    "message": "Test ID not found for update; skipped.",
-                })
+    # Index Test IDs once and validate every key before modifying anything
+    index = RowIndex.build(
+        ws, header_row, test_id_col,
+        no_col=no_col if renumber else None,
+        end_empty_rows=end_empty_rows,
+    )
+    missing = preflight_missing_keys(patch.operations, index.keys())
+
+    entries = plan_operations(index, patch.operations, missing)
+    if sink is not None:
+        entries = emit_planned(entries, sink)
+    # Move the existing rows once and fill the new rows in one pass
+    inserted = index.inserted_rows()
+    first_changed = min((row for _, row, _ in inserted), default=None)
+    _rebuild_with_inserts(ws, index, header_map)
+    count("cells_written", sum(len(payload) for _, _, payload in inserted))
+
+    # Updates address rows at their final position
+    for op_idx, op in enumerate(patch.operations):
+        if not isinstance(op, UpdateOperation) or op_idx in missing:
+            continue
+        row_num = index.row_of(op.test_id)
+        entry: dict[str, Any] = {
+            "type": "update",
+            "test_id": op.test_id,
+            "changes": {},
+        }
+        for col_name, new_val in op.set_values.items():
+            if col_name not in header_map:
                 continue
-
-            entry: dict[str, Any] = {
-                "type": "update",
-                "test_id": op.test_id,
-                "changes": {},
+            col_idx = header_map[col_name]
+            if col_idx in protected_cols:
+                continue
+            old_val = ws.cell(row=row_num, column=col_idx).value
+            ws.cell(row=row_num, column=col_idx).value = new_val
+            entry["changes"][col_name] = {
+                "old": str(old_val) if old_val else "",
+                "new": str(new_val),
             }
-            for col_name, new_val in op.set_values.items():
-                if col_name not in header_map:
-                    continue
-                col_idx = header_map[col_name]
-                if col_idx in protected_cols:
-                    continue
-                old_val = ws.cell(row=row_num, column=col_idx).value
-                ws.cell(row=row_num, column=col_idx).value = new_val
-                entry["changes"][col_name] = {
-                    "old": str(old_val) if old_val else "",
-                    "new": str(new_val),
-                }
-            diff_entries.append(entry)
+            if col_idx in (test_id_col, no_col):
+                first_changed = min(row_num, first_changed or row_num)
+        count("cells_written", len(entry["changes"]))
+        if sink is not None:
+            sink.emit(entry)
+        else:
+            entries[op_idx] = entry
 
-        elif isinstance(op, InsertOperation):
-            after_row = _find_row_by_test_id(
-                ws, op.after_test_id, header_row, test_id_col,
+    result = PatchResult(diff_entries=[e for e in entries if e is not None])
+
+    if renumber:
+        start_row, start_count = index.renumber_start(first_changed)
+        with stage("renumber"):
+            result.renumbered = renumber_sheet(
+                ws, header_row, no_col, test_id_col,
                 end_empty_rows=end_empty_rows,
+                start_row=start_row,
+                start_count=start_count,
             )
-            if after_row is None:
-                diff_entries.append({
-                    "type": "warning",
-                    "test_id": op.row.get("Test ID", "?"),
-                    "message": f"after_key '{op.after_test_id}' not found; skipped.",
-                })
-                continue
+        count("cells_written", result.renumbered - start_count)
+    return result
 
-            new_row_num = _insert_row_after(ws, after_row, header_map, op.row)
-            diff_entries.append({
-                "type": "insert",
-                "test_id": op.row.get("Test ID", "?"),
-                "after_key": op.after_test_id,
-                "row_num": new_row_num,
-            })
 
+def save_workbook(wb: Workbook, output_path: str | Path) -> None:
+    """Save a workbook, creating the output directory if needed."""
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     wb.save(str(output_path))
-    wb.close()
 
-    return diff_entries
+
+def apply_patch(
+    xlsx_path: str | Path,
+    patch: PatchFile,
+    output_path: str | Path,
+    *,
+    end_empty_rows: int = 3,
+    renumber: bool = False,
+) -> list[dict[str, Any]]:
+    """Apply a patch to an Excel file and save to output_path.
+
+    Returns a list of diff entries for reporting.
+    """
+    wb = openpyxl.load_workbook(str(xlsx_path))
+    result = apply_patch_to_sheet(
+        wb[patch.sheet], patch,
+        end_empty_rows=end_empty_rows, renumber=renumber,
+    )
+    save_workbook(wb, output_path)
+    wb.close()
+    return result.diff_entries
@@ -2,7 +2,17 @@
 
 from __future__ import annotations
 
+import re
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Mapping
+from pathlib import Path
+
+import yaml
+
 from app.normalizer import normalize_for_comparison
+from app.test_items_table import TestItemsTable
+
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def is_target_row(
@@ -40,3 +50,285 @@ def is_target_row(
         return False
 
     return True
+
+
+# --- Filter expressions ---------------------------------------------------
+#
+# A small expression language over Test Items columns, compiled once and
+# evaluated over whole columns:
+#
+#     tag "#MR" and not tag "#MRExclusive"
+#         and team in ("QC(Verification)", "QC(Automation)")
+#         and (section startswith "5." or title matches "(?i)roaming")
+#
+# Predicates:
+#     tag "s"                  Remark contains s
+#     COL contains "s"         substring
+#     COL startswith "s"       prefix
+#     COL matches "regex"      re.search
+#     COL == "s", COL != "s"   equality after strip + bracket normalization
+#     COL in ("a", "b", ...)   equality with any of the values (normalized)
+# combined with not / and / or (in that precedence) and parentheses.
+#
+# COL is one of the aliases below or a column name in backquotes
+# (`Sub-section`).
+
+COLUMN_ALIASES = {
+    "id": "Test ID",
+    "section": "Section",
+    "subsection": "Sub-section",
+    "title": "Test Title",
+    "precondition": "Pre-Condition",
+    "procedure": "Test Procedure",
+    "check": "Check item",
+    "remark": "Remark",
+    "team": "チーム分担",
+}
+
+_KEYWORDS = {"and", "or", "not", "in", "tag", "contains", "startswith", "matches"}
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | `(?P<column>[^`]+)`
+      | (?P<op>==|!=|[(),])
+      | (?P<word>[A-Za-z_][A-Za-z0-9_-]*)
+    )""", re.VERBOSE)
+
+
+def _tokenize(source: str) -> list[tuple[str, str, int]]:
+    """(kind, text, position) tokens; kind is string/column/op/word/end."""
+    tokens: list[tuple[str, str, int]] = []
+    pos = 0
+    while True:
+        while pos < len(source) and source[pos].isspace():
+            pos += 1
+        if pos == len(source):
+            tokens.append(("end", "", pos))
+            return tokens
+        m = _TOKEN_RE.match(source, pos)
+        if m is None:
+            raise ValueError(f"Filter syntax error at column {pos + 1}: {source[pos:pos + 10]!r}")
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "string":
+            text = re.sub(r"\\(.)", r"\1", text[1:-1])
+        tokens.append((kind, text, m.start(kind)))
+        pos = m.end()
+
+
+class _Node(ABC):
+    """A compiled filter expression."""
+
+    @abstractmethod
+    def mask(self, table: TestItemsTable) -> list[bool]:
+        """Whether each row of the table matches."""
+
+    @abstractmethod
+    def test(self, row: Mapping[str, str]) -> bool:
+        """Whether one row matches."""
+
+
+class _Predicate(_Node):
+    """One column test, evaluated once per distinct column value."""
+
+    def __init__(self, column: str, func: Callable[[str], bool]) -> None:
+        self.column = column
+        self.func = func
+
+    def mask(self, table: TestItemsTable) -> list[bool]:
+        seen: dict[str, bool] = {}
+        out: list[bool] = []
+        for value in table.column(self.column):
+            hit = seen.get(value)
+            if hit is None:
+                hit = seen[value] = self.func(value)
+            out.append(hit)
+        return out
+
+    def test(self, row: Mapping[str, str]) -> bool:
+        return self.func(row.get(self.column) or "")
+
+
+class _Not(_Node):
+    def __init__(self, item: _Node) -> None:
+        self.item = item
+
+    def mask(self, table: TestItemsTable) -> list[bool]:
+        return [not hit for hit in self.item.mask(table)]
+
+    def test(self, row: Mapping[str, str]) -> bool:
+        return not self.item.test(row)
+
+
+class _All(_Node):
+    def __init__(self, items: list[_Node]) -> None:
+        self.items = items
+
+    def mask(self, table: TestItemsTable) -> list[bool]:
+        masks = [item.mask(table) for item in self.items]
+        return [all(hits) for hits in zip(*masks)]
+
+    def test(self, row: Mapping[str, str]) -> bool:
+        return all(item.test(row) for item in self.items)
+
+
+class _Any(_All):
+    def mask(self, table: TestItemsTable) -> list[bool]:
+        masks = [item.mask(table) for item in self.items]
+        return [any(hits) for hits in zip(*masks)]
+
+    def test(self, row: Mapping[str, str]) -> bool:
+        return any(item.test(row) for item in self.items)
+
+
+class _Parser:
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.i = 0
+
+    def _peek(self) -> tuple[str, str, int]:
+        return self.tokens[self.i]
+
+    def _next(self) -> tuple[str, str, int]:
+        token = self.tokens[self.i]
+        self.i += 1
+        return token
+
+    def _error(self, expected: str) -> ValueError:
+        _, text, pos = self._peek()
+        found = repr(text) if text else "end of filter"
+        return ValueError(f"Filter syntax error at column {pos + 1}: expected {expected}, found {found}")
+
+    def _accept(self, text: str) -> bool:
+        kind, value, _ = self._peek()
+        if kind in ("op", "word") and value == text:
+            self.i += 1
+            return True
+        return False
+
+    def _expect(self, text: str) -> None:
+        if not self._accept(text):
+            raise self._error(repr(text))
+
+    def _string(self) -> str:
+        if self._peek()[0] != "string":
+            raise self._error("a quoted string")
+        return self._next()[1]
+
+    def parse(self) -> _Node:
+        node = self._or()
+        if self._peek()[0] != "end":
+            raise self._error("'and', 'or' or end of filter")
+        return node
+
+    def _or(self) -> _Node:
+        items = [self._and()]
+        while self._accept("or"):
+            items.append(self._and())
+        return items[0] if len(items) == 1 else _Any(items)
+
+    def _and(self) -> _Node:
+        items = [self._not()]
+        while self._accept("and"):
+            items.append(self._not())
+        return items[0] if len(items) == 1 else _All(items)
+
+    def _not(self) -> _Node:
+        if self._accept("not"):
+            return _Not(self._not())
+        if self._accept("("):
+            node = self._or()
+            self._expect(")")
+            return node
+        return self._predicate()
+
+    def _predicate(self) -> _Node:
+        if self._accept("tag"):
+            tag = self._string()
+            return _Predicate("Remark", lambda v: tag in v)
+
+        kind, text, _ = self._peek()
+        if kind == "column":
+            column = text
+        elif kind == "word" and text not in _KEYWORDS:
+            if text not in COLUMN_ALIASES:
+                raise self._error(f"a column ({', '.join(COLUMN_ALIASES)} or `Name`)")
+            column = COLUMN_ALIASES[text]
+        else:
+            raise self._error("a predicate")
+        self.i += 1
+
+        if self._accept("contains"):
+            needle = self._string()
+            return _Predicate(column, lambda v: needle in v)
+        if self._accept("startswith"):
+            prefix = self._string()
+            return _Predicate(column, lambda v: v.startswith(prefix))
+        if self._accept("matches"):
+            _, _, pos = self._peek()
+            try:
+                pattern = re.compile(self._string())
+            except re.error as e:
+                raise ValueError(f"Filter regex at column {pos + 1}: {e}") from None
+            return _Predicate(column, lambda v: pattern.search(v) is not None)
+        for op in ("==", "!="):
+            if self._accept(op):
+                value = normalize_for_comparison(self._string())
+                negate = op == "!="
+                return _Predicate(
+                    column, lambda v: (normalize_for_comparison(v) == value) != negate
+                )
+        if self._accept("in"):
+            self._expect("(")
+            values = {normalize_for_comparison(self._string())}
+            while self._accept(","):
+                values.add(normalize_for_comparison(self._string()))
+            self._expect(")")
+            return _Predicate(column, lambda v: normalize_for_comparison(v) in values)
+        raise self._error("contains, startswith, matches, ==, != or in")
+
+
+class RowFilter:
+    """A compiled filter expression."""
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self._root = _Parser(source).parse()
+
+    def mask(self, table: TestItemsTable) -> list[bool]:
+        """Whether each row of table passes, evaluated column by column."""
+        return self._root.mask(table)
+
+    def matches(self, row: Mapping[str, str]) -> bool:
+        """Whether a single row dict passes."""
+        return self._root.test(row)
+
+
+def _quote(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def legacy_filter(
+    *,
+    target_tag: str = "#MR",
+    exclude_tag: str = "#MRExclusive",
+    team_value: str = "QC(Verification)",
+) -> str:
+    """Filter expression equivalent to is_target_row with these settings."""
+    parts = [f"tag {_quote(target_tag)}"]
+    if exclude_tag:
+        parts.append(f"not tag {_quote(exclude_tag)}")
+    parts.append(f"team == {_quote(team_value)}")
+    return " and ".join(parts)
+
+
+def load_filter(path: str | Path) -> str:
+    """Read a filter expression from YAML (``filter:`` key)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+    source = (data or {}).get("filter") if isinstance(data, dict) else None
+    if not isinstance(source, str) or not source.strip():
+        raise ValueError(f"{path}: no 'filter' expression found")
+    return source
@@ -0,0 +1,117 @@
+"""Generation manifest for incremental patch generation.
+
+The manifest records, per Test ID, a hash of the English source columns and
+the translated output of the last generator run, plus a fingerprint of the
+translator (rules, glossary, column mapping). A later run classifies every
+filtered row as new, changed or unchanged against it, so only new and
+changed rows need translating and patching; IDs that are no longer present
+are reported as vanished.
+
+A run writes its entries as a *pending* manifest next to the manifest. The
+pending manifest describes a patch that has not been applied yet, so it is
+only promoted (``commit_pending``) once that patch has been applied;
+regenerating before then classifies against the last applied run again and
+re-emits every row the unapplied patch carried.
+
+Stored as a single JSON document (human-readable, diffable in review).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+# Bump when the manifest layout changes (older manifests are ignored)
+_FORMAT_VERSION = 1
+
+# Row statuses, in report order
+STATUSES = ("new", "changed", "unchanged", "vanished")
+
+
+def source_hash(row: dict[str, str], columns: list[str]) -> str:
+    """Hash of a row's values in the given columns (order-sensitive)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for col in columns:
+        digest.update(str(row.get(col, "")).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class GenerationManifest:
+    """Previous run's per-Test-ID hashes and the entries of the current run."""
+
+    def __init__(self, path: str | Path, translator_version: str) -> None:
+        self.path = Path(path)
+        self.translator_version = translator_version
+        self._previous: dict[str, dict[str, Any]] = {}
+        # Every existing entry counts as changed when the translator changed
+        self.translator_changed = False
+        self._current: dict[str, dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("format") != _FORMAT_VERSION:
+            return
+        self._previous = data.get("rows", {})
+        self.translator_changed = data.get("translator") != self.translator_version
+
+    def classify(self, test_id: str, source: str) -> str:
+        """Return "new", "changed" or "unchanged" for a row of this run."""
+        entry = self._previous.get(test_id)
+        if entry is None:
+            return "new"
+        if self.translator_changed or entry.get("source") != source:
+            return "changed"
+        return "unchanged"
+
+    def output(self, test_id: str) -> dict[str, str]:
+        """Translated output stored for test_id by the previous run."""
+        return self._previous[test_id].get("output", {})
+
+    def record(self, test_id: str, source: str, output: dict[str, str]) -> None:
+        self._current[test_id] = {"source": source, "output": output}
+
+    def vanished(self) -> list[str]:
+        """IDs of the previous run that this run has not recorded, in manifest order."""
+        return [tid for tid in self._previous if tid not in self._current]
+
+    def save(self) -> None:
+        """Write the current run's entries as the pending manifest (vanished IDs are dropped)."""
+        pending = pending_path(self.path)
+        pending.parent.mkdir(parents=True, exist_ok=True)
+        tmp = pending.with_name(f".{pending.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "format": _FORMAT_VERSION,
+                    "translator": self.translator_version,
+                    "rows": self._current,
+                },
+                f,
+                ensure_ascii=False,
+                indent=1,
+            )
+        os.replace(tmp, pending)
+
+
+def pending_path(path: str | Path) -> Path:
+    """Where the run for manifest path keeps its entries until they are committed."""
+    path = Path(path)
+    return path.with_name(f"{path.name}.pending")
+
+
+def commit_pending(path: str | Path) -> bool:
+    """Make the pending manifest the manifest; return False if there is none."""
+    try:
+        os.replace(pending_path(path), path)
+    except FileNotFoundError:
+        return False
+    return True
@@ -0,0 +1,123 @@
+"""Translator backed by a remote HTTP translation service (e.g. an LLM gateway).
+
+The service takes ``POST <url>`` with a JSON body ``{"texts": [...]}`` and
+answers ``{"translations": [...]}``, one translation per text in the same
+order. ``app.translation_stub`` serves this protocol locally.
+
+translate_batch deduplicates its input, splits it into requests of
+batch_size texts and keeps up to concurrency requests in flight (asyncio
+over a thread pool, so only the standard library is needed). Failed requests
+(connection errors, timeouts, HTTP 429 and 5xx) are retried with exponential
+backoff; results are always returned in input order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import urllib.error
+import urllib.request
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TranslationError(RuntimeError):
+    """The translation service failed or answered with an invalid response."""
+
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code == 429 or exc.code >= 500
+    return isinstance(exc, (urllib.error.URLError, TimeoutError, ConnectionError))
+
+
+class HttpTranslator:
+    """Batched, concurrent client for a remote translation service."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        batch_size: int = 32,
+        concurrency: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 60.0,
+    ) -> None:
+        if batch_size < 1 or concurrency < 1 or retries < 0:
+            raise ValueError("batch_size and concurrency must be >= 1, retries >= 0")
+        self.url = url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        # Requests sent (including retries) and retries made
+        self.requests = 0
+        self.retried = 0
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the service URL (the service owns its model and prompts)."""
+        return hashlib.blake2b(self.url.encode("utf-8"), digest_size=16).hexdigest()
+
+    def translate(self, text: str) -> str:
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts: Iterable[str]) -> list[str]:
+        """Translate texts in order (must not be called from a running event loop)."""
+        return asyncio.run(self.translate_batch_async(texts))
+
+    async def translate_batch_async(self, texts: Iterable[str]) -> list[str]:
+        """Translate texts in order; blank texts are returned unchanged."""
+        texts = list(texts)
+        distinct = list(dict.fromkeys(t for t in texts if t and t.strip()))
+        if not distinct:
+            return texts
+        chunks = [
+            distinct[i:i + self.batch_size]
+            for i in range(0, len(distinct), self.batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = await asyncio.gather(
+                *(self._send(chunk, semaphore, pool) for chunk in chunks)
+            )
+        translated = dict(zip(distinct, (t for result in results for t in result)))
+        return [translated.get(text, text) for text in texts]
+
+    async def _send(
+        self,
+        chunk: list[str],
+        semaphore: asyncio.Semaphore,
+        pool: ThreadPoolExecutor,
+    ) -> list[str]:
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            async with semaphore:
+                self.requests += 1
+                try:
+                    return await loop.run_in_executor(pool, self._post, chunk)
+                except Exception as e:
+                    if not _retryable(e) or attempt == self.retries:
+                        raise TranslationError(
+                            f"{self.url}: request failed after {attempt + 1} attempt(s): {e}"
+                        ) from e
+            self.retried += 1
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+        raise AssertionError("unreachable")
+
+    def _post(self, chunk: list[str]) -> list[str]:
+        body = json.dumps({"texts": chunk}, ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = json.loads(response.read().decode("utf-8"))
+        translations = data.get("translations") if isinstance(data, dict) else None
+        if not isinstance(translations, list) or len(translations) != len(chunk):
+            raise TranslationError(
+                f"{self.url}: expected {len(chunk)} translations in the response"
+            )
+        return [str(t) for t in translations]
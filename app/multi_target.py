@@ -0,0 +1,149 @@
+"""Apply one parsed patch to many base workbooks in a process pool."""
+
+from __future__ import annotations
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import openpyxl
+
+from app.diff_report import DiffSink
+from app.excel_write import PatchResult, apply_patch_to_sheet, save_workbook
+from app.patch_model import PatchFile
+from app.profiling import stage
+from app.xlsx_surgical import apply_patch_surgical, preview_patch
+
+
+def patch_workbook(
+    base: str | Path,
+    output: str | Path,
+    patch: PatchFile,
+    *,
+    writer: str = "openpyxl",
+    end_empty_rows: int = 3,
+    dry_run: bool = False,
+    sink: DiffSink | None = None,
+) -> PatchResult:
+    """Apply a patch to one workbook with the selected writer (or preview it).
+
+    With a sink, diff entries go to it as they are produced instead of into
+    the result.
+    """
+    if dry_run:
+        # Read-only streaming pass: same report as a real run, no workbook written
+        return preview_patch(
+            base, patch, end_empty_rows=end_empty_rows, renumber=True, sink=sink,
+        )
+    if writer == "surgical":
+        return apply_patch_surgical(
+            base, patch, output,
+            end_empty_rows=end_empty_rows,
+            renumber=True,
+            sink=sink,
+        )
+    # One load, one save; everything else happens in memory
+    with stage("load"):
+        wb = openpyxl.load_workbook(str(base))
+    try:
+        with stage("apply"):
+            result = apply_patch_to_sheet(
+                wb[patch.sheet], patch,
+                end_empty_rows=end_empty_rows,
+                renumber=True,
+                sink=sink,
+            )
+        with stage("save"):
+            save_workbook(wb, output)
+    finally:
+        wb.close()
+    return result
+
+
+@dataclass
+class TargetResult:
+    """Outcome of patching one base workbook in a multi-target run."""
+    base: str
+    output: str
+    result: PatchResult | None = None
+    # "<ExceptionType>: <message>" when the workbook could not be patched
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def resolve_targets(
+    pairs: list[tuple[str, str]] | None = None,
+    base_glob: str | None = None,
+    output_dir: str | Path | None = None,
+) -> list[tuple[str, str]]:
+    """Build the (base, output) list from explicit pairs and/or a glob.
+
+    Glob matches are written to output_dir under their own file names.
+    Raises ValueError when an output would overwrite a base or another output.
+    """
+    targets = [(str(b), str(o)) for b, o in pairs or []]
+    if base_glob:
+        if output_dir is None:
+            raise ValueError("output_dir is required with base_glob")
+        for base in sorted(glob.glob(base_glob)):
+            targets.append((base, str(Path(output_dir) / Path(base).name)))
+
+    bases = {os.path.abspath(b) for b, _ in targets}
+    seen: set[str] = set()
+    for _, output in targets:
+        out = os.path.abspath(output)
+        if out in bases:
+            raise ValueError(f"Output would overwrite a base workbook: {output}")
+        if out in seen:
+            raise ValueError(f"Duplicate output path: {output}")
+        seen.add(out)
+    return targets
+
+
+def _run_target(
+    base: str, output: str, patch: PatchFile, options: dict[str, Any]
+) -> TargetResult:
+    """Pool worker: never raises, so one bad workbook cannot abort the batch."""
+    try:
+        return TargetResult(base, output, result=patch_workbook(base, output, patch, **options))
+    except Exception as e:  # noqa: BLE001 - reported per workbook
+        return TargetResult(base, output, error=f"{type(e).__name__}: {e}")
+
+
+def apply_to_targets(
+    patch: PatchFile,
+    targets: list[tuple[str, str]],
+    *,
+    workers: int | None = None,
+    **options: Any,
+) -> list[TargetResult]:
+    """Apply one patch to every (base, output) pair, in target order.
+
+    The patch is parsed once by the caller and pickled to each worker.
+    workers=None uses one process per CPU; workers=1 runs in-process.
+    options are passed to ``patch_workbook``.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(targets)))
+    if workers == 1:
+        return [_run_target(base, output, patch, options) for base, output in targets]
+
+    results: list[TargetResult] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_target, base, output, patch, options)
+            for base, output in targets
+        ]
+        for (base, output), future in zip(targets, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:  # worker crashed (e.g. BrokenProcessPool)
+                results.append(TargetResult(base, output, error=f"{type(e).__name__}: {e}"))
+    return results
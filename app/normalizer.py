@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from collections.abc import Iterable
 
 
 def normalize_cell_text(value: object) -> str:
@@ -25,6 +26,29 @@ def normalize_cell_text(value: object) -> str:
     return text.strip()
 
 
+def normalize_column(values: Iterable[object]) -> list[str]:
+    """normalize_cell_text over a whole column.
+
+    Most cells are already clean strings; they are detected with a few
+    substring checks and kept as-is instead of going through the regex.
+    """
+    result: list[str] = []
+    append = result.append
+    for value in values:
+        if (
+            type(value) is str
+            and "_x000D_" not in value
+            and "\r" not in value
+            and "\n\n\n" not in value
+            and not value[:1].isspace()
+            and not value[-1:].isspace()
+        ):
+            append(value)
+        else:
+            append(normalize_cell_text(value))
+    return result
+
+
 def normalize_brackets(text: str) -> str:
     """Normalize full-width brackets to half-width for comparison.
 
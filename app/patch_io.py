@@ -1,22 +1,45 @@
-"""YAML I/O for patch files."""
+"""YAML and JSON Lines I/O for patch files.
+
+The format is chosen by file extension: ``.jsonl`` is JSON Lines (a header
+record with the sheet and key columns, then one operation per line, read and
+written incrementally); anything else is YAML. YAML goes through libyaml's C
+loader/dumper when PyYAML was built with it.
+"""
 
 from __future__ import annotations
 
+import json
 from pathlib import Path
+from typing import IO
 
 import yaml
 
-from app.patch_model import PatchFile
+from app.patch_model import PatchFile, operation_from_dict
+
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Available patch formats, by file extension
+PATCH_FORMATS = {".yml": "yaml", ".yaml": "yaml", ".jsonl": "jsonl"}
+
+
+def patch_format(path: str | Path) -> str:
+    """Return "jsonl" or "yaml" for a patch path (unknown extensions are YAML)."""
+    return PATCH_FORMATS.get(Path(path).suffix.lower(), "yaml")
 
 
 def write_patch(patch: PatchFile, path: str | Path) -> None:
-    """Serialize a PatchFile to YAML."""
+    """Serialize a PatchFile to YAML or JSON Lines (by extension)."""
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
+        if patch_format(path) == "jsonl":
+            _write_jsonl(patch, f)
+            return
         yaml.dump(
             patch.to_dict(),
             f,
+            Dumper=_YamlDumper,
             allow_unicode=True,
             default_flow_style=False,
             sort_keys=False,
@@ -24,7 +47,38 @@ def write_patch(patch: PatchFile, path: str | Path) -> None:
 
 
 def read_patch(path: str | Path) -> PatchFile:
-    """Deserialize a YAML patch file into a PatchFile."""
+    """Deserialize a YAML or JSON Lines patch file into a PatchFile."""
+    if patch_format(path) == "jsonl":
+        return _read_jsonl(path)
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_YamlLoader)
     return PatchFile.from_dict(data)
+
+
+def _write_jsonl(patch: PatchFile, f: IO[str]) -> None:
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    f.write(dumps({"sheet": patch.sheet, "key_columns": patch.key_columns}) + "\n")
+    for op in patch.operations:
+        f.write(dumps(op.to_dict()) + "\n")
+
+
+def _read_jsonl(path: str | Path) -> PatchFile:
+    """Parse line by line; each record is dropped once its operation is built."""
+    patch = PatchFile()
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}: line {lineno}: {e}") from None
+            if "op" not in record:
+                # Header record
+                patch.sheet = record.get("sheet", patch.sheet)
+                patch.key_columns = record.get("key_columns", patch.key_columns)
+                continue
+            op = operation_from_dict(record)
+            if op is not None:
+                patch.operations.append(op)
+    return patch
@@ -0,0 +1,156 @@
+"""Merge an ordered list of patch files into one equivalent patch.
+
+Applying the merged patch once gives the same sheet as applying the inputs
+one after another:
+
+- repeated updates to the same row collapse into one update (later values win);
+- updates to a row inserted by an earlier patch are folded into that insert
+  (protected columns are skipped, as the patcher does for updates);
+- after_key references and updates follow Test IDs renamed by earlier
+  patches, so insert chains still hang off the right rows when everything is
+  planned in a single run.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.excel_write import _is_protected_header
+from app.patch_model import InsertOperation, PatchFile, UpdateOperation
+
+
+class _PendingInsert:
+    """An insert in the merged patch; after is a row key or another insert."""
+
+    __slots__ = ("after", "row")
+
+    def __init__(self, after: str | _PendingInsert, row: dict[str, Any]) -> None:
+        self.after = after
+        self.row = row
+
+    @property
+    def test_id(self) -> str:
+        return str(self.row.get("Test ID") or "").strip()
+
+
+class _PendingUpdate:
+    """Collapsed update of one row that exists before the merged patch runs."""
+
+    __slots__ = ("key", "values")
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.values: dict[str, Any] = {}
+
+
+@dataclass
+class MergeResult:
+    """Merged patch plus operations dropped because they could not apply."""
+    patch: PatchFile
+    input_operations: int = 0
+    warnings: list[str] = field(default_factory=list)
+
+
+class _Merger:
+    def __init__(self) -> None:
+        self.entries: list[_PendingInsert | _PendingUpdate] = []
+        self.updates: dict[str, _PendingUpdate] = {}
+        # Current Test ID → row it names: a key of the original sheet, a pending
+        # insert, or None once the row was renamed away. IDs not listed name
+        # themselves.
+        self.live: dict[str, str | _PendingInsert | None] = {}
+        # Renames made by the current patch; a patch resolves every key before
+        # any of its updates run, so these only apply from the next patch on
+        self.renames: dict[str, str | _PendingInsert | None] = {}
+        self.warnings: list[str] = []
+
+    def insert(self, op: InsertOperation, label: str) -> None:
+        after = self.live.get(op.after_test_id, op.after_test_id)
+        if after is None:
+            self.warnings.append(
+                f"{label}: after_key '{op.after_test_id}' was renamed by an "
+                "earlier patch; insert dropped."
+            )
+            return
+        pending = _PendingInsert(after, dict(op.row.items()))
+        self.entries.append(pending)
+        if pending.test_id:
+            self.live[pending.test_id] = pending
+
+    def update(self, op: UpdateOperation, label: str) -> None:
+        target = self.live.get(op.test_id, op.test_id)
+        if target is None:
+            self.warnings.append(
+                f"{label}: Test ID '{op.test_id}' was renamed by an earlier "
+                "patch; update dropped."
+            )
+            return
+        if isinstance(target, _PendingInsert):
+            for col_name, value in op.set_values.items():
+                if not _is_protected_header(col_name):
+                    target.row[col_name] = value
+        else:
+            pending = self.updates.get(target)
+            if pending is None:
+                pending = self.updates[target] = _PendingUpdate(target)
+                self.entries.append(pending)
+            pending.values.update(op.set_values.items())
+
+        new_id = op.set_values.get("Test ID")
+        if new_id is not None and str(new_id).strip() != op.test_id:
+            self.renames.setdefault(op.test_id, None)
+            if str(new_id).strip():
+                self.renames[str(new_id).strip()] = target
+
+    def end_patch(self) -> None:
+        self.live.update(self.renames)
+        self.renames.clear()
+
+    def operations(self) -> list[UpdateOperation | InsertOperation]:
+        ops: list[UpdateOperation | InsertOperation] = []
+        for entry in self.entries:
+            if isinstance(entry, _PendingInsert):
+                after = entry.after
+                ops.append(InsertOperation(
+                    after.test_id if isinstance(after, _PendingInsert) else after,
+                    entry.row,
+                ))
+            elif entry.values:
+                ops.append(UpdateOperation(entry.key, entry.values))
+        return ops
+
+
+def merge_patches(patches: list[PatchFile]) -> MergeResult:
+    """Merge patches (in application order) into one patch.
+
+    All patches must target the same sheet and key columns.
+    """
+    if not patches:
+        raise ValueError("No patches to merge")
+    first = patches[0]
+    for patch in patches[1:]:
+        if patch.sheet != first.sheet or patch.key_columns != first.key_columns:
+            raise ValueError(
+                f"Cannot merge patches for different sheets/keys: "
+                f"{first.sheet!r} {first.key_columns} vs {patch.sheet!r} {patch.key_columns}"
+            )
+
+    merger = _Merger()
+    total = 0
+    for patch_idx, patch in enumerate(patches, start=1):
+        for op_idx, op in enumerate(patch.operations, start=1):
+            label = f"patch {patch_idx} op {op_idx}"
+            if isinstance(op, InsertOperation):
+                merger.insert(op, label)
+            else:
+                merger.update(op, label)
+        merger.end_patch()
+        total += len(patch.operations)
+
+    merged = PatchFile(
+        sheet=first.sheet,
+        key_columns=list(first.key_columns),
+        operations=merger.operations(),
+    )
+    return MergeResult(patch=merged, input_operations=total, warnings=merger.warnings)
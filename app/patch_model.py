@@ -1,40 +1,130 @@
-"""Data models for patch operations."""
+"""Data models for patch operations.
+
+Operations are slotted records. Row values are stored as a tuple aligned to a
+column layout (a tuple of column names) interned in ``COLUMNS``, so a patch
+with thousands of operations over the same columns holds each column name
+and each distinct layout once.
+"""
 
 from __future__ import annotations
 
+import sys
+from collections.abc import Iterator, Mapping
 from dataclasses import dataclass, field
 from typing import Any
 
 
-@dataclass
+class ColumnTable:
+    """Interning table for column names and column layouts."""
+
+    __slots__ = ("_layouts",)
+
+    def __init__(self) -> None:
+        self._layouts: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+    def layout(self, names: tuple[str, ...]) -> tuple[str, ...]:
+        """Return the shared tuple for this sequence of column names."""
+        layout = self._layouts.get(names)
+        if layout is None:
+            layout = tuple(sys.intern(n) if type(n) is str else n for n in names)
+            self._layouts[layout] = layout
+        return layout
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+
+# Shared by every operation in the process
+COLUMNS = ColumnTable()
+
+
+def _split(values: Mapping[str, Any] | None) -> tuple[tuple[str, ...], tuple[Any, ...]]:
+    """(interned layout, aligned values) for a column → value mapping."""
+    if not values:
+        return (), ()
+    if isinstance(values, RowValues):
+        return values.columns, values.values
+    return COLUMNS.layout(tuple(values)), tuple(values.values())
+
+
+class RowValues(Mapping[str, Any]):
+    """Read-only mapping view over a (layout, values) pair; no dict is built."""
+
+    __slots__ = ("columns", "values")
+
+    def __init__(self, columns: tuple[str, ...], values: tuple[Any, ...]) -> None:
+        self.columns = columns
+        self.values = values
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self.values[self.columns.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def items(self) -> Iterator[tuple[str, Any]]:  # type: ignore[override]
+        return zip(self.columns, self.values)
+
+    def __repr__(self) -> str:
+        return f"RowValues({dict(self.items())!r})"
+
+
+@dataclass(slots=True, init=False)
 class UpdateOperation:
     """Update existing row identified by key."""
     test_id: str
-    set_values: dict[str, str] = field(default_factory=dict)
+    columns: tuple[str, ...]
+    values: tuple[Any, ...]
+
+    def __init__(self, test_id: str, set_values: Mapping[str, Any] | None = None) -> None:
+        self.test_id = test_id
+        self.columns, self.values = _split(set_values)
+
+    @property
+    def set_values(self) -> RowValues:
+        return RowValues(self.columns, self.values)
 
     def to_dict(self) -> dict[str, Any]:
         return {
             "op": "update",
             "key": {"Test ID": self.test_id},
-            "set": dict(self.set_values),
+            "set": dict(zip(self.columns, self.values)),
         }
 
 
-@dataclass
+@dataclass(slots=True, init=False)
 class InsertOperation:
     """Insert new row after a specific Test ID."""
     after_test_id: str
-    row: dict[str, str] = field(default_factory=dict)
+    columns: tuple[str, ...]
+    values: tuple[Any, ...]
+
+    def __init__(self, after_test_id: str, row: Mapping[str, Any] | None = None) -> None:
+        self.after_test_id = after_test_id
+        self.columns, self.values = _split(row)
+
+    @property
+    def row(self) -> RowValues:
+        return RowValues(self.columns, self.values)
 
     def to_dict(self) -> dict[str, Any]:
         return {
             "op": "insert",
             "after_key": {"Test ID": self.after_test_id},
-            "row": dict(self.row),
+            "row": dict(zip(self.columns, self.values)),
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class PatchFile:
     """Complete patch file structure."""
     sheet: str = "試験項目"
@@ -42,29 +132,31 @@ class PatchFile:
     operations: list[UpdateOperation | InsertOperation] = field(default_factory=list)
 
     def to_dict(self) -> dict[str, Any]:
+        # Built straight from the operation tuples; nothing is copied twice
         return {
             "sheet": self.sheet,
-            "key_columns": list(self.key_columns),
+            "key_columns": self.key_columns,
             "operations": [op.to_dict() for op in self.operations],
         }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> PatchFile:
         """Parse a patch dict (from YAML) into a PatchFile."""
-        ops: list[UpdateOperation | InsertOperation] = []
-        for entry in data.get("operations", []):
-            if entry["op"] == "update":
-                ops.append(UpdateOperation(
-                    test_id=entry["key"]["Test ID"],
-                    set_values=entry.get("set", {}),
-                ))
-            elif entry["op"] == "insert":
-                ops.append(InsertOperation(
-                    after_test_id=entry["after_key"]["Test ID"],
-                    row=entry.get("row", {}),
-                ))
+        ops = [
+            op for op in map(operation_from_dict, data.get("operations", []))
+            if op is not None
+        ]
         return cls(
             sheet=data.get("sheet", "試験項目"),
             key_columns=data.get("key_columns", ["Test ID"]),
             operations=ops,
         )
+
+
+def operation_from_dict(entry: dict[str, Any]) -> UpdateOperation | InsertOperation | None:
+    """Parse one operation record; None for an unknown ``op`` (ignored)."""
+    if entry["op"] == "update":
+        return UpdateOperation(entry["key"]["Test ID"], entry.get("set"))
+    if entry["op"] == "insert":
+        return InsertOperation(entry["after_key"]["Test ID"], entry.get("row"))
+    return None
@@ -0,0 +1,203 @@
+"""Pattern rules for the rule-based translator.
+
+Rules are tried in priority order and the first rule whose substitution
+changes a line rewrites it (every occurrence, as ``re.sub`` does); later
+rules are skipped. A rule that matches without changing the line does not
+stop the search.
+
+Rules anchored at the start of the line with a literal prefix
+(``^Verify\\s+...``) are keyed in a trie by that prefix, so a line only
+tries the anchored rules its own first characters select: the cost per line
+does not grow with the number of such rules. Unanchored rules (or ones
+starting with a group, class or alternation) are tried on every line.
+
+Rules can be loaded from YAML (``config/rules.yml``)::
+
+    rules:
+      - name: verify-that
+        pattern: '^Verify\\s+that\\s+(.+)'
+        replace: '\\1を確認する'
+        ignore_case: true
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Pattern characters that can form a literal prefix
+_LITERAL = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 -,:;'\"")
+_OPTIONAL = frozenset("?*{")
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """One rewrite rule: regex pattern and re.sub replacement."""
+    name: str
+    pattern: str
+    replace: str
+    ignore_case: bool = True
+
+
+# Built-in rules, used when no rules file is configured
+DEFAULT_RULES = [
+    PatternRule("capture-screenshot", r"[Cc]apture\s+a?\s*screenshot",
+                "スクリーンショットを取得する"),
+    PatternRule("verify-that", r"^Verify\s+that\s+(.+)", r"\1を確認する"),
+    PatternRule("verify", r"^Verify\s+(.+)", r"\1を確認する"),
+    PatternRule("ensure-that", r"^Ensure\s+that\s+(.+)", r"\1であることを確認する"),
+    PatternRule("ensure", r"^Ensure\s+(.+)", r"\1であることを確認する"),
+]
+
+
+def load_rules(path: str | Path) -> list[PatternRule]:
+    """Read pattern rules from a YAML file (``rules:`` list, in priority order)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+    entries: list[dict[str, Any]] = (data or {}).get("rules", []) or []
+    rules: list[PatternRule] = []
+    for i, entry in enumerate(entries, start=1):
+        try:
+            rules.append(PatternRule(
+                name=str(entry.get("name") or f"rule-{i}"),
+                pattern=str(entry["pattern"]),
+                replace=str(entry.get("replace", "")),
+                ignore_case=bool(entry.get("ignore_case", True)),
+            ))
+        except (KeyError, AttributeError) as e:
+            raise ValueError(f"{path}: rule {i}: missing or invalid field {e}") from None
+    return rules
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Literal text a match must start the line with ("" if not anchored).
+
+    Only top-level "^" anchors count: a top-level "|" lets another branch
+    match anywhere, so such patterns get no prefix.
+    """
+    if not pattern.startswith("^"):
+        return ""
+    depth = 0
+    in_class = escaped = False
+    for ch in pattern:
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return ""
+    prefix = []
+    for ch in pattern[1:]:
+        if ch not in _LITERAL:
+            if ch in _OPTIONAL:
+                prefix = prefix[:-1]  # the preceding character may be absent
+            break
+        prefix.append(ch)
+    return "".join(prefix)
+
+
+class _Trie:
+    """Rule indices keyed by literal prefix, one node per character."""
+
+    __slots__ = ("children", "rules")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Trie] = {}
+        self.rules: list[int] = []
+
+    def add(self, key: str, index: int) -> None:
+        node = self
+        for ch in key:
+            node = node.children.setdefault(ch, _Trie())
+        node.rules.append(index)
+
+
+class RuleEngine:
+    """Applies the first rule that changes a line and counts hits per rule."""
+
+    def __init__(self, rules: list[PatternRule]) -> None:
+        self.rules = list(rules)
+        names = [r.name for r in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate rule names: {names}")
+        self._compiled: list[re.Pattern[str]] = []
+        # Anchored rules by literal prefix: case-folded and case-sensitive ones
+        self._folded = _Trie()
+        self._exact = _Trie()
+        # Rules every line has to try
+        self._unanchored: list[int] = []
+        for i, rule in enumerate(self.rules):
+            flags = re.IGNORECASE if rule.ignore_case else 0
+            try:
+                self._compiled.append(re.compile(rule.pattern, flags))
+            except re.error as e:
+                raise ValueError(f"Rule '{rule.name}': {e}") from None
+            prefix = _literal_prefix(rule.pattern)
+            if not prefix:
+                self._unanchored.append(i)
+            elif rule.ignore_case:
+                self._folded.add(prefix.lower(), i)
+            else:
+                self._exact.add(prefix, i)
+        # Line character -> the ASCII character re.IGNORECASE treats it as
+        self._folds: dict[str, str] = {}
+        # Lines seen, and lines rewritten by each rule
+        self.lines = 0
+        self.hits: dict[str, int] = dict.fromkeys(names, 0)
+
+    def _fold(self, ch: str) -> str:
+        folded = self._folds.get(ch)
+        if folded is None:
+            folded = ch.lower() if ch.isascii() else next(
+                # e.g. the Kelvin sign matches "k", the long s matches "s"
+                (c for c in _LITERAL if c.islower() and re.fullmatch(c, ch, re.IGNORECASE)),
+                ch,
+            )
+            self._folds[ch] = folded
+        return folded
+
+    def _candidates(self, text: str) -> list[int]:
+        """Indices of the rules that can match text, in priority order."""
+        found: list[int] = []
+        for trie, fold in ((self._folded, self._fold), (self._exact, None)):
+            node = trie
+            for ch in text:
+                node = node.children.get(fold(ch) if fold else ch)
+                if node is None:
+                    break
+                found.extend(node.rules)
+        if not found:
+            return self._unanchored
+        return sorted(found + self._unanchored)
+
+    def apply(self, text: str) -> str:
+        """Rewrite text with the highest-priority rule that changes it."""
+        self.lines += 1
+        for index in self._candidates(text):
+            result = self._compiled[index].sub(self.rules[index].replace, text)
+            if result != text:
+                self.hits[self.rules[index].name] += 1
+                return result
+        return text
+
+    @property
+    def source(self) -> str:
+        """Stable description of the rule set (for fingerprints)."""
+        return "\x1e".join(
+            f"{r.name}\x1f{r.pattern}\x1f{r.replace}\x1f{int(r.ignore_case)}"
+            for r in self.rules
+        )
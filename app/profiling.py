@@ -0,0 +1,212 @@
+"""Per-stage wall time, CPU time and peak memory of a CLI run (--profile).
+
+Code marks its stages with ``stage(name)`` and bumps counters with
+``count(name, n)``. Both do nothing unless a Profiler is active, so library
+callers outside a profiled run pay one global lookup per call.
+
+Stage times are exclusive: a stage nested in another (header detection
+inside load) is subtracted from its parent, so the stages and the
+"(other)" row add up to the run total. Repeated stages (the load of both
+workbooks) are summed. Peak memory is the tracemalloc peak while the stage
+ran, nested stages included; tracing slows allocation-heavy code, so
+profiled timings are for comparing stages and releases, not absolute.
+
+Worker processes (``--jobs``, multi-target ``--workers``) are not profiled:
+their stages show up as time spent waiting in the parent's stage.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+_MIB = 1024 * 1024
+
+
+@dataclass
+class StageStats:
+    """Accumulated measurements of one named stage."""
+    calls: int = 0
+    # Exclusive seconds (nested stages subtracted)
+    wall: float = 0.0
+    cpu: float = 0.0
+    # Peak traced bytes while the stage ran (0 without memory tracing)
+    peak: int = 0
+
+
+class _Frame:
+    """A stage currently running."""
+
+    __slots__ = ("name", "wall", "cpu", "child_wall", "child_cpu", "peak")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.peak = 0
+
+
+class Profiler:
+    """Collects stage measurements and counters while active (a context manager)."""
+
+    def __init__(self, *, trace_memory: bool = True) -> None:
+        self.trace_memory = trace_memory
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[str, int] = {}
+        # Whole run (set on exit)
+        self.total = StageStats()
+        self._stack: list[_Frame] = []
+        self._tracing = False
+
+    def __enter__(self) -> Profiler:
+        global _active
+        if _active is not None:
+            raise RuntimeError("Another profiler is already active")
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self._stack = [self._start("")]
+        _active = self
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        global _active
+        _active = None
+        root = self._stack.pop()
+        wall, cpu = self._stop(root)
+        self.total = StageStats(1, wall, cpu, root.peak)
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure the enclosed block as stage name."""
+        stats = self.stages.setdefault(name, StageStats())
+        self._stack.append(self._start(name))
+        try:
+            yield
+        finally:
+            frame = self._stack.pop()
+            wall, cpu = self._stop(frame)
+            stats.calls += 1
+            stats.wall += wall - frame.child_wall
+            stats.cpu += cpu - frame.child_cpu
+            stats.peak = max(stats.peak, frame.peak)
+            parent = self._stack[-1]
+            parent.child_wall += wall
+            parent.child_cpu += cpu
+            parent.peak = max(parent.peak, frame.peak)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def _start(self, name: str) -> _Frame:
+        if tracemalloc.is_tracing():
+            # The parent's peak so far, before the child starts its own
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        return _Frame(name)
+
+    def _stop(self, frame: _Frame) -> tuple[float, float]:
+        wall = time.perf_counter() - frame.wall
+        cpu = time.process_time() - frame.cpu
+        if tracemalloc.is_tracing():
+            frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+        return wall, cpu
+
+    def other(self) -> StageStats:
+        """Run time outside every stage."""
+        return StageStats(
+            0,
+            self.total.wall - sum(s.wall for s in self.stages.values()),
+            self.total.cpu - sum(s.cpu for s in self.stages.values()),
+        )
+
+    def metrics(self) -> dict[str, Any]:
+        """Measurements as JSON-ready data (seconds and bytes)."""
+        def row(stats: StageStats) -> dict[str, Any]:
+            return {
+                "calls": stats.calls,
+                "wall_s": round(stats.wall, 6),
+                "cpu_s": round(stats.cpu, 6),
+                "peak_bytes": stats.peak,
+            }
+
+        return {
+            "total": row(self.total),
+            "stages": {name: row(stats) for name, stats in self.stages.items()},
+            "other": row(self.other()),
+            "counters": dict(self.counters),
+        }
+
+    def write_json(self, path: str | Path, **extra: Any) -> None:
+        """Write metrics() (plus extra top-level keys) as JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {**extra, **self.metrics()}
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    def table(self) -> str:
+        """Stages in the order they first ran, then totals and counters."""
+        name_width = max([len(name) for name in self.stages] + [len("(other)")])
+        lines = [f"{'Stage':<{name_width}}  Calls   Wall s    CPU s  Peak MiB"]
+
+        def line(name: str, stats: StageStats, calls: str) -> str:
+            peak = f"{stats.peak / _MIB:9.1f}" if stats.peak else f"{'-':>9}"
+            return (
+                f"{name:<{name_width}}  {calls:>5} {stats.wall:8.3f} "
+                f"{stats.cpu:8.3f} {peak}"
+            )
+
+        for name, stats in self.stages.items():
+            lines.append(line(name, stats, str(stats.calls)))
+        lines.append(line("(other)", self.other(), ""))
+        lines.append(line("total", self.total, ""))
+        if self.counters:
+            counter_width = max(len(name) for name in self.counters)
+            lines.append("")
+            for name, value in self.counters.items():
+                lines.append(f"{name:<{counter_width}}  {value:>12,}")
+        return "\n".join(lines)
+
+
+_active: Profiler | None = None
+_NO_STAGE = nullcontext()
+
+
+def stage(name: str) -> AbstractContextManager[None]:
+    """Measure the enclosed block as a stage of the active profiler, if any."""
+    profiler = _active
+    return _NO_STAGE if profiler is None else profiler.stage(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add n to a counter of the active profiler, if any."""
+    profiler = _active
+    if profiler is not None:
+        profiler.count(name, n)
+
+
+def _forget_in_child() -> None:
+    # A forked worker must not record into (or trace memory for) its copy
+    global _active
+    if _active is not None:
+        _active = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+if hasattr(os, "register_at_fork"):  # POSIX; spawned workers start clean
+    os.register_at_fork(after_in_child=_forget_in_child)
@@ -0,0 +1,133 @@
+"""On-disk cache for parsed workbook reads.
+
+Entries are keyed by the source file's size, mtime and content hash plus the
+read parameters, and stored as zlib-compressed ``marshal`` blobs (the cached
+values are plain lists/dicts/strings). The directory is bounded in size;
+least-recently-used entries are evicted first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import sys
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Bump when the shape of cached values changes
+_FORMAT_VERSION = 1
+
+_SUFFIX = ".bin"
+
+
+def file_fingerprint(path: str | Path) -> str:
+    """Return a fingerprint of size, mtime and content hash for a file."""
+    st = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"{st.st_size}-{st.st_mtime_ns}-{digest.hexdigest()}"
+
+
+class ReadCache:
+    """Size-bounded directory cache for projected workbook data."""
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, xlsx_path: str | Path, kind: str, params: dict[str, Any]) -> Path:
+        key_src = "|".join([
+            str(_FORMAT_VERSION),
+            f"py{sys.version_info[0]}.{sys.version_info[1]}",
+            kind,
+            file_fingerprint(xlsx_path),
+            repr(sorted(params.items())),
+        ])
+        key = hashlib.blake2b(key_src.encode("utf-8"), digest_size=16).hexdigest()
+        return self.cache_dir / f"{kind}-{key}{_SUFFIX}"
+
+    def get_or_compute(
+        self,
+        xlsx_path: str | Path,
+        kind: str,
+        params: dict[str, Any],
+        compute: Callable[[], T],
+    ) -> T:
+        """Return the cached value for (file, kind, params), computing it on a miss."""
+        entry = self._entry_path(xlsx_path, kind, params)
+        try:
+            data = entry.read_bytes()
+            value = marshal.loads(zlib.decompress(data))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            value = None
+        else:
+            self.hits += 1
+            try:
+                os.utime(entry)  # refresh for LRU eviction
+            except OSError:
+                pass  # evicted by another process since the read
+            return value
+
+        self.misses += 1
+        value = compute()
+        self._store(entry, value)
+        return value
+
+    def _store(self, entry: Path, value: Any) -> None:
+        """Write an entry; a cache directory that cannot be written is skipped."""
+        blob = zlib.compress(marshal.dumps(value), 6)
+        # Per-process name: other runs sharing the directory may store the same entry
+        tmp = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(blob)
+            os.replace(tmp, entry)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least-recently-used entries until the directory fits max_bytes.
+
+        Returns the number of entries removed.
+        """
+        entries = []
+        total = 0
+        for p in self.cache_dir.glob(f"*{_SUFFIX}"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+            total += st.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -12,6 +12,8 @@ def renumber_sheet(
     test_id_col: int,
     *,
     end_empty_rows: int = 3,
+    start_row: int | None = None,
+    start_count: int = 0,
 ) -> int:
     """Renumber the No. column (1, 2, 3, ...) for rows with non-empty Test ID.
 
@@ -21,14 +23,18 @@ def renumber_sheet(
         no_col: Column index of "No." (1-based).
         test_id_col: Column index of "Test ID" (1-based).
         end_empty_rows: Number of consecutive empty Test ID rows to detect end of data.
+        start_row: Row to resume numbering from (default: first row below header).
+            Rows above it are assumed to be numbered already; pass the row
+            right after a Test ID row so the empty-row streak starts at zero.
+        start_count: Number already assigned to rows above start_row.
 
     Returns:
         Total count of numbered rows.
     """
-    counter = 0
+    counter = start_count
     empty_streak = 0
 
-    row_idx = header_row + 1
+    row_idx = start_row if start_row is not None else header_row + 1
     max_row = ws.max_row or (header_row + 10000)
 
     while row_idx <= max_row:
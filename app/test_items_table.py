@@ -0,0 +1,78 @@
+"""Columnar in-memory store for Test Items rows.
+
+Each column is one list of strings, and equal values within a column share a
+single string object (Section, Team and Remark values repeat on most rows),
+instead of one dict per row holding every column. A Test ID → position
+index gives constant-time row lookup. Rows are materialized as dicts only on
+request, for the few rows a stage actually needs.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from itertools import compress
+
+
+def _interned(values: list[str]) -> list[str]:
+    """values with equal strings replaced by one shared object."""
+    pool: dict[str, str] = {}
+    return [pool.setdefault(v, v) for v in values]
+
+
+class TestItemsTable:
+    """Normalized Test Items columns with a Test ID index."""
+
+    __slots__ = ("names", "_columns", "_index", "_length")
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, columns: dict[str, list[str]]) -> None:
+        self.names = list(columns)
+        self._columns = {name: _interned(values) for name, values in columns.items()}
+        lengths = {len(values) for values in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns differ in length: {sorted(lengths)}")
+        self._length = lengths.pop() if lengths else 0
+        # First position of each Test ID
+        self._index: dict[str, int] = {}
+        for i, test_id in enumerate(self._columns.get("Test ID", ())):
+            self._index.setdefault(test_id, i)
+
+    @classmethod
+    def from_rows(cls, rows: list[dict[str, str]]) -> TestItemsTable:
+        """Build from already normalized row dicts (missing cells are "")."""
+        names = list(dict.fromkeys(name for row in rows for name in row))
+        return cls({name: [row.get(name, "") for row in rows] for name in names})
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, test_id: object) -> bool:
+        return test_id in self._index
+
+    def column(self, name: str) -> list[str]:
+        """Values of a column ("" for every row if the sheet lacks it)."""
+        values = self._columns.get(name)
+        return values if values is not None else [""] * self._length
+
+    def position(self, test_id: str) -> int | None:
+        """Row position of test_id, or None."""
+        return self._index.get(test_id)
+
+    def row(self, i: int) -> dict[str, str]:
+        """Row i as a dict of every column."""
+        return {name: values[i] for name, values in self._columns.items()}
+
+    def rows(self) -> Iterator[dict[str, str]]:
+        for i in range(self._length):
+            yield self.row(i)
+
+    def compress(self, mask: Iterable[bool]) -> TestItemsTable:
+        """Table of the rows whose mask entry is true, in order."""
+        mask = list(mask)
+        return TestItemsTable({
+            name: list(compress(values, mask)) for name, values in self._columns.items()
+        })
+
+    def to_columns(self) -> dict[str, list[str]]:
+        """Plain column lists (for caching)."""
+        return dict(self._columns)
@@ -0,0 +1,153 @@
+"""Persistent translation memory (SQLite).
+
+Maps a normalized source line (its content after any bullet or number
+marker, which the translator keeps as-is) plus a translator version (the
+fingerprint of the translator, e.g. a hash of the rules and glossary) to its
+Japanese translation, so lines translated by an earlier run — or by a
+teammate sharing the same memory file — are recalled instead of
+re-translated. A change to the rules or glossary changes the version, so
+stale translations are never recalled. ``translator.MemoryTranslator`` puts
+the memory in front of any translator.
+
+Reviewers can pin a hand-corrected translation for a source line. Pins apply
+to every translator version and always win over computed entries.
+
+Lookups and inserts are batched: the wrapper looks up all lines of a batch
+in a few ``IN`` queries and stores the new ones in one transaction.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import unicodedata
+from collections.abc import Iterable
+from pathlib import Path
+
+# Bump when the schema changes (files of another version are refused, not
+# rebuilt: pins are hand-made and cannot be recomputed)
+_SCHEMA_VERSION = 1
+
+# Host parameters per query, well below SQLite's limit
+_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    source TEXT NOT NULL,
+    version TEXT NOT NULL,
+    target TEXT NOT NULL,
+    PRIMARY KEY (source, version)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pins (
+    source TEXT PRIMARY KEY,
+    target TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def normalize_source(line: str) -> str:
+    """Memory key for a source line (Unicode NFC)."""
+    return unicodedata.normalize("NFC", line)
+
+
+class TranslationMemory:
+    """SQLite-backed line translation memory with reviewer pins."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        try:
+            self._check_schema()
+        except BaseException:
+            self._conn.close()
+            raise
+        # Lines recalled (of which pinned) and stored through this instance
+        self.recalled = 0
+        self.pinned = 0
+        self.stored = 0
+
+    def _check_schema(self) -> None:
+        """Create the tables in a new file; refuse files of any other schema."""
+        try:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            tables = self._conn.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'table'"
+            ).fetchone()[0]
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"{self.path}: not a translation memory ({e})") from e
+        if version == 0 and tables == 0:
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+                self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        elif version != _SCHEMA_VERSION:
+            raise ValueError(
+                f"{self.path}: not a translation memory of schema version "
+                f"{_SCHEMA_VERSION} (found user_version {version})"
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> TranslationMemory:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _select(self, sql: str, keys: list[str], *params: str) -> dict[str, str]:
+        found: dict[str, str] = {}
+        for start in range(0, len(keys), _BATCH):
+            chunk = keys[start:start + _BATCH]
+            marks = ",".join("?" * len(chunk))
+            found.update(self._conn.execute(sql.format(marks), (*params, *chunk)))
+        return found
+
+    def lookup(self, sources: Iterable[str], version: str) -> dict[str, str]:
+        """Translations known for the given normalized sources (pins first)."""
+        keys = list(dict.fromkeys(sources))
+        pinned = self._select("SELECT source, target FROM pins WHERE source IN ({})", keys)
+        rest = [key for key in keys if key not in pinned]
+        found = self._select(
+            "SELECT source, target FROM memory WHERE version = ? AND source IN ({})",
+            rest, version,
+        )
+        self.pinned += len(pinned)
+        self.recalled += len(pinned) + len(found)
+        return {**found, **pinned}
+
+    def store(self, entries: dict[str, str], version: str) -> None:
+        """Record computed translations for version in one transaction."""
+        if not entries:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO memory (source, version, target) VALUES (?, ?, ?)",
+                ((source, version, target) for source, target in entries.items()),
+            )
+        self.stored += len(entries)
+
+    def pin(self, source: str, target: str) -> None:
+        """Pin a hand-corrected translation for a source line."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pins (source, target) VALUES (?, ?)",
+                (normalize_source(source), target),
+            )
+
+    def unpin(self, source: str) -> bool:
+        """Remove a pin; return whether one existed."""
+        with self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM pins WHERE source = ?", (normalize_source(source),)
+            )
+        return cur.rowcount > 0
+
+    def pins(self) -> dict[str, str]:
+        """All pinned translations, by source line."""
+        return dict(self._conn.execute("SELECT source, target FROM pins ORDER BY source"))
+
+    def prune(self, keep_version: str) -> int:
+        """Drop computed entries of other translator versions; return the count."""
+        with self._conn:
+            cur = self._conn.execute("DELETE FROM memory WHERE version != ?", (keep_version,))
+        return cur.rowcount
@@ -0,0 +1,139 @@
+"""Local stand-in for the remote translation service (tests and dry runs).
+
+Serves the ``app.http_translator`` protocol, translating with the rule-based
+translator (or any callable), and can inject latency per request and fail
+the first requests with HTTP 503 to exercise retries.
+
+Usage:
+    python -m app.translation_stub --port 8765 --latency 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.translator import RuleBasedTranslator
+
+
+class StubTranslationServer:
+    """Threaded HTTP server answering translation batches."""
+
+    def __init__(
+        self,
+        translate: Callable[[str], str] | None = None,
+        *,
+        latency: float = 0.0,
+        fail_first: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.translate = translate or RuleBasedTranslator().translate
+        self.latency = latency
+        self.fail_first = fail_first
+        # Batch sizes of the requests answered, and peak requests in flight
+        self.batches: list[int] = []
+        self.peak_concurrency = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/translate"
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                texts = json.loads(self.rfile.read(length).decode("utf-8"))["texts"]
+                with stub._lock:
+                    stub._in_flight += 1
+                    stub.peak_concurrency = max(stub.peak_concurrency, stub._in_flight)
+                    fail = stub.fail_first > 0
+                    if fail:
+                        stub.fail_first -= 1
+                try:
+                    time.sleep(stub.latency)
+                    if fail:
+                        self.send_error(503, "Injected failure")
+                        return
+                    body = json.dumps(
+                        {"translations": [stub.translate(t) for t in texts]},
+                        ensure_ascii=False,
+                    ).encode("utf-8")
+                    with stub._lock:
+                        stub.batches.append(len(texts))
+                finally:
+                    with stub._lock:
+                        stub._in_flight -= 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> StubTranslationServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> StubTranslationServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local stub translation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds to wait per request"
+    )
+    parser.add_argument(
+        "--glossary", default="config/glossary.yml", help="Glossary YAML path"
+    )
+    parser.add_argument(
+        "--rules", default="config/rules.yml", help="Pattern rules YAML path"
+    )
+    args = parser.parse_args(argv)
+
+    translator = RuleBasedTranslator(args.glossary, rules_path=args.rules)
+    server = StubTranslationServer(
+        translator.translate, latency=args.latency, host=args.host, port=args.port
+    )
+    print(f"Serving translations on {server.url} (Ctrl+C to stop)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,56 +5,82 @@ Interface is designed to be swappable with an LLM-based translator in the future
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import re
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Protocol
 
-import yaml
+from app.glossary import compile_glossary, load_glossary
+from app.pattern_rules import DEFAULT_RULES, RuleEngine, load_rules
+from app.translation_memory import TranslationMemory, normalize_source
+
+# Leading whitespace and bullet/number marker, then the line's content
+_MARKER_RE = re.compile(r"^(\s*(?:[-*•]\s*|\d+[.\-]\s*|\d+-\d+[.\-]\s*|\(\d+\)\s*)?)(.*)")
 
 
 class Translator(Protocol):
-    """Translation interface for future extensibility."""
+    """Translation interface (rule-based here, remote in app.http_translator).
+
+    translate_batch returns one translation per input text, in input order;
+    fingerprint changes whenever the same input may translate differently.
+    """
+
+    @property
+    def fingerprint(self) -> str: ...
 
     def translate(self, text: str) -> str: ...
 
+    def translate_batch(self, texts: Iterable[str]) -> list[str]: ...
+
 
 class RuleBasedTranslator:
     """Rule-based translator using glossary and pattern rules."""
 
-    def __init__(self, glossary_path: str | Path | None = None) -> None:
-        self._glossary: dict[str, str] = {}
-        self._load_default_rules()
+    def __init__(
+        self,
+        glossary_path: str | Path | None = None,
+        *,
+        glossary_cache_dir: str | Path | None = None,
+        rules_path: str | Path | None = None,
+        memo_size: int = 4096,
+        jobs: int = 1,
+    ) -> None:
+        # Everything a worker process needs to build an identical translator
+        self._config = (
+            str(glossary_path) if glossary_path else None,
+            str(glossary_cache_dir) if glossary_cache_dir else None,
+            str(rules_path) if rules_path else None,
+            memo_size,
+        )
+        self.jobs = jobs
+        self._glossary = compile_glossary({})
+        self.rules = RuleEngine(
+            load_rules(rules_path) if rules_path and Path(rules_path).exists()
+            else DEFAULT_RULES
+        )
         if glossary_path and Path(glossary_path).exists():
-            self._load_glossary(glossary_path)
-
-    def _load_default_rules(self) -> None:
-        """Built-in translation rules."""
-        self._patterns: list[tuple[re.Pattern[str], str]] = [
-            # "Capture a screenshot" variants
-            (re.compile(r"[Cc]apture\s+a?\s*screenshot", re.IGNORECASE),
-             "スクリーンショットを取得する"),
-            # "Verify that ..." → "...を確認する"
-            (re.compile(r"^Verify\s+that\s+(.+)", re.IGNORECASE),
-             r"\1を確認する"),
-            # "Verify ..." → "...を確認する"
-            (re.compile(r"^Verify\s+(.+)", re.IGNORECASE),
-             r"\1を確認する"),
-            # "Ensure that ..." → "...であることを確認する"
-            (re.compile(r"^Ensure\s+that\s+(.+)", re.IGNORECASE),
-             r"\1であることを確認する"),
-            # "Ensure ..." → "...であることを確認する"
-            (re.compile(r"^Ensure\s+(.+)", re.IGNORECASE),
-             r"\1であることを確認する"),
-        ]
+            self._glossary = load_glossary(glossary_path, cache_dir=glossary_cache_dir)
+        # Bounded LRU memo of translated lines. Rules and glossary are fixed for
+        # the lifetime of the instance, so the line alone is the key (the memo
+        # is per instance, never shared across rule sets). Rule hit counts only
+        # see memo misses.
+        self._memo_line = (
+            functools.lru_cache(maxsize=memo_size)(self._translate_line)
+            if memo_size > 0 else self._translate_line
+        )
+        # Memo (hits, misses) of worker processes, see _translate_parallel
+        self._worker_memo = (0, 0)
 
-    def _load_glossary(self, path: str | Path) -> None:
-        """Load glossary from YAML file."""
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-        if isinstance(data, dict):
-            for section in data.values():
-                if isinstance(section, dict):
-                    self._glossary.update(section)
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the loaded rules and glossary; changes when output may change."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.rules.source.encode())
+        digest.update(self._glossary.digest.encode())
+        return digest.hexdigest()
 
     def translate(self, text: str) -> str:
         """Translate English text to Japanese using rules + glossary.
@@ -71,20 +97,65 @@ class RuleBasedTranslator:
         translated_lines: list[str] = []
 
         for line in lines:
-            translated_lines.append(self._translate_line(line))
+            translated_lines.append(self._memo_line(line))
 
         return "\n".join(translated_lines)
 
+    def translate_batch(self, texts: Iterable[str]) -> list[str]:
+        """Translate texts in order, translating each distinct text only once.
+
+        With jobs > 1 the distinct texts are translated in a process pool.
+        """
+        texts = list(texts)
+        distinct = list(dict.fromkeys(texts))
+        if self.jobs > 1 and len(distinct) > 1:
+            done = self._translate_parallel(distinct)
+        else:
+            done = {text: self.translate(text) for text in distinct}
+        return [done[text] for text in texts]
+
+    def _translate_parallel(self, distinct: list[str]) -> dict[str, str]:
+        """Translate distinct texts in worker processes, merged in input order.
+
+        Each worker builds its own translator from the same glossary and
+        rules files; the workers' rule hits and memo counts are merged back.
+        """
+        workers = min(self.jobs, len(distinct))
+        # A few chunks per worker to even out uneven texts
+        size = -(-len(distinct) // (workers * 4))
+        chunks = [distinct[i:i + size] for i in range(0, len(distinct), size)]
+
+        done: dict[str, str] = {}
+        memo_hits, memo_misses = self._worker_memo
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self._config,)
+        ) as pool:
+            results = pool.map(_translate_chunk, chunks)
+            for chunk, (out, hits, lines, memo) in zip(chunks, results):
+                done.update(zip(chunk, out))
+                for name, count in hits.items():
+                    self.rules.hits[name] += count
+                self.rules.lines += lines
+                memo_hits += memo[0]
+                memo_misses += memo[1]
+        self._worker_memo = (memo_hits, memo_misses)
+        return done
+
+    def memo_info(self) -> tuple[int, int]:
+        """(hits, misses) of the line memo, including worker processes'."""
+        hits, misses = self._worker_memo
+        if not hasattr(self._memo_line, "cache_info"):
+            return hits, misses
+        info = self._memo_line.cache_info()
+        return info.hits + hits, info.misses + misses
+
     def _translate_line(self, line: str) -> str:
         """Translate a single line, preserving leading markers."""
         if not line.strip():
             return line
 
         # Preserve leading whitespace and bullet/number markers
-        match = re.match(
-            r"^(\s*(?:[-*•]\s*|\d+[.\-]\s*|\d+-\d+[.\-]\s*|\(\d+\)\s*)?)(.*)",
-            line,
-        )
+        match = _MARKER_RE.match(line)
         if not match:
             return self._apply_translation(line)
 
@@ -101,15 +172,120 @@ class RuleBasedTranslator:
         """Apply pattern rules and glossary substitution."""
         result = text
 
-        # Apply pattern rules (only if the whole line matches)
-        for pattern, replacement in self._patterns:
-            new_result = pattern.sub(replacement, result)
-            if new_result != result:
-                result = new_result
-                break
+        # Apply the first matching pattern rule
+        result = self.rules.apply(result)
 
-        # Apply glossary (case-insensitive word replacement)
-        for eng, jpn in self._glossary.items():
-            result = re.sub(re.escape(eng), jpn, result, flags=re.IGNORECASE)
+        # Apply glossary (case-insensitive, longest term first, one pass)
+        result = self._glossary.sub(result)
 
         return result
+
+
+class MemoryTranslator:
+    """Any Translator behind a persistent translation memory.
+
+    The memory works per line: the content of every line of a batch (after
+    its bullet or number marker, which is kept as-is) is looked up in one go,
+    the lines it does not know are passed on to the wrapped translator as one
+    batch of single lines, and their translations are stored afterwards.
+    Entries are versioned by the wrapped translator's fingerprint.
+    """
+
+    def __init__(self, inner: Translator, memory: TranslationMemory) -> None:
+        self.inner = inner
+        self.memory = memory
+        # Pins change the output without changing the wrapped translator
+        self._pins = hashlib.blake2b(
+            repr(sorted(memory.pins().items())).encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the wrapped translator's fingerprint and the pins."""
+        return hashlib.blake2b(
+            f"{self.inner.fingerprint}\x1f{self._pins}".encode(), digest_size=16
+        ).hexdigest()
+
+    def translate(self, text: str) -> str:
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts: Iterable[str]) -> list[str]:
+        """Translate texts in order, recalling known lines from the memory."""
+        texts = list(texts)
+        # Distinct non-blank lines: (kept prefix, memory key or None)
+        lines: dict[str, tuple[str, str | None]] = {}
+        for text in dict.fromkeys(texts):
+            if text and text.strip():
+                for line in text.split("\n"):
+                    if line not in lines:
+                        lines[line] = _split_line(line)
+
+        version = self.inner.fingerprint
+        recalled = self.memory.lookup(
+            sorted({key for _, key in lines.values() if key is not None}), version
+        )
+        pending = [
+            line for line, (_, key) in lines.items()
+            if key is not None and key not in recalled
+        ]
+        translated = dict(zip(pending, self.inner.translate_batch(pending)))
+
+        learned: dict[str, str] = {}
+        done: dict[str, str] = {}
+        for line, (prefix, key) in lines.items():
+            if key is None:
+                done[line] = line
+            elif key in recalled:
+                done[line] = prefix + recalled[key]
+            else:
+                done[line] = out = translated[line]
+                if out.startswith(prefix):
+                    learned.setdefault(key, out[len(prefix):])
+        self.memory.store(learned, version)
+        return [
+            "\n".join(done[line] for line in text.split("\n"))
+            if text and text.strip() else text
+            for text in texts
+        ]
+
+
+def _split_line(line: str) -> tuple[str, str | None]:
+    """(leading whitespace and marker, memory key of the content or None if blank)."""
+    match = _MARKER_RE.match(line)
+    prefix, content = match.group(1), match.group(2)
+    if not content.strip():
+        return prefix, None
+    return prefix, normalize_source(content)
+
+
+# Translator of a worker process in RuleBasedTranslator._translate_parallel
+_worker: RuleBasedTranslator | None = None
+
+
+def _init_worker(config: tuple[str | None, str | None, str | None, int]) -> None:
+    global _worker
+    glossary_path, glossary_cache_dir, rules_path, memo_size = config
+    _worker = RuleBasedTranslator(
+        glossary_path,
+        glossary_cache_dir=glossary_cache_dir,
+        rules_path=rules_path,
+        memo_size=memo_size,
+    )
+
+
+def _translate_chunk(
+    texts: list[str],
+) -> tuple[list[str], dict[str, int], int, tuple[int, int]]:
+    """Translate texts in a worker; return them with the worker's stat deltas."""
+    translator = _worker
+    hits_before = dict(translator.rules.hits)
+    lines_before = translator.rules.lines
+    memo_before = translator.memo_info()
+    out = [translator.translate(text) for text in texts]
+    memo_after = translator.memo_info()
+    return (
+        out,
+        {name: n - hits_before[name] for name, n in translator.rules.hits.items()},
+        translator.rules.lines - lines_before,
+        (memo_after[0] - memo_before[0], memo_after[1] - memo_before[1]),
+    )
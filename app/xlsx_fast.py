@@ -0,0 +1,346 @@
+"""Lightweight .xlsx reader that parses sheet XML directly from the zip.
+
+Only cell values are materialized: no styles, formulas, drawings or cell
+objects are built, which makes projection reads much cheaper than
+``openpyxl.load_workbook``. Values match openpyxl's
+``read_only=True, data_only=True`` mode (shared strings without phonetic
+runs, int/float casting, date-formatted numbers as datetimes). With
+``formulas=True`` formula cells yield their ``=...`` text instead, as openpyxl
+does without ``data_only``.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from xml.etree.ElementTree import iterparse
+
+from openpyxl.formula.translate import Translator
+from openpyxl.styles.numbers import (
+    BUILTIN_FORMATS,
+    is_date_format,
+    is_timedelta_format,
+)
+from openpyxl.utils.datetime import MAC_EPOCH, WINDOWS_EPOCH, from_excel, from_ISO8601
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW_TAG = f"{_NS_MAIN}row"
+_CELL_TAG = f"{_NS_MAIN}c"
+_VALUE_TAG = f"{_NS_MAIN}v"
+_FORMULA_TAG = f"{_NS_MAIN}f"
+_INLINE_TAG = f"{_NS_MAIN}is"
+_TEXT_TAG = f"{_NS_MAIN}t"
+_RUN_TAG = f"{_NS_MAIN}r"
+_SI_TAG = f"{_NS_MAIN}si"
+_DIMENSION_TAG = f"{_NS_MAIN}dimension"
+_SHEET_DATA_TAG = f"{_NS_MAIN}sheetData"
+
+_column_cache: dict[str, int] = {}
+
+
+def split_coordinate(ref: str) -> tuple[int, int]:
+    """Split an A1-style reference into (row, column), both 1-based."""
+    i = 0
+    while i < len(ref) and ref[i].isalpha():
+        i += 1
+    letters = ref[:i]
+    col = _column_cache.get(letters)
+    if col is None:
+        col = 0
+        for ch in letters.upper():
+            col = col * 26 + (ord(ch) - 64)
+        _column_cache[letters] = col
+    return int(ref[i:]), col
+
+
+def _cast_number(value: str) -> int | float:
+    """Convert a numeric cell string to int or float (openpyxl rules)."""
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _text_content(node: Any) -> str:
+    """Concatenate plain and rich-text runs of an <si>/<is> node, skipping rPh."""
+    parts: list[str] = []
+    for child in node:
+        if child.tag == _TEXT_TAG:
+            if child.text:
+                parts.append(child.text)
+        elif child.tag == _RUN_TAG:
+            t = child.find(_TEXT_TAG)
+            if t is not None and t.text:
+                parts.append(t.text)
+    return "".join(parts)
+
+
+class FastWorkbook:
+    """Minimal workbook handle: sheet lookup by name and lazy shared data."""
+
+    def __init__(self, xlsx_path: str | Path, *, formulas: bool = False) -> None:
+        self._zip = zipfile.ZipFile(str(xlsx_path))
+        self.formulas = formulas
+        self._sheet_members: dict[str, str] = {}
+        self.epoch = WINDOWS_EPOCH
+        self._shared_strings: list[str] | None = None
+        self._date_styles: set[int] | None = None
+        self._timedelta_styles: set[int] = set()
+        self._read_workbook()
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return list(self._sheet_members)
+
+    def __getitem__(self, name: str) -> FastWorksheet:
+        if name not in self._sheet_members:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        return FastWorksheet(self, self._sheet_members[name])
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self) -> FastWorkbook:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _read_workbook(self) -> None:
+        """Resolve sheet names to zip members via workbook.xml and its rels."""
+        targets: dict[str, str] = {}
+        with self._zip.open("xl/_rels/workbook.xml.rels") as f:
+            for _, el in iterparse(f):
+                if el.tag == f"{_NS_PKG_REL}Relationship":
+                    targets[el.get("Id", "")] = el.get("Target", "")
+
+        with self._zip.open("xl/workbook.xml") as f:
+            for _, el in iterparse(f):
+                if el.tag == f"{_NS_MAIN}workbookPr":
+                    if el.get("date1904") in ("1", "true"):
+                        self.epoch = MAC_EPOCH
+                elif el.tag == f"{_NS_MAIN}sheet":
+                    target = targets.get(el.get(f"{_NS_DOC_REL}id", ""), "")
+                    if target.startswith("/"):
+                        member = target.lstrip("/")
+                    else:
+                        member = posixpath.normpath(posixpath.join("xl", target))
+                    self._sheet_members[el.get("name", "")] = member
+
+    @property
+    def shared_strings(self) -> list[str]:
+        if self._shared_strings is None:
+            strings: list[str] = []
+            if "xl/sharedStrings.xml" in self._zip.namelist():
+                with self._zip.open("xl/sharedStrings.xml") as f:
+                    for _, el in iterparse(f):
+                        if el.tag == _SI_TAG:
+                            strings.append(_text_content(el).replace("x005F_", ""))
+                            el.clear()
+            self._shared_strings = strings
+        return self._shared_strings
+
+    @property
+    def date_styles(self) -> set[int]:
+        """Indices of cellXfs entries whose number format is a date/time."""
+        if self._date_styles is None:
+            self._date_styles = set()
+            if "xl/styles.xml" in self._zip.namelist():
+                self._read_styles()
+        return self._date_styles
+
+    @property
+    def timedelta_styles(self) -> set[int]:
+        """Indices of cellXfs entries whose number format is a duration."""
+        self.date_styles  # populates both sets
+        return self._timedelta_styles
+
+    def _read_styles(self) -> None:
+        custom: dict[int, str] = {}
+        xf_formats: list[int] = []
+        in_cell_xfs = False
+        with self._zip.open("xl/styles.xml") as f:
+            for event, el in iterparse(f, events=("start", "end")):
+                if el.tag == f"{_NS_MAIN}cellXfs":
+                    in_cell_xfs = event == "start"
+                elif event != "end":
+                    continue
+                elif el.tag == f"{_NS_MAIN}numFmt":
+                    custom[int(el.get("numFmtId", "0"))] = el.get("formatCode", "")
+                elif el.tag == f"{_NS_MAIN}xf" and in_cell_xfs:
+                    xf_formats.append(int(el.get("numFmtId", "0")))
+
+        assert self._date_styles is not None
+        for idx, fmt_id in enumerate(xf_formats):
+            fmt = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id, "General"))
+            if is_date_format(fmt):
+                self._date_styles.add(idx)
+            if is_timedelta_format(fmt):
+                self._timedelta_styles.add(idx)
+
+    def open_member(self, member: str) -> Any:
+        return self._zip.open(member)
+
+    def has_member(self, member: str) -> bool:
+        return member in self._zip.NameToInfo
+
+    def member_of(self, sheet_name: str) -> str:
+        """Zip member name of a worksheet's XML part."""
+        if sheet_name not in self._sheet_members:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+        return self._sheet_members[sheet_name]
+
+    def convert_value(self, data_type: str, style: str | None, value: str | None) -> Any:
+        """Convert a raw <v> string to a Python value (openpyxl data_only rules)."""
+        if value is None:
+            return None
+        if data_type == "n":
+            number = _cast_number(value)
+            if style and int(style) in self.date_styles:
+                style_id = int(style)
+                try:
+                    return from_excel(
+                        number, self.epoch,
+                        timedelta=style_id in self.timedelta_styles,
+                    )
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return number
+        if data_type == "s":
+            return self.shared_strings[int(value)]
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            return from_ISO8601(value)
+        return value
+
+
+class FastWorksheet:
+    """Row-tuple view of one worksheet, compatible with ``iter_rows(values_only=True)``."""
+
+    def __init__(self, workbook: FastWorkbook, member: str) -> None:
+        self._wb = workbook
+        self._member = member
+        self._max_row: int | None = None
+        # Shared formula masters seen so far: si → (formula, coordinate)
+        self._shared: dict[str, tuple[str, str]] = {}
+
+    @property
+    def max_row(self) -> int | None:
+        """Last row according to the sheet's <dimension> element, if present."""
+        if self._max_row is None:
+            with self._wb.open_member(self._member) as f:
+                for _, el in iterparse(f):
+                    if el.tag == _DIMENSION_TAG:
+                        ref = el.get("ref", "").split(":")[-1]
+                        if ref:
+                            self._max_row = split_coordinate(ref)[0]
+                        break
+                    if el.tag == _SHEET_DATA_TAG or el.tag == _ROW_TAG:
+                        break
+        return self._max_row
+
+    def iter_rows(
+        self,
+        min_row: int = 1,
+        max_row: int | None = None,
+        min_col: int = 1,
+        max_col: int | None = None,
+        values_only: bool = True,
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yield one tuple of cell values per row, filling gaps with empty rows.
+
+        Tuples cover min_col..max_col (max_col defaults to the sheet dimension
+        when known).
+        """
+        if not values_only:
+            raise ValueError("FastWorksheet only supports values_only=True")
+        if min_col > 1:
+            for values in self.iter_rows(min_row, max_row, 1, max_col):
+                yield values[min_col - 1:]
+            return
+
+        width = max_col
+        counter = min_row
+        self._shared = {}
+        truncated = False
+        with self._wb.open_member(self._member) as f:
+            sheet_data = None
+            for event, el in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if el.tag == _SHEET_DATA_TAG:
+                        sheet_data = el
+                    continue
+                if el.tag == _DIMENSION_TAG and width is None:
+                    ref = el.get("ref", "")
+                    if ref:
+                        # "A1:K40", or a single cell such as "A1"
+                        width = split_coordinate(ref.split(":")[-1])[1]
+                elif el.tag == _ROW_TAG:
+                    r = el.get("r")
+                    row_idx = int(r) if r else counter
+                    if max_row is not None and row_idx > max_row:
+                        truncated = True
+                        break
+                    if row_idx >= counter:
+                        empty = (None,) * (width or 0)
+                        while counter < row_idx:
+                            counter += 1
+                            yield empty
+                        counter += 1
+                        yield self._parse_row(el, width)
+                    if sheet_data is not None:
+                        sheet_data.clear()
+
+        # Like openpyxl, pad up to max_row only when the sheet extends past it
+        if truncated and max_row is not None:
+            empty = (None,) * (width or 0)
+            while counter <= max_row:
+                counter += 1
+                yield empty
+
+    def _parse_row(self, row_el: Any, width: int | None) -> tuple[Any, ...]:
+        values: list[Any] = [None] * (width or 0)
+        col = 0
+        for c in row_el:
+            if c.tag != _CELL_TAG:
+                continue
+            ref = c.get("r")
+            col = split_coordinate(ref)[1] if ref else col + 1
+            if width is not None and col > width:
+                break  # cells are stored in column order
+            if col > len(values):
+                values.extend([None] * (col - len(values)))
+            values[col - 1] = self._cell_value(c)
+        return tuple(values)
+
+    def _cell_value(self, c: Any) -> Any:
+        if self._wb.formulas:
+            f = c.find(_FORMULA_TAG)
+            if f is not None:
+                return self._formula(c, f)
+        data_type = c.get("t", "n")
+        if data_type == "inlineStr":
+            child = c.find(_INLINE_TAG)
+            return _text_content(child) if child is not None else None
+        return self._wb.convert_value(data_type, c.get("s"), c.findtext(_VALUE_TAG) or None)
+
+    def _formula(self, c: Any, f: Any) -> str:
+        """Formula text of a cell; shared-formula dependents are translated."""
+        text = "=" + (f.text or "")
+        if f.get("t") != "shared":
+            return text
+        si, coord = f.get("si", ""), c.get("r")
+        if f.text:
+            if coord:
+                self._shared[si] = (text, coord)
+            return text
+        master = self._shared.get(si)
+        if master is None or not coord:
+            return text
+        return Translator(master[0], origin=master[1]).translate_formula(coord)
@@ -0,0 +1,1054 @@
+"""Surgical .xlsx writer: patch one worksheet without re-saving the workbook.
+
+``openpyxl`` loads every part of the package and re-serializes all of them on
+save. This writer instead copies the original zip member by member: the
+target worksheet XML is rewritten as a stream of ``<row>`` elements (rows that
+neither move nor change are passed through verbatim), and only the parts that
+must follow the change are touched:
+
+- ``sharedStrings.xml`` gets the new strings appended;
+- ``calcChain.xml`` is dropped when formula cells move, and ``workbook.xml``
+  asks Excel for a full recalculation on load;
+- cell ranges of the sheet (dimension, merged cells, conditional formatting,
+  data validation, auto filter) and comment anchors follow inserted rows.
+
+Every other member is copied as its original compressed bytes.
+
+Semantics match ``excel_write.apply_patch_to_sheet``: the same planning,
+template-row formatting for inserts, update order and No. renumbering.
+Formula text is not rewritten for moved rows, as with the openpyxl writer.
+Drawing (image/shape) anchors are left in place.
+"""
+
+from __future__ import annotations
+
+import codecs
+import html
+import os
+import posixpath
+import re
+import struct
+import tempfile
+import zipfile
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.formula.translate import Translator
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.exceptions import IllegalCharacterError
+
+from app.diff_report import DiffSink
+from app.excel_read import detect_header_row
+from app.excel_write import (
+    PatchResult,
+    RowIndex,
+    emit_planned,
+    plan_operations,
+    preflight_missing_keys,
+    protected_columns,
+)
+from app.patch_model import PatchFile, RowValues, UpdateOperation
+from app.profiling import count, stage
+from app.xlsx_fast import FastWorkbook, split_coordinate
+
+_MAX_ROW = 1048576
+
+_REL_COMMENTS = "/comments"
+_REL_VML = "/vmlDrawing"
+_REL_CALC_CHAIN = "/calcChain"
+
+_CELL_RE = re.compile(r"<c\b[^>]*?/>|<c\b[^>]*>.*?</c>", re.S)
+_START_TAG_RE = re.compile(r"<(\w+)\b([^>]*?)(/?)>")
+_ATTR_RE = re.compile(r'([\w:]+)="([^"]*)"')
+_FORMULA_RE = re.compile(r"<f\b([^>]*?)(?:/>|>(.*?)</f>)", re.S)
+_VALUE_RE = re.compile(r"<v>(.*?)</v>", re.S)
+_INLINE_RE = re.compile(r"<is>(.*?)</is>", re.S)
+_PHONETIC_RE = re.compile(r"<rPh\b.*?</rPh>", re.S)
+_TEXT_RE = re.compile(r"<t\b[^>]*?(?:/>|>(.*?)</t>)", re.S)
+_COORD_RE = re.compile(r"(\$?[A-Z]{1,3})(\$?)(\d+)")
+_RANGE_ATTR_RE = re.compile(r'(\s(?:ref|sqref)=")([^"]*)(")')
+_XM_SQREF_RE = re.compile(r"(<xm:sqref>)(.*?)(</xm:sqref>)", re.S)
+_SHEET_DATA_RE = re.compile(r"<sheetData\b[^>]*?(/?)>")
+_DIMENSION_RE = re.compile(r'(<dimension\b[^>]*?\sref=")([^"]*)(")')
+_ROW_R_RE = re.compile(r'(\sr=")(\d+)(")')
+_CELL_R_RE = re.compile(r'(<c\b[^>]*?\sr="\$?[A-Z]+)(\d+)(")')
+_F_REF_RE = re.compile(r'(<f\b[^>]*?\sref=")([^"]*)(")')
+
+
+def _find_cell(xml: str, col: int, row: int) -> tuple[int, int] | None:
+    """(start, end) of the <c> element for (row, col) in a row's XML, if present."""
+    pos = xml.find(f' r="{get_column_letter(col)}{row}"')
+    if pos < 0:
+        return None
+    start = xml.rfind("<c", 0, pos)
+    gt = xml.find(">", pos)
+    if xml[gt - 1] == "/":
+        return start, gt + 1
+    return start, xml.find("</c>", gt) + len("</c>")
+
+
+def _remap_ranges(ranges: str, moved: Callable[[int], int]) -> str:
+    """Move the row part of every A1 coordinate in a space-separated list."""
+    return _COORD_RE.sub(
+        lambda m: f"{m[1]}{m[2]}{min(moved(int(m[3])), _MAX_ROW)}", ranges
+    )
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _text_xml(text: str) -> str:
+    if ILLEGAL_CHARACTERS_RE.search(text):
+        raise IllegalCharacterError(f"{text} cannot be used in worksheets.")
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f"<t{space}>{_escape(text)}</t>"
+
+
+def _rich_text(xml: str) -> str:
+    """Plain text of an <si>/<is> body, skipping phonetic runs."""
+    xml = _PHONETIC_RE.sub("", xml)
+    return "".join(html.unescape(m[1] or "") for m in _TEXT_RE.finditer(xml))
+
+
+class _SharedStrings:
+    """New shared strings to append after the existing table."""
+
+    def __init__(self, existing: int | None) -> None:
+        # None: the package has no shared string table (use inline strings)
+        self.existing = existing
+        self.added: dict[str, int] = {}
+        self.references = 0
+
+    def index(self, text: str) -> int:
+        assert self.existing is not None
+        self.references += 1
+        idx = self.added.get(text)
+        if idx is None:
+            idx = self.added[text] = self.existing + len(self.added)
+        return idx
+
+    def rewrite(self, src: IO[bytes]) -> Iterator[bytes]:
+        """Stream the original table with updated counts and new items."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        buf = ""
+        head_done = False
+        closing = "</sst>"
+        for chunk in iter(lambda: src.read(1 << 16), b""):
+            buf += decoder.decode(chunk)
+            if not head_done:
+                m = re.search(r"<sst\b[^>]*?/?>", buf)
+                if m is None:
+                    continue
+                tag = self._counted(m[0])
+                if tag.endswith("/>"):
+                    tag = tag[:-2] + ">" + closing
+                buf = buf[:m.start()] + tag + buf[m.end():]
+                head_done = True
+            # Hold back enough text to find the closing tag at the end
+            keep = len(closing) + 16
+            if len(buf) > keep:
+                yield buf[:-keep].encode("utf-8")
+                buf = buf[-keep:]
+        buf += decoder.decode(b"", True)
+        pos = buf.rfind(closing)
+        items = "".join(
+            f"<si>{_text_xml(text)}</si>" for text in self.added
+        )
+        yield (buf[:pos] + items + buf[pos:]).encode("utf-8")
+
+    def _counted(self, tag: str) -> str:
+        attrs = dict(_ATTR_RE.findall(tag))
+        counts = {
+            "count": int(attrs.get("count", self.existing or 0)) + self.references,
+            "uniqueCount": int(attrs.get("uniqueCount", self.existing or 0)) + len(self.added),
+        }
+        for name, value in counts.items():
+            if f' {name}="' in tag:
+                tag = re.sub(rf'(\s{name}=")\d*(")', rf"\g<1>{value}\g<2>", tag)
+            else:
+                tag = tag.replace("<sst", f'<sst {name}="{value}"', 1)
+        return tag
+
+
+class _Cell:
+    """One <c> element, parsed lazily from its raw XML."""
+
+    __slots__ = ("col", "attrs", "inner", "value_set", "value")
+
+    def __init__(self, col: int, attrs: dict[str, str], inner: str) -> None:
+        self.col = col
+        self.attrs = attrs
+        self.inner = inner
+        # Python value assigned by this patch (avoids decoding our own XML)
+        self.value_set = False
+        self.value: Any = None
+
+    @classmethod
+    def parse(cls, xml: str, col: int) -> _Cell:
+        m = _START_TAG_RE.match(xml)
+        assert m is not None
+        inner = "" if m[3] else xml[m.end():-4]
+        return cls(col, dict(_ATTR_RE.findall(m[2])), inner)
+
+    def formula(self) -> tuple[dict[str, str], str | None] | None:
+        """Return (f attributes, unescaped text or None) if the cell has <f>."""
+        m = _FORMULA_RE.search(self.inner)
+        if m is None:
+            return None
+        text = html.unescape(m[2]) if m[2] is not None else None
+        return dict(_ATTR_RE.findall(m[1])), text
+
+    def to_xml(self, row: int) -> str:
+        attrs = {"r": f"{get_column_letter(self.col)}{row}", **self.attrs}
+        attrs["r"] = f"{get_column_letter(self.col)}{row}"
+        head = "<c" + "".join(f' {k}="{v}"' for k, v in attrs.items())
+        if not self.inner:
+            return head + "/>"
+        return f"{head}>{self.inner}</c>"
+
+
+class _SheetRewriter:
+    """Rewrite the sheet XML with planned inserts, updates and renumbering."""
+
+    def __init__(
+        self,
+        wb: FastWorkbook,
+        index: RowIndex,
+        header_map: dict[str, int],
+        strings: _SharedStrings,
+    ) -> None:
+        self.wb = wb
+        self.index = index
+        self.header_map = header_map
+        self.strings = strings
+        self.moved = index.original_row_mapper()
+        # Template original row → [(final row, payload)] of rows inserted after it
+        self.inserts: dict[int, list[tuple[int, RowValues]]] = {}
+        for template_row, final_row, payload in sorted(
+            index.inserted_rows(), key=lambda item: item[1]
+        ):
+            self.inserts.setdefault(template_row, []).append((final_row, payload))
+        # Final row → [(op index, column values to set)], in patch order
+        self.updates: dict[int, list[tuple[int, UpdateOperation, dict[str, int]]]] = {}
+        self.entries: list[dict[str, Any] | None] = []
+        # Receives update entries in patch order, if set; entries of updates
+        # reached out of order wait in self.entries until the earlier ones land
+        self.sink: DiffSink | None = None
+        self.update_order: list[int] = []
+        self._next_update = 0
+        # Shared formulas: si → (master formula, master coordinate, row shift)
+        self.masters: dict[str, tuple[str, str, int]] = {}
+        # Shared formula groups whose master cell was overwritten
+        self.broken: set[str] = set()
+        self.changed = False
+        self.formulas_changed = False
+        self.renumber: _Renumberer | None = None
+        # Styles and formulas of the current template row: (col, style, formula)
+        self.template: list[tuple[int, str | None, str | None]] = []
+        self._last_row = 0
+        self.no_col = header_map["No."]
+        self.test_id_col = header_map["Test ID"]
+
+    # -- streaming -------------------------------------------------------
+
+    def write(self, src: IO[bytes], out: IO[bytes]) -> None:
+        pending: list[str] = []
+        size = 0
+        for kind, text in _iter_sheet_parts(src):
+            if kind == "head":
+                pending.append(self._head(text))
+            elif kind == "tail":
+                pending.append(self._tail(text))
+            else:
+                for part in self._row(text):
+                    pending.append(part)
+                    size += len(part)
+            if size > 1 << 16:
+                out.write("".join(pending).encode("utf-8"))
+                pending, size = [], 0
+        out.write("".join(pending).encode("utf-8"))
+
+    def _head(self, text: str) -> str:
+        if not self.index.inserted_count:
+            return text
+
+        def dimension(m: re.Match[str]) -> str:
+            ref = m[2]
+            last = max((rows[-1][0] for rows in self.inserts.values()), default=0)
+            if ":" in ref:
+                start, end = ref.split(":", 1)
+                end_row, end_col = split_coordinate(end)
+                end_row = max(self.moved(end_row), last)
+                ref = f"{start}:{get_column_letter(end_col)}{min(end_row, _MAX_ROW)}"
+            return f"{m[1]}{ref}{m[3]}"
+
+        return _DIMENSION_RE.sub(dimension, text, count=1)
+
+    def _tail(self, text: str) -> str:
+        if not self.index.inserted_count:
+            return text
+        remap = lambda m: f"{m[1]}{_remap_ranges(m[2], self.moved)}{m[3]}"  # noqa: E731
+        return _XM_SQREF_RE.sub(remap, _RANGE_ATTR_RE.sub(remap, text))
+
+    def _row(self, xml: str) -> Iterator[str]:
+        m = _START_TAG_RE.match(xml)
+        assert m is not None
+        row_attrs = dict(_ATTR_RE.findall(m[2]))
+        row = int(row_attrs["r"]) if "r" in row_attrs else self._last_row + 1
+        self._last_row = row
+        final = self.moved(row)
+        inserts = self.inserts.get(row)
+        needs_cells = (
+            inserts is not None
+            or final in self.updates
+            or 't="shared"' in xml
+        )
+        renumbering = self.renumber is not None and self.renumber.active(final)
+        if renumbering and not needs_cells:
+            spliced = self._renumber_only(xml, row, final)
+            if spliced is not None:
+                yield spliced if final == row else self._shift_raw(spliced, final)
+                return
+
+        if not needs_cells and not renumbering:
+            yield xml if final == row else self._shift_raw(xml, final)
+        else:
+            cells, rest = self._parse_cells(xml, m)
+            if inserts is not None:
+                self._capture_template(row, cells)
+            if self._process(row, final, cells) or final != row:
+                yield self._row_xml(row_attrs, final, cells, rest)
+            else:
+                yield xml
+
+        for new_row, payload in inserts or ():
+            cells = self._inserted_cells(payload)
+            self._process(None, new_row, cells)
+            yield self._row_xml(row_attrs, new_row, cells, "")
+
+    def _renumber_only(self, xml: str, row: int, final: int) -> str | None:
+        """Renumber a row by splicing its No. cell; None if a full parse is needed."""
+        first = xml.find("<c")
+        if first >= 0 and ' r="' not in xml[first:xml.find(">", first)]:
+            return None
+        test_id_span = _find_cell(xml, self.test_id_col, row)
+        no_span = _find_cell(xml, self.no_col, row)
+        if test_id_span is not None and no_span is None:
+            return None
+
+        assert self.renumber is not None
+        test_id = None
+        if test_id_span is not None:
+            test_id = self._value(
+                _Cell.parse(xml[test_id_span[0]:test_id_span[1]], self.test_id_col), final
+            )
+        number = self.renumber.visit(final, test_id)
+        if number is None or no_span is None:
+            return xml
+        cell = _Cell.parse(xml[no_span[0]:no_span[1]], self.no_col)
+        current = self._value(cell, final)
+        if type(current) is int and current == number:
+            return xml
+        self._set({self.no_col: cell}, self.no_col, number)
+        return xml[:no_span[0]] + cell.to_xml(row) + xml[no_span[1]:]
+
+    def _shift_raw(self, xml: str, final: int) -> str:
+        """Move an untouched row: only coordinates and formula ranges change."""
+        start = _START_TAG_RE.match(xml)
+        assert start is not None
+        head = xml[:start.end()]
+        row = str(final)
+        if _ROW_R_RE.search(head):
+            head = _ROW_R_RE.sub(lambda m: m[1] + row + m[3], head, count=1)
+        else:
+            head = head.replace("<row", f'<row r="{row}"', 1)
+        body = _CELL_R_RE.sub(lambda m: m[1] + row + m[3], xml[start.end():])
+        body = _F_REF_RE.sub(
+            lambda f: f"{f[1]}{_remap_ranges(f[2], self.moved)}{f[3]}", body
+        )
+        return head + body
+
+    def _parse_cells(
+        self, xml: str, start: re.Match[str],
+    ) -> tuple[dict[int, _Cell], str]:
+        """Return the cells of a row and any trailing non-cell XML (e.g. extLst)."""
+        cells: dict[int, _Cell] = {}
+        if start[3]:
+            return cells, ""
+        col = 0
+        end = start.end()
+        for cm in _CELL_RE.finditer(xml, start.end()):
+            ref = re.search(r'\sr="([^"]*)"', cm[0][:cm[0].find(">")])
+            col = split_coordinate(ref[1].replace("$", ""))[1] if ref else col + 1
+            cells[col] = _Cell.parse(cm[0], col)
+            end = cm.end()
+        return cells, xml[end:-len("</row>")]
+
+    def _row_xml(
+        self,
+        attrs: dict[str, str],
+        final: int,
+        cells: dict[int, _Cell],
+        rest: str,
+    ) -> str:
+        attrs = {"r": str(final), **{k: v for k, v in attrs.items() if k != "r"}}
+        head = "<row" + "".join(f' {k}="{v}"' for k, v in attrs.items())
+        body = "".join(cells[col].to_xml(final) for col in sorted(cells))
+        if not body and not rest:
+            return head + "/>"
+        return f"{head}>{body}{rest}</row>"
+
+    # -- cell values -----------------------------------------------------
+
+    def _process(self, row: int | None, final: int, cells: dict[int, _Cell]) -> bool:
+        """Fix formulas, apply updates and renumber one row; return True if touched."""
+        touched = False
+        if row is not None:
+            shift = final - row
+            for cell in cells.values():
+                touched |= self._move_formula(cell, row, final, shift)
+        else:
+            touched = True
+
+        for op_idx, op, columns in self.updates.get(final, ()):
+            entry: dict[str, Any] = {"type": "update", "test_id": op.test_id, "changes": {}}
+            for col_name, new_val in op.set_values.items():
+                col_idx = columns.get(col_name)
+                if col_idx is None:
+                    continue
+                cell = cells.get(col_idx)
+                old_val = self._value(cell, final) if cell is not None else None
+                self._set(cells, col_idx, new_val)
+                entry["changes"][col_name] = {
+                    "old": str(old_val) if old_val else "",
+                    "new": str(new_val),
+                }
+                touched = True
+            self.entries[op_idx] = entry
+            if self.sink is not None:
+                self._flush_updates()
+
+        if self.renumber is None or not self.renumber.active(final):
+            return touched
+        test_id_cell = cells.get(self.test_id_col)
+        number = self.renumber.visit(
+            final,
+            self._value(test_id_cell, final) if test_id_cell is not None else None,
+        )
+        if number is not None:
+            no_cell = cells.get(self.no_col)
+            current = self._value(no_cell, final) if no_cell is not None else None
+            if type(current) is not int or current != number:
+                self._set(cells, self.no_col, number)
+                touched = True
+        return touched
+
+    def _flush_updates(self) -> None:
+        """Emit the update entries that are next in patch order."""
+        assert self.sink is not None
+        order = self.update_order
+        while self._next_update < len(order):
+            op_idx = order[self._next_update]
+            entry = self.entries[op_idx]
+            if entry is None:
+                return
+            self.sink.emit(entry)
+            self.entries[op_idx] = None
+            self._next_update += 1
+
+    def _move_formula(self, cell: _Cell, row: int, final: int, shift: int) -> bool:
+        formula = cell.formula()
+        if formula is None:
+            return False
+        attrs, text = formula
+        if attrs.get("t") != "shared":
+            if "ref" in attrs and shift:
+                cell.inner = _F_REF_RE.sub(
+                    lambda f: f"{f[1]}{_remap_ranges(f[2], self.moved)}{f[3]}",
+                    cell.inner, count=1,
+                )
+            return False
+        si = attrs.get("si", "")
+        coord = f"{get_column_letter(cell.col)}{row}"
+        if text is not None:
+            self.masters[si] = ("=" + text, coord, shift)
+            if shift:
+                cell.inner = _F_REF_RE.sub(
+                    lambda f: f"{f[1]}{_remap_ranges(f[2], self.moved)}{f[3]}",
+                    cell.inner, count=1,
+                )
+            return False
+        master = self.masters.get(si)
+        if master is None or (si not in self.broken and master[2] == shift):
+            return False
+        # The dependent no longer sits at its offset from the master: write it out
+        translated = Translator(master[0], origin=master[1]).translate_formula(coord)
+        cell.inner = _FORMULA_RE.sub(
+            f"<f>{_escape(translated[1:])}</f>", cell.inner, count=1
+        )
+        self.formulas_changed = True
+        return True
+
+    def _value(self, cell: _Cell, row: int) -> Any:
+        """Python value of a cell (formulas as '=...' text, like openpyxl)."""
+        if cell.value_set:
+            return cell.value
+        formula = cell.formula()
+        if formula is not None:
+            attrs, text = formula
+            if text is None and attrs.get("t") == "shared":
+                master = self.masters.get(attrs.get("si", ""))
+                if master is not None:
+                    coord = f"{get_column_letter(cell.col)}{row}"
+                    return Translator(master[0], origin=master[1]).translate_formula(coord)
+            return "=" + (text or "")
+        data_type = cell.attrs.get("t", "n")
+        if data_type == "inlineStr":
+            m = _INLINE_RE.search(cell.inner)
+            return _rich_text(m[1]) if m else None
+        m = _VALUE_RE.search(cell.inner)
+        raw = html.unescape(m[1]) if m and m[1] else None
+        return self.wb.convert_value(data_type, cell.attrs.get("s"), raw)
+
+    def _set(self, cells: dict[int, _Cell], col: int, value: Any) -> None:
+        cell = cells.get(col)
+        if cell is None:
+            cell = cells[col] = _Cell(col, {}, "")
+        formula = cell.formula()
+        if formula is not None:
+            self.formulas_changed = True
+            attrs, text = formula
+            if attrs.get("t") == "shared" and text is not None:
+                self.broken.add(attrs.get("si", ""))
+        for attr in ("t", "cm", "vm"):
+            cell.attrs.pop(attr, None)
+
+        if value is None:
+            cell.inner = ""
+        elif isinstance(value, bool):
+            cell.attrs["t"] = "b"
+            cell.inner = f"<v>{int(value)}</v>"
+        elif isinstance(value, (int, float)):
+            cell.inner = f"<v>{value!r}</v>"
+        else:
+            text = str(value)
+            if text.startswith("=") and len(text) > 1:
+                cell.inner = f"<f>{_escape(text[1:])}</f><v></v>"
+                self.formulas_changed = True
+            elif self.strings.existing is None:
+                cell.attrs["t"] = "inlineStr"
+                cell.inner = f"<is>{_text_xml(text)}</is>"
+            else:
+                _text_xml(text)  # validate characters
+                cell.attrs["t"] = "s"
+                cell.inner = f"<v>{self.strings.index(text)}</v>"
+        cell.value_set = True
+        cell.value = value
+        self.changed = True
+        count("cells_written")
+
+    def _inserted_cells(self, payload: RowValues) -> dict[int, _Cell]:
+        """Cells of a new row: template styles and formulas, then the patch values."""
+        cells: dict[int, _Cell] = {}
+        for col, style, formula in self.template:
+            attrs = {"s": style} if style else {}
+            inner = f"<f>{_escape(formula[1:])}</f><v></v>" if formula else ""
+            cells[col] = _Cell(col, attrs, inner)
+        for col_name, value in payload.items():
+            if col_name in self.header_map:
+                self._set(cells, self.header_map[col_name], value)
+        self.changed = True
+        return cells
+
+    def _capture_template(self, row: int, cells: dict[int, _Cell]) -> None:
+        """Record styles and formulas of a template row (see excel_write._RowTemplate)."""
+        template: list[tuple[int, str | None, str | None]] = []
+        for col in sorted(cells):
+            cell = cells[col]
+            style = cell.attrs.get("s")
+            style = style if style and style != "0" else None
+            formula = cell.formula()
+            text = None
+            if formula is not None and formula[0].get("t") != "array":
+                text = self._value(cell, row)
+            if style or text:
+                template.append((col, style, text))
+        self.template = template
+
+
+class _Renumberer:
+    """Streaming version of ``renumber.renumber_sheet`` over final row numbers."""
+
+    def __init__(self, start_row: int, start_count: int, end_empty_rows: int) -> None:
+        self.start_row = start_row
+        self.counter = start_count
+        self.end_empty_rows = end_empty_rows
+        self.next_row = start_row
+        self.streak = 0
+        self.done = False
+
+    def active(self, row: int) -> bool:
+        return not self.done and row >= self.start_row
+
+    def visit(self, row: int, test_id: Any) -> int | None:
+        if not self.active(row):
+            return None
+        # Rows missing from the XML are empty
+        self.streak += row - self.next_row
+        self.next_row = row + 1
+        if self.streak >= self.end_empty_rows:
+            self.done = True
+            return None
+        if test_id is not None and str(test_id).strip():
+            self.streak = 0
+            self.counter += 1
+            return self.counter
+        self.streak += 1
+        if self.streak >= self.end_empty_rows:
+            self.done = True
+        return None
+
+
+def _iter_sheet_parts(src: IO[bytes], chunk_size: int = 1 << 16) -> Iterator[tuple[str, str]]:
+    """Split worksheet XML into ("head", ...), ("row", ...)*, ("tail", ...).
+
+    Only one chunk plus the current row is held in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    in_rows = False
+    eof = False
+    while True:
+        if not eof:
+            chunk = src.read(chunk_size)
+            eof = not chunk
+            buf += decoder.decode(chunk, eof)
+        if not in_rows:
+            m = _SHEET_DATA_RE.search(buf)
+            if m is None:
+                if eof:
+                    raise ValueError("Worksheet XML has no <sheetData> element")
+                continue
+            if m[1]:  # <sheetData/>: nothing to stream
+                yield "head", buf + decoder.decode(src.read(), True)
+                return
+            yield "head", buf[:m.end()]
+            buf = buf[m.end():]
+            in_rows = True
+
+        pos = 0
+        while True:
+            lt = buf.find("<", pos)
+            if lt < 0:
+                pos = len(buf)
+                break
+            if buf.startswith("</sheetData", lt):
+                yield "tail", buf[lt:] + decoder.decode(src.read(), True)
+                return
+            gt = buf.find(">", lt)
+            if gt < 0:
+                pos = lt
+                break
+            if buf[gt - 1] == "/":
+                end = gt + 1
+            else:
+                close = buf.find("</row>", gt)
+                if close < 0:
+                    pos = lt
+                    break
+                end = close + len("</row>")
+            yield "row", buf[lt:end]
+            pos = end
+        buf = buf[pos:]
+        if eof:
+            raise ValueError("Worksheet XML ends inside <sheetData>")
+
+
+class _ZipAssembler:
+    """Write a zip archive from raw copies of existing members and new parts.
+
+    Copied members keep their original compressed bytes; only the local
+    header is rebuilt (without a trailing data descriptor).
+    """
+
+    def __init__(self, out: IO[bytes]) -> None:
+        self._out = out
+        self._central: list[bytes] = []
+
+    def copy_raw(self, src: IO[bytes], info: zipfile.ZipInfo) -> None:
+        src.seek(info.header_offset)
+        fields = struct.unpack("<IHHHHHIIIHH", src.read(30))
+        name = src.read(fields[9])
+        extra = src.read(fields[10])
+        offset = self._out.tell()
+        flags = info.flag_bits & ~0x08
+        self._out.write(struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, fields[1], flags, info.compress_type,
+            fields[4], fields[5], info.CRC, info.compress_size, info.file_size,
+            len(name), len(extra),
+        ))
+        self._out.write(name + extra)
+        remaining = info.compress_size
+        while remaining:
+            chunk = src.read(min(remaining, 1 << 20))
+            if not chunk:
+                raise ValueError(f"Truncated zip member: {info.filename}")
+            self._out.write(chunk)
+            remaining -= len(chunk)
+        self._add_central(
+            info, name, info.extra, fields[1], flags, info.compress_type,
+            (fields[4], fields[5]), info.CRC, info.compress_size, info.file_size,
+            offset,
+        )
+
+    def add(self, info: zipfile.ZipInfo, chunks: Iterable[bytes]) -> None:
+        """Deflate a new member body, reusing the metadata of info."""
+        name = info.filename.encode("utf-8")
+        flags = 0x800 if not info.filename.isascii() else 0
+        dos = _dos_time(info.date_time)
+        offset = self._out.tell()
+        self._out.write(b"\0" * 30 + name)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        crc = usize = csize = 0
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            usize += len(chunk)
+            data = compressor.compress(chunk)
+            csize += len(data)
+            self._out.write(data)
+        data = compressor.flush()
+        csize += len(data)
+        self._out.write(data)
+        if max(usize, csize, offset) >= 0xFFFFFFFF:
+            raise ValueError("Output exceeds the zip size limit (ZIP64 not supported)")
+        end = self._out.tell()
+        self._out.seek(offset)
+        self._out.write(struct.pack(
+            "<IHHHHHIIIHH", 0x04034B50, 20, flags, zipfile.ZIP_DEFLATED,
+            dos[0], dos[1], crc, csize, usize, len(name), 0,
+        ))
+        self._out.seek(end)
+        self._add_central(
+            info, name, b"", 20, flags, zipfile.ZIP_DEFLATED,
+            dos, crc, csize, usize, offset,
+        )
+
+    def _add_central(
+        self,
+        info: zipfile.ZipInfo,
+        name: bytes,
+        extra: bytes,
+        version_needed: int,
+        flags: int,
+        method: int,
+        dos: tuple[int, int],
+        crc: int,
+        csize: int,
+        usize: int,
+        offset: int,
+    ) -> None:
+        if offset >= 0xFFFFFFFF:
+            raise ValueError("Output exceeds the zip size limit (ZIP64 not supported)")
+        self._central.append(struct.pack(
+            "<IHHHHHHIIIHHHHHII", 0x02014B50,
+            (info.create_system << 8) | info.create_version, version_needed,
+            flags, method, dos[0], dos[1], crc, csize, usize,
+            len(name), len(extra), len(info.comment), 0,
+            info.internal_attr, info.external_attr, offset,
+        ) + name + extra + info.comment)
+
+    def finish(self, comment: bytes = b"") -> None:
+        start = self._out.tell()
+        for record in self._central:
+            self._out.write(record)
+        size = self._out.tell() - start
+        count = len(self._central)
+        if count >= 0xFFFF or start >= 0xFFFFFFFF:
+            raise ValueError("Output exceeds the zip size limit (ZIP64 not supported)")
+        self._out.write(struct.pack(
+            "<IHHHHIIH", 0x06054B50, 0, 0, count, count, size, start, len(comment),
+        ) + comment)
+
+
+def _dos_time(date_time: tuple[int, int, int, int, int, int]) -> tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    return (
+        (hour << 11) | (minute << 5) | (second // 2),
+        ((max(year, 1980) - 1980) << 9) | (month << 5) | day,
+    )
+
+
+def _rels_member(member: str) -> str:
+    folder, name = member.rsplit("/", 1) if "/" in member else ("", member)
+    return f"{folder}/_rels/{name}.rels" if folder else f"_rels/{name}.rels"
+
+
+def _related_members(zf: zipfile.ZipFile, member: str) -> dict[str, list[str]]:
+    """Relationship type suffix → target members, from member's .rels part."""
+    rels = _rels_member(member)
+    if rels not in zf.namelist():
+        return {}
+    folder = member.rsplit("/", 1)[0] if "/" in member else ""
+    related: dict[str, list[str]] = {}
+    xml = zf.read(rels).decode("utf-8")
+    for m in re.finditer(r"<Relationship\b[^>]*>", xml):
+        attrs = dict(_ATTR_RE.findall(m[0]))
+        if attrs.get("TargetMode") == "External":
+            continue
+        target = attrs.get("Target", "")
+        if target.startswith("/"):
+            path = target.lstrip("/")
+        else:
+            path = posixpath.normpath(posixpath.join(folder, target))
+        kind = "/" + attrs.get("Type", "").rsplit("/", 1)[-1]
+        related.setdefault(kind, []).append(path)
+    return related
+
+
+def _shift_comments(xml: bytes, moved: Callable[[int], int]) -> bytes:
+    return re.sub(
+        rb'(<comment\b[^>]*?\sref=")([^"]*)(")',
+        lambda m: m[1] + _remap_ranges(m[2].decode(), moved).encode() + m[3],
+        xml,
+    )
+
+
+def _shift_vml(xml: bytes, moved: Callable[[int], int]) -> bytes:
+    """Shift legacy comment boxes (0-based <x:Row> and <x:Anchor> rows)."""
+    zero_based = lambda r: min(moved(int(r) + 1), _MAX_ROW) - 1  # noqa: E731
+    xml = re.sub(
+        rb"(<x:Row>)\s*(\d+)\s*(</x:Row>)",
+        lambda m: m[1] + str(zero_based(m[2])).encode() + m[3], xml,
+    )
+
+    def anchor(m: re.Match[bytes]) -> bytes:
+        # LeftColumn, LeftOffset, TopRow, TopOffset, RightColumn, ..., BottomRow, ...
+        parts = re.split(rb"(\d+)", m[2])
+        if len(parts) == 17:
+            for pos in (5, 13):
+                parts[pos] = str(zero_based(parts[pos])).encode()
+        return m[1] + b"".join(parts) + m[3]
+
+    return re.sub(rb"(<x:Anchor>)(.*?)(</x:Anchor>)", anchor, xml, flags=re.S)
+
+
+def _full_calc_on_load(xml: bytes) -> bytes:
+    """Ask Excel to recalculate everything when the workbook is opened."""
+    m = re.search(rb"<calcPr\b[^>]*?/?>", xml)
+    if m is not None:
+        tag = re.sub(rb'\sfullCalcOnLoad="[^"]*"', b"", m[0])
+        tag = tag.replace(b"<calcPr", b'<calcPr fullCalcOnLoad="1"', 1)
+        return xml[:m.start()] + tag + xml[m.end():]
+    for anchor in (b"</definedNames>", b"</sheets>"):
+        pos = xml.find(anchor)
+        if pos >= 0:
+            pos += len(anchor)
+            return xml[:pos] + b'<calcPr fullCalcOnLoad="1"/>' + xml[pos:]
+    return xml
+
+
+def _drop_part(xml: bytes, pattern: bytes) -> bytes:
+    return re.sub(pattern, b"", xml)
+
+
+def _prepare(
+    wb: FastWorkbook,
+    patch: PatchFile,
+    *,
+    end_empty_rows: int,
+    renumber: bool,
+    sink: DiffSink | None = None,
+) -> _SheetRewriter:
+    """Plan a patch against the sheet's Test ID index; return the rewriter."""
+    ws = wb[patch.sheet]
+    header_row, header_map = detect_header_row(
+        ws, ["No.", "Test ID", "Test Title"], max_scan=200,
+    )
+    test_id_col = header_map["Test ID"]
+    no_col = header_map["No."]
+    protected_cols = protected_columns(header_map)
+
+    index = RowIndex.build(
+        ws, header_row, test_id_col,
+        no_col=no_col if renumber else None,
+        end_empty_rows=end_empty_rows,
+    )
+    missing = preflight_missing_keys(patch.operations, index.keys())
+    entries = plan_operations(index, patch.operations, missing)
+
+    # The rewriter snapshots row positions, so it is created after planning
+    has_strings = wb.has_member("xl/sharedStrings.xml")
+    strings = _SharedStrings(len(wb.shared_strings) if has_strings else None)
+    rewriter = _SheetRewriter(wb, index, header_map, strings)
+    if sink is not None:
+        entries = emit_planned(entries, sink)
+        rewriter.sink = sink
+    rewriter.entries = entries
+
+    first_changed = min((row for _, row, _ in index.inserted_rows()), default=None)
+    for op_idx, op in enumerate(patch.operations):
+        if not isinstance(op, UpdateOperation) or op_idx in missing:
+            continue
+        row_num = index.row_of(op.test_id)
+        assert row_num is not None
+        columns = {
+            name: header_map[name] for name in op.set_values
+            if name in header_map and header_map[name] not in protected_cols
+        }
+        rewriter.updates.setdefault(row_num, []).append((op_idx, op, columns))
+        rewriter.update_order.append(op_idx)
+        if set(columns.values()) & {test_id_col, no_col}:
+            first_changed = min(row_num, first_changed or row_num)
+
+    if renumber:
+        start_row, start_count = index.renumber_start(first_changed)
+        rewriter.renumber = _Renumberer(start_row, start_count, end_empty_rows)
+    return rewriter
+
+
+def _result(rewriter: _SheetRewriter) -> PatchResult:
+    result = PatchResult(diff_entries=[e for e in rewriter.entries if e is not None])
+    if rewriter.renumber is not None:
+        result.renumbered = rewriter.renumber.counter
+    return result
+
+
+class _Discard:
+    """Write sink that drops everything (used for previews)."""
+
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+def apply_patch_surgical(
+    xlsx_path: str | Path,
+    patch: PatchFile,
+    output_path: str | Path,
+    *,
+    end_empty_rows: int = 3,
+    renumber: bool = True,
+    sink: DiffSink | None = None,
+) -> PatchResult:
+    """Apply a patch to patch.sheet and write output_path, copying all other parts.
+
+    Returns the same PatchResult as ``excel_write.apply_patch_to_sheet``. With
+    a sink, entries are emitted in the same order as that function: warnings
+    and inserts up front, then updates in patch order as soon as every earlier
+    update's row has been written.
+    Renumbering happens in the same streaming pass, so it is profiled as part
+    of the "apply" stage.
+    """
+    with stage("load"):
+        wb = FastWorkbook(xlsx_path, formulas=True)
+    with wb:
+        member = wb.member_of(patch.sheet)
+        with tempfile.TemporaryFile() as sheet_xml:
+            with stage("apply"):
+                rewriter = _prepare(
+                    wb, patch, end_empty_rows=end_empty_rows, renumber=renumber, sink=sink,
+                )
+                with wb.open_member(member) as src:
+                    rewriter.write(src, sheet_xml)
+            sheet_xml.seek(0)
+            with stage("save"):
+                _write_package(
+                    Path(xlsx_path), Path(output_path), member, sheet_xml,
+                    rewriter, rewriter.strings,
+                )
+    return _result(rewriter)
+
+
+def preview_patch(
+    xlsx_path: str | Path,
+    patch: PatchFile,
+    *,
+    end_empty_rows: int = 3,
+    renumber: bool = True,
+    sink: DiffSink | None = None,
+) -> PatchResult:
+    """Compute the result of a patch without writing anything (dry run).
+
+    The sheet is opened read-only and streamed once, exactly as
+    ``apply_patch_surgical`` would, so the diff entries and renumber count
+    match a real run; the rewritten XML is discarded.
+    """
+    with stage("load"):
+        wb = FastWorkbook(xlsx_path, formulas=True)
+    with wb, stage("apply"):
+        rewriter = _prepare(
+            wb, patch, end_empty_rows=end_empty_rows, renumber=renumber, sink=sink,
+        )
+        with wb.open_member(wb.member_of(patch.sheet)) as src:
+            rewriter.write(src, _Discard())  # type: ignore[arg-type]
+    return _result(rewriter)
+
+
+def _write_package(
+    xlsx_path: Path,
+    output_path: Path,
+    sheet_member: str,
+    sheet_xml: IO[bytes],
+    rewriter: _SheetRewriter,
+    strings: _SharedStrings,
+) -> None:
+    """Assemble the output zip next to output_path, then move it into place."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    moved = rewriter.moved
+    shifted = bool(rewriter.index.inserted_count)
+
+    with zipfile.ZipFile(xlsx_path) as zf, open(xlsx_path, "rb") as raw:
+        workbook_rels = _related_members(zf, "xl/workbook.xml")
+        sheet_rels = _related_members(zf, sheet_member)
+
+        replaced: dict[str, Callable[[], Iterable[bytes]]] = {}
+        dropped: set[str] = set()
+        if rewriter.changed or shifted:
+            replaced[sheet_member] = lambda: iter(lambda: sheet_xml.read(1 << 20), b"")
+            replaced["xl/workbook.xml"] = lambda: [
+                _full_calc_on_load(zf.read("xl/workbook.xml"))
+            ]
+        if strings.added:
+            member = "xl/sharedStrings.xml"
+            replaced[member] = lambda: strings.rewrite(zf.open(member))
+        if shifted or rewriter.formulas_changed:
+            for chain in workbook_rels.get(_REL_CALC_CHAIN, []):
+                dropped.add(chain)
+            if dropped:
+                rels, types = "xl/_rels/workbook.xml.rels", "[Content_Types].xml"
+                part_names = b"|".join(re.escape(f"/{name}".encode()) for name in dropped)
+                replaced[rels] = lambda: [_drop_part(
+                    zf.read(rels), rb'<Relationship\b[^>]*?/calcChain"[^>]*/>',
+                )]
+                replaced[types] = lambda: [_drop_part(
+                    zf.read(types), rb'<Override\b[^>]*?PartName="(?:' + part_names + rb')"[^>]*/>',
+                )]
+        if shifted:
+            for kind, shift in ((_REL_COMMENTS, _shift_comments), (_REL_VML, _shift_vml)):
+                for part in sheet_rels.get(kind, []):
+                    original = zf.read(part)
+                    updated = shift(original, moved)
+                    if updated != original:
+                        replaced[part] = lambda data=updated: [data]
+
+        tmp_name = output_path.with_name(f".{output_path.name}.tmp")
+        try:
+            with open(tmp_name, "wb") as out:
+                assembler = _ZipAssembler(out)
+                for info in zf.infolist():
+                    if info.filename in dropped:
+                        continue
+                    body = replaced.get(info.filename)
+                    if body is None:
+                        assembler.copy_raw(raw, info)
+                    else:
+                        assembler.add(info, body())
+                assembler.finish(zf.comment)
+            os.replace(tmp_name, output_path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
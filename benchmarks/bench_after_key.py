@@ -0,0 +1,78 @@
+"""Benchmark: backward-scan vs forward-pass after_key resolution.
+
+Usage:
+    python -m benchmarks.bench_after_key [--rows 100000] [--masters 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.after_key import determine_after_keys, determine_after_keys_multi
+
+
+def _backward_scan(english_order: list[str], existing_ids: set[str]) -> dict[str, str | None]:
+    """The previous implementation: scan back from each new ID to a known one."""
+    result: dict[str, str | None] = {}
+    known_ids = set(existing_ids)
+    for i, test_id in enumerate(english_order):
+        if test_id in existing_ids:
+            continue
+        after_key = None
+        for j in range(i - 1, -1, -1):
+            if english_order[j] in known_ids:
+                after_key = english_order[j]
+                break
+        result[test_id] = after_key
+        known_ids.add(test_id)
+    return result
+
+
+def _time(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--masters", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    n = args.rows
+    order = [f"T-{i:06d}" for i in range(n)]
+    rng = random.Random(0)
+    cases = {
+        # Every row new except the last: one long run of inserts from the top
+        "worst case (all new)": {order[-1]},
+        # Typical release: 2% of the rows are new, scattered
+        "typical release (2% new)": {t for t in order if rng.random() >= 0.02},
+    }
+    for name, existing in cases.items():
+        old_time, old = _time(_backward_scan, order, existing)
+        new_time, new = _time(determine_after_keys, order, existing)
+        assert old == new
+        print(
+            f"{n} rows, {name}: backward scan {old_time * 1000:.1f} ms, "
+            f"forward pass {new_time * 1000:.1f} ms"
+        )
+
+    masters = {
+        f"master-{m}": {t for t in order if rng.random() >= 0.02}
+        for m in range(args.masters)
+    }
+    per_master, _ = _time(
+        lambda: {name: _backward_scan(order, ids) for name, ids in masters.items()}
+    )
+    one_pass, _ = _time(determine_after_keys_multi, order, masters)
+    print(
+        f"{n} rows x {args.masters} masters: backward scan per master "
+        f"{per_master * 1000:.1f} ms, one forward pass {one_pass * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: collected diff entries vs streaming DiffReportWriter (peak memory).
+
+Usage:
+    python -m benchmarks.bench_diff_report [--updates 20000] [--text 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.diff_report import DiffReportWriter, generate_diff_report
+
+
+def _entries(n: int, size: int):
+    """Update entries shaped like the patcher's, each with fresh full cell text."""
+    for i in range(n):
+        yield {
+            "type": "update",
+            "test_id": f"T-{i:06d}",
+            "changes": {
+                col: {"old": f"{i} old " + "x" * size, "new": f"{i} new " + "y" * size}
+                for col in ("前提条件", "試験手順", "判定基準")
+            },
+        }
+
+
+def _measure(run) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--text", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        collected_md = Path(tmp) / "collected.md"
+        streamed_md = Path(tmp) / "streamed.md"
+
+        def collected():
+            entries = list(_entries(args.updates, args.text))
+            generate_diff_report(entries, collected_md)
+
+        def streamed():
+            with DiffReportWriter(streamed_md, Path(tmp) / "streamed.jsonl") as writer:
+                for entry in _entries(args.updates, args.text):
+                    writer.emit(entry)
+
+        collected_time, collected_peak = _measure(collected)
+        streamed_time, streamed_peak = _measure(streamed)
+        assert collected_md.read_bytes() == streamed_md.read_bytes()
+
+    print(
+        f"{args.updates} updates x 3 cells x {args.text} chars: "
+        f"collected {collected_time:.2f} s / peak {collected_peak / 2**20:.1f} MiB, "
+        f"streamed (+JSONL) {streamed_time:.2f} s / peak {streamed_peak / 2**20:.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
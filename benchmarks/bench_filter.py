@@ -0,0 +1,59 @@
+"""Benchmark: per-row is_target_row vs compiled filter masks of growing size.
+
+Usage:
+    python -m benchmarks.bench_filter [--rows 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.filter_rules import RowFilter, is_target_row, legacy_filter
+from app.test_items_table import TestItemsTable
+
+_EXTRA = [
+    'section startswith "Section 1"',
+    'title matches "(?i)title [0-9]*7"',
+    'team in ("QC(Verification)", "QC(Automation)")',
+    'not remark contains "#Skip"',
+]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    n = args.rows
+    table = TestItemsTable({
+        "Test ID": [f"T-{i:06d}" for i in range(n)],
+        "Section": [f"Section {i // 1000}" for i in range(n)],
+        "Test Title": [f"Title {i % 500}" for i in range(n)],
+        "Remark": [("#MR", "#MR #MRExclusive", "", "#MR #Skip")[i % 4] for i in range(n)],
+        "チーム分担": [("QC(Verification)", "QC（Verification）", "Dev")[i % 3] for i in range(n)],
+    })
+
+    start = time.perf_counter()
+    expected = [
+        is_target_row(remark, team)
+        for remark, team in zip(table.column("Remark"), table.column("チーム分担"))
+    ]
+    print(f"{n} rows: is_target_row per row {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    source = legacy_filter()
+    for extra in [None, *_EXTRA]:
+        if extra:
+            source += f" and {extra}"
+        row_filter = RowFilter(source)
+        start = time.perf_counter()
+        mask = row_filter.mask(table)
+        elapsed = time.perf_counter() - start
+        if extra is None:
+            assert mask == expected
+        conditions = source.count(" and ") + 1
+        print(f"  compiled mask, {conditions} conditions: {elapsed * 1000:.1f} ms ({sum(mask)} rows pass)")
+
+
+if __name__ == "__main__":
+    main()
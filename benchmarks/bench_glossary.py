@@ -0,0 +1,82 @@
+"""Benchmark: per-term re.sub vs compiled glossary on a large synthetic glossary.
+
+Usage:
+    python -m benchmarks.bench_glossary [--terms 5000] [--lines 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from app import glossary as glossary_module
+from app.glossary import load_glossary
+
+_WORDS = [
+    "device", "setting", "screen", "update", "network", "battery", "reboot",
+    "confirm", "mobile", "data", "usage", "application", "install", "launch",
+]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    terms: dict[str, str] = {}
+    while len(terms) < args.terms:
+        phrase = " ".join(rng.choices(_WORDS, k=rng.randint(1, 3))) + f" x{len(terms)}"
+        terms[phrase] = f"訳{len(terms)}"
+    lines = [
+        " ".join(rng.choices(_WORDS + list(terms)[:200], k=12))
+        for _ in range(args.lines)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "glossary.yml"
+        path.write_text(yaml.safe_dump({"terms": terms}, allow_unicode=True), encoding="utf-8")
+        cache = Path(tmp) / "cache"
+
+        start = time.perf_counter()
+        load_glossary(path, cache_dir=cache)
+        cold = time.perf_counter() - start
+        # As in a new process: nothing compiled yet, only the disk entry
+        glossary_module._LOADED.clear()
+        re.purge()
+        start = time.perf_counter()
+        load_glossary(path, cache_dir=cache)
+        disk = time.perf_counter() - start
+        start = time.perf_counter()
+        glossary = load_glossary(path, cache_dir=cache)
+        warm = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for line in lines:
+        result = line
+        for eng, jpn in terms.items():
+            result = re.sub(re.escape(eng), jpn, result, flags=re.IGNORECASE)
+    per_term = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for line in lines:
+        glossary.sub(line)
+    compiled = time.perf_counter() - start
+
+    print(
+        f"{args.terms} terms, {args.lines} lines: load cold {cold * 1000:.1f} ms, "
+        f"disk cache {disk * 1000:.1f} ms, in-process {warm * 1000:.3f} ms; "
+        f"per-term re.sub {per_term * 1000:.1f} ms, "
+        f"compiled {compiled * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
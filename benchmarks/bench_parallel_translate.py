@@ -0,0 +1,54 @@
+"""Benchmark: serial vs process-pool rule-based translation of many unique texts.
+
+Usage:
+    python -m benchmarks.bench_parallel_translate [--texts 20000] [--jobs 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+
+from app.translator import RuleBasedTranslator
+
+_WORDS = [
+    "Verify", "that", "the", "device", "setting", "screen", "update", "network",
+    "battery", "reboot", "mobile", "data", "usage", "application", "launch",
+]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--glossary", default="config/glossary.yml")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    texts = [
+        "\n".join(
+            f"{n}. " + " ".join(rng.choices(_WORDS, k=10)) + f" {i}"
+            for n in range(1, 4)
+        )
+        for i in range(args.texts)
+    ]
+
+    timings: dict[int, float] = {}
+    outputs = []
+    for jobs in (1, args.jobs):
+        translator = RuleBasedTranslator(args.glossary, jobs=jobs)
+        start = time.perf_counter()
+        outputs.append(translator.translate_batch(texts))
+        timings[jobs] = time.perf_counter() - start
+
+    assert outputs[0] == outputs[1], "parallel output differs from serial"
+    print(
+        f"{args.texts} texts on {os.cpu_count()} CPUs: serial {timings[1]:.2f} s, "
+        f"--jobs {args.jobs} {timings[args.jobs]:.2f} s (identical output)"
+    )
+
+
+if __name__ == "__main__":
+    main()
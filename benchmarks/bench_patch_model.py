@@ -0,0 +1,58 @@
+"""Benchmark: patch model build time and memory for a large synthetic patch.
+
+Usage:
+    python -m benchmarks.bench_patch_model [--operations 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from app.patch_model import PatchFile
+
+_COLUMNS = ["Test Title", "前提条件", "試験手順", "確認項目", "備考"]
+
+
+def _raw_patch(n: int) -> dict:
+    """Patch dict shaped like yaml.safe_load output (fresh key strings per row)."""
+    ops = []
+    for i in range(n):
+        values = {"".join(c): f"value {c} {i}" for c in _COLUMNS}
+        if i % 2:
+            ops.append({"op": "update", "key": {"Test ID": f"T{i}"}, "set": values})
+        else:
+            values["".join("Test ID")] = f"N{i}"
+            ops.append({"op": "insert", "after_key": {"Test ID": f"T{i - 1}"}, "row": values})
+    return {"sheet": "試験項目", "key_columns": ["Test ID"], "operations": ops}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    patch = PatchFile.from_dict(_raw_patch(args.operations))
+    build = time.perf_counter() - start  # includes building the source dicts
+    del patch
+
+    # Memory of the parsed patch once the loader's dicts are gone
+    tracemalloc.start()
+    patch = PatchFile.from_dict(_raw_patch(args.operations))
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    patch.to_dict()
+    dump = time.perf_counter() - start
+    print(
+        f"operations {len(patch.operations)}  build {build * 1000:8.1f} ms  "
+        f"to_dict {dump * 1000:8.1f} ms  "
+        f"retained {retained / 2**20:6.1f} MiB  peak {peak / 2**20:6.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
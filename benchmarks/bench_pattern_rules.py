@@ -0,0 +1,75 @@
+"""Benchmark: trying every rule in turn vs RuleEngine prefix dispatch, growing rule sets.
+
+Usage:
+    python -m benchmarks.bench_pattern_rules [--lines 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+
+from app.pattern_rules import DEFAULT_RULES, PatternRule, RuleEngine
+
+_VERBS = ["Tap", "Open", "Select", "Press", "Enable", "Disable", "Reboot", "Wait"]
+
+
+def _rules(n: int) -> list[PatternRule]:
+    """n anchored verb rules (e.g. ``^Open9\\s+(.+)``) ahead of the defaults."""
+    extra = [
+        PatternRule(f"verb-{i}", rf"^{_VERBS[i % len(_VERBS)]}{i}\s+(.+)", rf"\1を操作{i}")
+        for i in range(n)
+    ]
+    return extra + DEFAULT_RULES
+
+
+def _each_rule(rules: list[PatternRule], lines: list[str]) -> None:
+    """The original loop: every rule's re.sub until one changes the line."""
+    compiled = [
+        (re.compile(r.pattern, re.IGNORECASE if r.ignore_case else 0), r.replace)
+        for r in rules
+    ]
+    for line in lines:
+        for pattern, replace in compiled:
+            if pattern.sub(replace, line) != line:
+                break
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    lines = [
+        rng.choice([
+            "Verify that the screen turns on",
+            "Ensure the device is charged",
+            "Capture a screenshot of the home screen",
+            "Check the battery level",
+            "Tap3 the OK button",
+        ])
+        for _ in range(args.lines)
+    ]
+
+    for n in (0, 100, 1000):
+        rules = _rules(n)
+        start = time.perf_counter()
+        _each_rule(rules, lines)
+        each = time.perf_counter() - start
+
+        engine = RuleEngine(rules)
+        start = time.perf_counter()
+        for line in lines:
+            engine.apply(line)
+        dispatched = time.perf_counter() - start
+        print(
+            f"{len(rules):5d} rules, {len(lines)} lines: every rule {each * 1000:9.1f} ms, "
+            f"prefix dispatch {dispatched * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
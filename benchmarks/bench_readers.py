@@ -0,0 +1,55 @@
+"""Benchmark: openpyxl vs fast XML read backend on the sample workbooks.
+
+Usage:
+    python -m benchmarks.bench_readers [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from app.excel_read import READERS, read_shikenkomoku_test_ids, read_test_items
+
+_SAMPLE_DIR = Path(__file__).resolve().parent.parent / "sample"
+_ENGLISH = _SAMPLE_DIR / "OTR-MA-LQC-TEST-RevE13-20260130_E_for MR Testing_分担 (2).xlsx"
+_JAPANESE = _SAMPLE_DIR / "【S社向けMRリグレッション2試験】RevE081_Master_v0.5 1 (3).xlsx"
+
+
+def _best_of(repeat: int, fn, *args, **kwargs) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("read_test_items", read_test_items, _ENGLISH),
+        ("read_shikenkomoku_test_ids", read_shikenkomoku_test_ids, _JAPANESE),
+    ]
+    for label, fn, path in cases:
+        timings: dict[str, float] = {}
+        results = []
+        for reader in READERS:
+            timings[reader], result = _best_of(args.repeat, fn, path, reader=reader)
+            results.append(result)
+        same = all(r == results[0] for r in results)
+        print(
+            f"{label:28s} openpyxl {timings['openpyxl'] * 1000:8.1f} ms  "
+            f"fast {timings['fast'] * 1000:8.1f} ms  "
+            f"speedup {timings['openpyxl'] / timings['fast']:5.1f}x  "
+            f"identical={same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
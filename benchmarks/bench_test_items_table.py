@@ -0,0 +1,79 @@
+"""Benchmark: row dicts vs columnar TestItemsTable for a large Test Items sheet.
+
+Usage:
+    python -m benchmarks.bench_test_items_table [--rows 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from app.normalizer import normalize_cell_text, normalize_column
+from app.test_items_table import TestItemsTable
+
+_NAMES = [
+    "Test ID", "Section", "Sub-section", "Test Title",
+    "Pre-Condition", "Test Procedure", "Check item",
+    "Remark", "チーム分担",
+]
+
+
+def _raw_rows(n: int) -> list[tuple[str, ...]]:
+    """Raw cell tuples as the readers yield them (fresh strings per cell)."""
+    rows = []
+    for i in range(n):
+        rows.append((
+            f"T-{i:06d}", f"Section {i // 1000}", f"Sub-section {i // 100}",
+            f"Title {i}", "Device is powered on" if i % 3 else "None_x000D_",
+            f"1. Open screen {i % 50}\n2. Verify the result", "Result is shown",
+            "#MR" if i % 2 else "", "QC(Verification)" if i % 4 else "Dev",
+        ))
+    # Break sharing of the literal strings, as a parser would
+    return [tuple("".join(c for c in cell) for cell in row) for row in rows]
+
+
+def _measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    raw = _raw_rows(args.rows)
+
+    def build_dicts():
+        return [
+            {name: normalize_cell_text(v) for name, v in zip(_NAMES, row)}
+            for row in raw
+        ]
+
+    def build_table():
+        columns = list(zip(*raw))
+        return TestItemsTable({
+            name: normalize_column(values) for name, values in zip(_NAMES, columns)
+        })
+
+    rows, dict_time, dict_mem = _measure(build_dicts)
+    table, table_time, table_mem = _measure(build_table)
+    assert list(table.rows()) == rows
+    del rows
+
+    print(
+        f"{args.rows} rows: dicts {dict_time:.2f} s / {dict_mem / 2**20:.1f} MiB, "
+        f"table {table_time:.2f} s / {table_mem / 2**20:.1f} MiB "
+        f"(retained, excluding the raw cells)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark: openpyxl vs surgical patch writer.
+
+Usage:
+    python -m benchmarks.bench_writers --patch out/patch.yml [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import openpyxl
+
+from app.excel_write import apply_patch_to_sheet, save_workbook
+from app.patch_io import read_patch
+from app.xlsx_surgical import apply_patch_surgical
+
+_SAMPLE_DIR = Path(__file__).resolve().parent.parent / "sample"
+_JAPANESE = _SAMPLE_DIR / "【S社向けMRリグレッション2試験】RevE081_Master_v0.5 1 (3).xlsx"
+
+
+def _openpyxl_writer(base: Path, patch, output: Path, end_empty_rows: int):
+    wb = openpyxl.load_workbook(str(base))
+    result = apply_patch_to_sheet(wb[patch.sheet], patch, end_empty_rows=end_empty_rows)
+    save_workbook(wb, output)
+    wb.close()
+    return result
+
+
+def _surgical_writer(base: Path, patch, output: Path, end_empty_rows: int):
+    return apply_patch_surgical(base, patch, output, end_empty_rows=end_empty_rows)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base", default=str(_JAPANESE))
+    parser.add_argument("--patch", default="out/patch.yml")
+    parser.add_argument("--end-empty-rows", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    base = Path(args.base)
+    patch = read_patch(args.patch)
+    writers = {"openpyxl": _openpyxl_writer, "surgical": _surgical_writer}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, writer in writers.items():
+            output = Path(tmp) / f"{name}.xlsx"
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = writer(base, patch, output, args.end_empty_rows)
+                best = min(best, time.perf_counter() - start)
+            print(
+                f"{name:9s} {best * 1000:8.1f} ms  "
+                f"output {output.stat().st_size / 1024:8.1f} KiB  "
+                f"entries {len(result.diff_entries)}  renumbered {result.renumbered}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Shared test fixtures."""
+
+import openpyxl
+import pytest
+
+
+def _items_workbook(ids, *, preamble=False, extra=None):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "試験項目"
+    if preamble:
+        ws.append(["項目数"])
+    extra = extra or {}
+    ws.append(["No.", "Test ID", "Test Title", "試験手順", *extra])
+    for i, test_id in enumerate(ids, start=1):
+        title = f"title {test_id}" if test_id else None
+        ws.append([i, test_id, title, "old", *extra.values()])
+    return wb
+
+
+@pytest.fixture
+def items_workbook():
+    """Factory for a 試験項目 workbook with one row per Test ID (None = blank row).
+
+    Columns are No., Test ID, Test Title and 試験手順 ("old"); ``preamble``
+    adds a 項目数 row above the header and ``extra`` maps more header names
+    to the value of every row.
+    """
+    return _items_workbook
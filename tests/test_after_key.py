@@ -2,7 +2,7 @@
 
 import pytest
 
-from app.after_key import determine_after_keys
+from app.after_key import determine_after_keys, determine_after_keys_multi
 
 
 class TestDetermineAfterKeys:
@@ -73,3 +73,20 @@ class TestDetermineAfterKeys:
         )
         # N1 → E1 (existing), N2 → N1 (now known)
         assert result == {"N1": "E1", "N2": "N1"}
+
+
+class TestDetermineAfterKeysMulti:
+    def test_each_master_uses_its_own_existing_ids(self):
+        result = determine_after_keys_multi(
+            ["A", "B", "C", "D"],
+            {"jp": {"A", "C"}, "kr": {"A", "B", "C", "D"}, "empty": set()},
+        )
+        assert result == {
+            "jp": {"B": "A", "D": "C"},
+            "kr": {},
+            "empty": {"A": None, "B": "A", "C": "B", "D": "C"},
+        }
+
+    def test_strict_fails_for_any_master(self):
+        with pytest.raises(ValueError, match="'A'"):
+            determine_after_keys_multi(["A", "B"], {"x": {"A"}, "y": set()}, strict=True)
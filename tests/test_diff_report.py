@@ -0,0 +1,88 @@
+"""Tests for diff_report module."""
+
+import json
+
+from app.diff_report import DiffReportWriter, generate_diff_report, generate_generator_report
+from app.excel_write import apply_patch_to_sheet
+from app.patch_model import InsertOperation, PatchFile, UpdateOperation
+
+_ENTRIES = [
+    {"type": "warning", "test_id": "X", "message": "Test ID not found for update; skipped."},
+    {"type": "insert", "test_id": "N1", "after_key": "A", "row_num": 4},
+    {"type": "update", "test_id": "A", "changes": {"試験手順": {"old": "old", "new": "new"}}},
+    {"type": "update", "test_id": "B", "changes": {}},
+]
+
+
+class _Collect:
+    def __init__(self):
+        self.entries = []
+
+    def emit(self, entry):
+        self.entries.append(entry)
+
+
+class TestDiffReportWriter:
+    def test_markdown_layout(self, tmp_path):
+        path = tmp_path / "diff.md"
+        generate_diff_report(_ENTRIES, path)
+        assert path.read_text(encoding="utf-8") == "\n".join([
+            "# Patch Application Report\n",
+            "- Updates: 2", "- Inserts: 1", "- Warnings: 1", "",
+            "## Updates\n",
+            "### Test ID: `A`\n", "- **試験手順**: `old` → `new`", "",
+            "### Test ID: `B`\n", "",
+            "## Inserts\n",
+            "- `N1` inserted after `A` (row 4)", "",
+            "## Warnings\n",
+            "- **X**: Test ID not found for update; skipped.", "",
+        ])
+
+    def test_jsonl_is_written_as_entries_arrive(self, tmp_path):
+        jsonl = tmp_path / "diff.jsonl"
+        with DiffReportWriter(tmp_path / "diff.md", jsonl) as writer:
+            writer.emit(_ENTRIES[0])
+            assert json.loads(jsonl.read_text(encoding="utf-8")) == _ENTRIES[0]
+            for entry in _ENTRIES[1:]:
+                writer.emit(entry)
+        records = [json.loads(line) for line in jsonl.read_text(encoding="utf-8").splitlines()]
+        assert records[:-1] == _ENTRIES
+        assert records[-1] == {"type": "summary", "update": 2, "insert": 1, "warning": 1}
+
+    def test_patcher_emits_to_sink_instead_of_result(self, items_workbook):
+        ws = items_workbook(["A"]).active
+        patch = PatchFile(operations=[
+            UpdateOperation(test_id="A", set_values={"試験手順": "new"}),
+            InsertOperation(after_test_id="A", row={"Test ID": "N1"}),
+        ])
+        sink = _Collect()
+        result = apply_patch_to_sheet(ws, patch, sink=sink)
+        assert result.diff_entries == []
+        assert [(e["type"], e["test_id"]) for e in sink.entries] == [
+            ("insert", "N1"), ("update", "A"),
+        ]
+
+
+class TestGeneratorReport:
+    def _report(self, tmp_path, **stats):
+        path = tmp_path / "report.md"
+        generate_generator_report(
+            total_rows=3, filtered_rows=2, update_count=2, insert_count=0,
+            after_key_map={}, warnings=[], output_path=path, **stats,
+        )
+        return path.read_text(encoding="utf-8")
+
+    def test_http_translation_stats(self, tmp_path):
+        report = self._report(tmp_path, memory_stats=(5, 2, 3), request_stats=(4, 1))
+        assert "## Translation Stats" in report
+        assert "- Translation requests: 4 (1 retried)" in report
+        assert "- Translation memory: 5 recalled (2 pinned), 3 stored" in report
+        assert "Lines translated" not in report
+
+    def test_rule_based_translation_stats(self, tmp_path):
+        report = self._report(
+            tmp_path, rule_hits={"verify": 1}, rule_lines=4, memo_stats=(1, 4),
+        )
+        assert "- Line memo: 1 hits, 4 misses" in report
+        assert "- Lines translated: 4" in report
+        assert "Translation requests" not in report
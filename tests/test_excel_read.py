@@ -0,0 +1,61 @@
+"""Tests for excel_read module."""
+
+import openpyxl
+import pytest
+
+from app.excel_read import read_shikenkomoku_test_ids, read_test_items
+
+
+@pytest.fixture
+def english_xlsx(tmp_path):
+    """Small Test Items workbook with a gap in the Test ID column."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Test Items"
+    ws.append([None])
+    ws.append(["History", "Test ID", "Section", "Test Procedure", "Check item", "Remark"])
+    ws.append([None, "T-001", "S1", "Do it_x000D_now", "OK", "#MR"])
+    ws.append([None, None, "S1", "orphan", None, None])
+    ws.append([None, "T-002", "S2", "Step", "OK", None])
+    ws.append([None, None])
+    ws.append([None, None])
+    ws.append([None, "T-003", "S3", "Late", "OK", None])
+    path = tmp_path / "english.xlsx"
+    wb.save(path)
+    return path
+
+
+@pytest.fixture
+def japanese_xlsx(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "試験項目"
+    ws.append(["項目数", None, None])
+    ws.append(["No.", "Test ID", "Test Title"])
+    ws.append([1, " J-001 ", "a"])
+    ws.append([2, None, None])
+    ws.append([3, "J-002", "b"])
+    path = tmp_path / "japanese.xlsx"
+    wb.save(path)
+    return path
+
+
+class TestReadTestItems:
+    def test_projects_and_normalizes(self, english_xlsx):
+        rows, header_map = read_test_items(english_xlsx)
+        assert [r["Test ID"] for r in rows] == ["T-001", "T-002", "T-003"]
+        assert rows[0]["Test Procedure"] == "Do it\nnow"
+        assert rows[1]["Remark"] == ""
+        assert header_map["Test ID"] == 2
+
+    def test_end_empty_rows_stops_at_streak(self, english_xlsx):
+        rows, _ = read_test_items(english_xlsx, end_empty_rows=2)
+        assert [r["Test ID"] for r in rows] == ["T-001", "T-002"]
+
+
+class TestReadShikenkomokuTestIds:
+    def test_reads_stripped_ids(self, japanese_xlsx):
+        assert read_shikenkomoku_test_ids(japanese_xlsx) == ["J-001", "J-002"]
+
+    def test_end_empty_rows(self, japanese_xlsx):
+        assert read_shikenkomoku_test_ids(japanese_xlsx, end_empty_rows=1) == ["J-001"]
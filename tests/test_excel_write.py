@@ -0,0 +1,169 @@
+"""Tests for excel_write module."""
+
+import openpyxl
+import pytest
+
+from app import excel_write
+from app.excel_write import (
+    RowIndex,
+    apply_patch,
+    apply_patch_to_sheet,
+    preflight_missing_keys,
+)
+from app.patch_model import InsertOperation, PatchFile, UpdateOperation
+from app.renumber import renumber_sheet
+
+
+def _read_ids(path):
+    wb = openpyxl.load_workbook(path)
+    ws = wb["試験項目"]
+    ids = [ws.cell(row=r, column=2).value for r in range(3, ws.max_row + 1)]
+    wb.close()
+    return ids
+
+
+class TestRowIndex:
+    def test_offsets_follow_inserts(self):
+        index = RowIndex(header_row=2, last_row=6)
+        for row, test_id in [(3, "A"), (4, "B"), (6, "C")]:
+            index._keys[test_id] = (row - 2, None)
+        assert index.insert_after("A", "N1") == 4
+        assert index.insert_after("N1", "N2") == 5
+        assert index.insert_after("A", "N0") == 4
+        assert [index.row_of(k) for k in ["A", "N0", "N1", "N2", "B", "C"]] == [
+            3, 4, 5, 6, 7, 9,
+        ]
+
+
+class TestPreflight:
+    def test_missing_keys_and_chained_inserts(self):
+        ops = [
+            UpdateOperation(test_id="X", set_values={}),
+            InsertOperation(after_test_id="A", row={"Test ID": "N1"}),
+            InsertOperation(after_test_id="N1", row={"Test ID": "N2"}),
+            InsertOperation(after_test_id="GONE", row={"Test ID": "N3"}),
+            UpdateOperation(test_id="N3", set_values={}),
+        ]
+        missing = preflight_missing_keys(ops, {"A"})
+        assert set(missing) == {0, 3, 4}
+        assert "GONE" in missing[3]
+
+
+class TestApplyPatch:
+    def test_inserts_and_updates(self, tmp_path, items_workbook):
+        base = tmp_path / "base.xlsx"
+        out = tmp_path / "out.xlsx"
+        items_workbook(["A", "B", None, "C"], preamble=True).save(base)
+        patch = PatchFile(operations=[
+            InsertOperation(after_test_id="A", row={"Test ID": "N1"}),
+            InsertOperation(after_test_id="N1", row={"Test ID": "N2"}),
+            InsertOperation(after_test_id="A", row={"Test ID": "N0"}),
+            UpdateOperation(test_id="C", set_values={"試験手順": "new C"}),
+            UpdateOperation(test_id="N2", set_values={"試験手順": "new N2"}),
+            UpdateOperation(test_id="MISSING", set_values={"試験手順": "x"}),
+        ])
+        entries = apply_patch(base, patch, out)
+
+        assert _read_ids(out) == ["A", "N0", "N1", "N2", "B", None, "C"]
+        assert [e["row_num"] for e in entries if e["type"] == "insert"] == [4, 5, 4]
+        warnings = [e for e in entries if e["type"] == "warning"]
+        assert [w["test_id"] for w in warnings] == ["MISSING"]
+
+        wb = openpyxl.load_workbook(out)
+        ws = wb["試験項目"]
+        assert ws.cell(row=9, column=4).value == "new C"
+        assert ws.cell(row=6, column=4).value == "new N2"
+        wb.close()
+
+    def test_existing_rows_keep_height_and_inserts_copy_template(self, tmp_path, items_workbook):
+        base = tmp_path / "base.xlsx"
+        out = tmp_path / "out.xlsx"
+        wb = items_workbook(["A", "B"], preamble=True)
+        ws = wb["試験項目"]
+        ws.row_dimensions[3].height = 30
+        ws.row_dimensions[4].height = 50
+        ws.cell(row=3, column=5).value = "=B3"
+        wb.save(base)
+
+        patch = PatchFile(operations=[
+            InsertOperation(after_test_id="A", row={"Test ID": "N1"}),
+            InsertOperation(after_test_id="N1", row={"Test ID": "N2"}),
+        ])
+        apply_patch(base, patch, out)
+
+        wb = openpyxl.load_workbook(out)
+        ws = wb["試験項目"]
+        assert [ws.cell(row=r, column=2).value for r in range(3, 7)] == ["A", "N1", "N2", "B"]
+        assert [ws.row_dimensions[r].height for r in range(3, 7)] == [30, 30, 30, 50]
+        assert ws.cell(row=4, column=5).value == "=B3"
+        wb.close()
+
+    def test_insert_copies_only_styled_columns(self, tmp_path, items_workbook):
+        from openpyxl.styles import Font
+
+        base = tmp_path / "base.xlsx"
+        out = tmp_path / "out.xlsx"
+        wb = items_workbook(["A", "B"], preamble=True)
+        ws = wb["試験項目"]
+        ws.cell(row=3, column=3).font = Font(bold=True)
+        ws.cell(row=1, column=500).font = Font(italic=True)  # stray far-right cell
+        wb.save(base)
+
+        patch = PatchFile(operations=[
+            InsertOperation(after_test_id="A", row={"Test ID": "N1"}),
+        ])
+        apply_patch(base, patch, out)
+
+        wb = openpyxl.load_workbook(out)
+        ws = wb["試験項目"]
+        assert ws.cell(row=4, column=3).font.bold is True
+        assert max(col for row, col in ws._cells if row == 4) < 500
+        wb.close()
+
+
+class TestApplyPatchToSheetRenumber:
+    @pytest.fixture
+    def sheet(self, tmp_path, items_workbook):
+        def build(ids):
+            base = tmp_path / "base.xlsx"
+            items_workbook(ids, preamble=True).save(base)
+            return openpyxl.load_workbook(base)["試験項目"]
+        return build
+
+    def _numbers(self, ws):
+        return [ws.cell(row=r, column=1).value for r in range(3, ws.max_row + 1)]
+
+    def test_renumbers_from_first_insert(self, sheet):
+        ws = sheet(["A", "B", "C"])
+        patch = PatchFile(operations=[
+            InsertOperation(after_test_id="B", row={"Test ID": "N1"}),
+        ])
+        result = apply_patch_to_sheet(ws, patch)
+        assert result.renumbered == 4
+        assert self._numbers(ws) == [1, 2, 3, 4]
+
+    def test_skips_consistent_prefix(self, sheet, monkeypatch):
+        ws = sheet(["A", "B", "C"])
+        calls = []
+
+        def spy(*args, **kwargs):
+            calls.append(kwargs)
+            return renumber_sheet(*args, **kwargs)
+
+        monkeypatch.setattr(excel_write, "renumber_sheet", spy)
+        patch = PatchFile(operations=[
+            InsertOperation(after_test_id="C", row={"Test ID": "N1"}),
+        ])
+        result = apply_patch_to_sheet(ws, patch)
+        assert result.renumbered == 4
+        assert (calls[0]["start_row"], calls[0]["start_count"]) == (6, 3)
+        assert self._numbers(ws) == [1, 2, 3, 4]
+
+    def test_fixes_out_of_sequence_numbers_above_change(self, sheet):
+        ws = sheet(["A", "B", "C"])
+        ws.cell(row=4, column=1).value = 99
+        patch = PatchFile(operations=[
+            InsertOperation(after_test_id="C", row={"Test ID": "N1"}),
+        ])
+        apply_patch_to_sheet(ws, patch)
+        assert self._numbers(ws) == [1, 2, 3, 4]
@@ -2,7 +2,8 @@
 
 import pytest
 
-from app.filter_rules import is_target_row
+from app.filter_rules import RowFilter, is_target_row, legacy_filter, load_filter
+from app.test_items_table import TestItemsTable
 
 
 class TestIsTargetRow:
@@ -53,3 +54,57 @@ class TestIsTargetRow:
     def test_mr_exclusive_in_longer_text(self):
         """#MRExclusive in longer remark should reject."""
         assert is_target_row("#MR #MRExclusive extra", "QC(Verification)") is False
+
+
+class TestRowFilter:
+    @staticmethod
+    def _table():
+        return TestItemsTable({
+            "Test ID": ["T-1", "T-2", "T-3", "T-4"],
+            "Section": ["5.1 Audio", "5.2 Video", "6 Data", "5.3 Data"],
+            "Remark": ["#MR", "#MR #MRExclusive", "#MR", "note"],
+            "チーム分担": ["QC（Verification）", "QC(Verification)", "Dev", "QC(Verification)"],
+        })
+
+    def test_legacy_expression_matches_is_target_row(self):
+        table = self._table()
+        expected = [
+            is_target_row(remark, team)
+            for remark, team in zip(table.column("Remark"), table.column("チーム分担"))
+        ]
+        assert RowFilter(legacy_filter()).mask(table) == expected
+
+    def test_operators_precedence_and_columns(self):
+        row_filter = RowFilter(
+            'tag "#MR" and (team in ("Dev", "QC(Verification)") or section startswith "5.")'
+            ' and not `Test ID` matches "2$"'
+        )
+        table = self._table()
+        assert row_filter.mask(table) == [True, False, True, False]
+        assert [row_filter.matches(row) for row in table.rows()] == [True, False, True, False]
+
+    def test_load_filter(self, tmp_path):
+        path = tmp_path / "filter.yml"
+        path.write_text('filter: section == "6 Data"\n', encoding="utf-8")
+        assert RowFilter(load_filter(path)).mask(self._table()) == [False, False, True, False]
+
+    @pytest.mark.parametrize("source, message", [
+        ("tag", "expected a quoted string"),
+        ('foo == "x"', "expected a column"),
+        ('team in ("a"', "found end of filter"),
+        ('title matches "("', "Filter regex"),
+        ('tag "x" tag "y"', "column 9"),
+    ])
+    def test_syntax_errors(self, source, message):
+        with pytest.raises(ValueError, match=message):
+            RowFilter(source)
+
+    def test_node_without_mask_cannot_be_built(self):
+        from app.filter_rules import _Node
+
+        class TestOnly(_Node):
+            def test(self, row):
+                return True
+
+        with pytest.raises(TypeError, match="abstract"):
+            TestOnly()
@@ -0,0 +1,89 @@
+"""Tests for gen_manifest module."""
+
+from pathlib import Path
+
+from app.gen_manifest import GenerationManifest, commit_pending, source_hash
+from app.patch_io import read_patch
+from app.patch_model import UpdateOperation
+
+_SAMPLE = Path(__file__).parent.parent / "sample"
+_ENGLISH = _SAMPLE / "OTR-MA-LQC-TEST-RevE13-20260130_E_for MR Testing_分担 (2).xlsx"
+_MASTER = _SAMPLE / "【S社向けMRリグレッション2試験】RevE081_Master_v0.5 1 (3).xlsx"
+
+_COLUMNS = ["Test Procedure", "Check item"]
+
+
+def _row(procedure):
+    return {"Test ID": "T", "Test Procedure": procedure, "Check item": "ok"}
+
+
+class TestGenerationManifest:
+    def test_classifies_against_previous_run(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        first = GenerationManifest(path, "v1")
+        assert first.classify("A", "h") == "new"
+        first.record("A", "h", {"試験手順": "訳A"})
+        first.record("B", "h", {})
+        first.save()
+        assert commit_pending(path)
+
+        second = GenerationManifest(path, "v1")
+        assert second.classify("A", "h") == "unchanged"
+        assert second.classify("B", "other") == "changed"
+        assert second.classify("C", "h") == "new"
+        assert second.output("A") == {"試験手順": "訳A"}
+        second.record("A", "h", second.output("A"))
+        assert second.vanished() == ["B"]
+
+    def test_translator_change_invalidates_entries(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        first = GenerationManifest(path, "v1")
+        first.record("A", "h", {})
+        first.save()
+        commit_pending(path)
+
+        second = GenerationManifest(path, "v2")
+        assert second.translator_changed
+        assert second.classify("A", "h") == "changed"
+
+    def test_source_hash_covers_only_listed_columns(self):
+        base = source_hash(_row("step"), _COLUMNS)
+        assert source_hash({**_row("step"), "Remark": "x"}, _COLUMNS) == base
+        assert source_hash(_row("step 2"), _COLUMNS) != base
+
+    def test_saved_entries_stay_pending_until_committed(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        first = GenerationManifest(path, "v1")
+        first.record("A", "h", {})
+        first.save()
+
+        assert GenerationManifest(path, "v1").classify("A", "h") == "new"
+        assert commit_pending(path)
+        assert GenerationManifest(path, "v1").classify("A", "h") == "unchanged"
+        assert not commit_pending(path)
+
+
+def _generate(tmp_path, name, *extra):
+    from app import cli_generator
+
+    patch = tmp_path / f"{name}.yml"
+    cli_generator.main([
+        "--english-xlsx", str(_ENGLISH), "--base-xlsx", str(_MASTER),
+        "--out-patch", str(patch), "--out-report", str(tmp_path / f"{name}.md"),
+        "--manifest", str(tmp_path / "manifest.json"), "--no-cache", *extra,
+    ])
+    return [
+        "update" if isinstance(op, UpdateOperation) else "insert"
+        for op in read_patch(patch).operations
+    ]
+
+
+def test_regenerating_before_apply_keeps_updates(tmp_path):
+    first = _generate(tmp_path, "first")
+    assert "update" in first
+
+    # The first patch was not applied: the regenerated patch must still carry it
+    assert _generate(tmp_path, "second") == first
+
+    # Once committed, unchanged rows drop out (inserts missing from the master stay)
+    assert set(_generate(tmp_path, "third", "--commit-manifest")) == {"insert"}
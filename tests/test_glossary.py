@@ -0,0 +1,46 @@
+"""Tests for glossary module."""
+
+from app.glossary import compile_glossary, load_glossary
+
+
+class TestCompiledGlossary:
+    def test_longest_term_wins_regardless_of_order(self):
+        glossary = compile_glossary({
+            "screenshot": "スクリーンショット",
+            "capture screenshot": "スクリーンショットを取得する",
+            "connect": "接続する",
+            "disconnect": "切断する",
+            "check": "確認する",
+            "check item": "判定基準",
+        })
+        assert glossary.sub("Capture Screenshot, then disconnect") == (
+            "スクリーンショットを取得する, then 切断する"
+        )
+        assert glossary.sub("check items; check it") == "判定基準s; 確認する it"
+
+    def test_replacements_are_not_rescanned(self):
+        glossary = compile_glossary({"a": "b", "b": "c", "x.y": "z"})
+        assert glossary.sub("ab x.y xzy") == "bc z xzy"
+
+    def test_disk_cache_keyed_by_content(self, tmp_path):
+        path = tmp_path / "glossary.yml"
+        path.write_text("terms:\n  device: 端末\n", encoding="utf-8")
+        cache = tmp_path / "cache"
+
+        first = load_glossary(path, cache_dir=cache)
+        assert len(list(cache.iterdir())) == 1
+        cached = load_glossary(path, cache_dir=cache)
+        assert cached.sub("Device") == first.sub("Device") == "端末"
+        assert cached.digest == first.digest
+
+        path.write_text("terms:\n  device: デバイス\n", encoding="utf-8")
+        changed = load_glossary(path, cache_dir=cache)
+        assert changed.sub("device") == "デバイス"
+        assert changed.digest != first.digest
+
+    def test_cached_load_reuses_compiled_glossary_in_process(self, tmp_path):
+        path = tmp_path / "glossary.yml"
+        path.write_text("terms:\n  reboot: 再起動\n", encoding="utf-8")
+        first = load_glossary(path, cache_dir=tmp_path / "cache")
+        assert load_glossary(path, cache_dir=tmp_path / "cache") is first
+        assert load_glossary(path) is not first  # no cache: always recompiled
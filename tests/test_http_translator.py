@@ -0,0 +1,55 @@
+"""Tests for http_translator module (against the local stub server)."""
+
+import time
+
+import pytest
+
+from app.http_translator import HttpTranslator, TranslationError
+from app.translation_stub import StubTranslationServer
+
+
+def _upper(text):
+    return text.upper()
+
+
+class TestHttpTranslator:
+    def test_batches_dedup_and_keep_order(self):
+        texts = ["a", "b", "", "a", "c", "d", "e"]
+        with StubTranslationServer(_upper) as stub:
+            translator = HttpTranslator(stub.url, batch_size=2)
+            assert translator.translate_batch(texts) == ["A", "B", "", "A", "C", "D", "E"]
+        assert sorted(stub.batches) == [1, 2, 2]
+
+    def test_concurrency_is_limited(self):
+        texts = [f"t{i}" for i in range(8)]
+        with StubTranslationServer(_upper, latency=0.2) as stub:
+            translator = HttpTranslator(stub.url, batch_size=1, concurrency=4)
+            start = time.perf_counter()
+            assert translator.translate_batch(texts) == [t.upper() for t in texts]
+            elapsed = time.perf_counter() - start
+        assert stub.peak_concurrency == 4
+        assert elapsed < 8 * 0.2
+
+    def test_retries_failed_requests(self):
+        with StubTranslationServer(_upper, fail_first=2) as stub:
+            translator = HttpTranslator(stub.url, retries=2, backoff=0.01)
+            assert translator.translate("x") == "X"
+        assert (translator.requests, translator.retried) == (3, 2)
+
+    def test_gives_up_after_retries(self):
+        with StubTranslationServer(_upper, fail_first=5) as stub:
+            translator = HttpTranslator(stub.url, retries=1, backoff=0.01)
+            with pytest.raises(TranslationError, match="2 attempt"):
+                translator.translate("x")
+
+
+def test_cli_rejects_rule_based_options(capsys):
+    from app import cli_generator
+
+    with pytest.raises(SystemExit) as exc:
+        cli_generator.main([
+            "--english-xlsx", "e.xlsx", "--base-xlsx", "b.xlsx",
+            "--translator-url", "http://127.0.0.1:1/translate", "--jobs", "2",
+        ])
+    assert exc.value.code == 2
+    assert "--jobs: only for rule-based translation" in capsys.readouterr().err
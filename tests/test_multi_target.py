@@ -0,0 +1,85 @@
+"""Tests for multi_target module (one patch, many workbooks)."""
+
+import openpyxl
+import pytest
+
+from app.multi_target import apply_to_targets, resolve_targets
+from app.patch_model import InsertOperation, PatchFile, UpdateOperation
+
+
+def _patch():
+    return PatchFile(operations=[
+        InsertOperation(after_test_id="A", row={"Test ID": "N1"}),
+        UpdateOperation(test_id="B", set_values={"試験手順": "new B"}),
+    ])
+
+
+@pytest.fixture
+def bases(tmp_path, items_workbook):
+    src = tmp_path / "in"
+    src.mkdir()
+    paths = []
+    for name, ids in [("m1.xlsx", ["A", "B"]), ("m2.xlsx", ["A", "B", "C"])]:
+        items_workbook(ids).save(src / name)
+        paths.append(str(src / name))
+    return paths
+
+
+class TestResolveTargets:
+    def test_glob_maps_into_output_dir(self, bases, tmp_path):
+        targets = resolve_targets(
+            [("x.xlsx", "y.xlsx")], str(tmp_path / "in" / "*.xlsx"), tmp_path / "out"
+        )
+        assert targets == [
+            ("x.xlsx", "y.xlsx"),
+            (bases[0], str(tmp_path / "out" / "m1.xlsx")),
+            (bases[1], str(tmp_path / "out" / "m2.xlsx")),
+        ]
+
+    def test_rejects_overwriting_base_or_duplicate_output(self, bases, tmp_path):
+        with pytest.raises(ValueError, match="overwrite"):
+            resolve_targets(None, str(tmp_path / "in" / "*.xlsx"), tmp_path / "in")
+        with pytest.raises(ValueError, match="Duplicate"):
+            resolve_targets([(bases[0], "o.xlsx"), (bases[1], "o.xlsx")])
+
+
+class TestApplyToTargets:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_failure_is_isolated_per_workbook(self, bases, tmp_path, workers):
+        targets = [
+            (bases[0], str(tmp_path / "out" / "m1.xlsx")),
+            (str(tmp_path / "missing.xlsx"), str(tmp_path / "out" / "missing.xlsx")),
+            (bases[1], str(tmp_path / "out" / "m2.xlsx")),
+        ]
+        results = apply_to_targets(_patch(), targets, workers=workers)
+
+        assert [(t.base, t.ok) for t in results] == [
+            (bases[0], True), (targets[1][0], False), (bases[1], True),
+        ]
+        assert results[1].error.startswith("FileNotFoundError")
+        assert [t.result.renumbered for t in results if t.ok] == [3, 4]
+        wb = openpyxl.load_workbook(tmp_path / "out" / "m2.xlsx")
+        assert [c.value for c in wb["試験項目"]["B"]] == ["Test ID", "A", "N1", "B", "C"]
+        wb.close()
+
+    def test_cli_combined_report_and_exit_status(self, bases, tmp_path):
+        from app import cli_patcher
+        from app.patch_io import write_patch
+
+        write_patch(_patch(), tmp_path / "patch.yml")
+        with pytest.raises(SystemExit) as exc:
+            cli_patcher.main([
+                "--patch", str(tmp_path / "patch.yml"),
+                "--base-glob", str(tmp_path / "in" / "*.xlsx"),
+                "--output-dir", str(tmp_path / "out"),
+                "--target", str(tmp_path / "missing.xlsx"), str(tmp_path / "x.xlsx"),
+                "--workers", "1", "--writer", "surgical",
+                "--report", str(tmp_path / "diff.md"),
+            ])
+        assert exc.value.code == 1
+
+        report = (tmp_path / "diff.md").read_text(encoding="utf-8")
+        assert "- Workbooks: 3\n- Succeeded: 2\n- Failed: 1" in report
+        assert "| OK | 1 | 1 | 0 |" in report
+        assert "**FAILED**: FileNotFoundError" in report
+        assert (tmp_path / "out" / "m1.xlsx").exists()
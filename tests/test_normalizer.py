@@ -2,7 +2,22 @@
 
 import pytest
 
-from app.normalizer import normalize_brackets, normalize_cell_text, normalize_for_comparison
+from app.normalizer import (
+    normalize_brackets,
+    normalize_cell_text,
+    normalize_column,
+    normalize_for_comparison,
+)
+
+
+class TestNormalizeColumn:
+    def test_matches_normalize_cell_text(self):
+        values = ["clean", " padded ", "a_x000D_b", "a\r\nb", "a\n\n\n\nb", None, 3, "", "\u3000x"]
+        assert normalize_column(values) == [normalize_cell_text(v) for v in values]
+
+    def test_clean_cells_are_kept_as_is(self):
+        value = "".join("clean text")
+        assert normalize_column([value])[0] is value
 
 
 class TestNormalizeCellText:
@@ -0,0 +1,65 @@
+"""Tests for patch_merge module."""
+
+import pytest
+
+from app.excel_write import apply_patch_to_sheet
+from app.patch_merge import merge_patches
+from app.patch_model import InsertOperation, PatchFile, UpdateOperation
+
+
+def _values(ws):
+    return [[c.value for c in row] for row in ws.iter_rows()]
+
+
+def _patches():
+    return [
+        PatchFile(operations=[
+            UpdateOperation("A", {"試験手順": "a1"}),
+            InsertOperation("A", {"Test ID": "N1", "試験手順": "n1"}),
+            InsertOperation("N1", {"Test ID": "N2"}),
+        ]),
+        PatchFile(operations=[
+            UpdateOperation("A", {"試験手順": "a2", "Test Title": "t"}),
+            UpdateOperation("N1", {"試験手順": "n1'", "自動入力": "x"}),
+            UpdateOperation("B", {"Test ID": "B2"}),
+            InsertOperation("A", {"Test ID": "N0"}),
+            UpdateOperation("N1", {"Test ID": "M1"}),
+        ]),
+        PatchFile(operations=[
+            InsertOperation("M1", {"Test ID": "N3"}),
+            UpdateOperation("B2", {"試験手順": "b"}),
+            InsertOperation("B", {"Test ID": "lost"}),
+        ]),
+    ]
+
+
+class TestMergePatches:
+    def test_same_sheet_as_sequential_application(self, items_workbook):
+        def sheet():
+            return items_workbook(["A", "B", "C"], extra={"自動入力": "auto"}).active
+
+        sequential = sheet()
+        for patch in _patches():
+            apply_patch_to_sheet(sequential, patch)
+
+        result = merge_patches(_patches())
+        merged = sheet()
+        apply_patch_to_sheet(merged, result.patch)
+
+        assert _values(merged) == _values(sequential)
+        assert result.input_operations == 11
+        assert len(result.patch.operations) == 6
+        assert result.warnings == [
+            "patch 3 op 3: after_key 'B' was renamed by an earlier patch; insert dropped."
+        ]
+
+    def test_folds_updates_into_inserts(self):
+        ops = merge_patches(_patches()).patch.operations
+        assert ops[0] == UpdateOperation("A", {"試験手順": "a2", "Test Title": "t"})
+        assert ops[1] == InsertOperation("A", {"Test ID": "M1", "試験手順": "n1'"})
+        assert ops[2] == InsertOperation("M1", {"Test ID": "N2"})
+        assert ops[3] == UpdateOperation("B", {"Test ID": "B2", "試験手順": "b"})
+
+    def test_rejects_different_sheets(self):
+        with pytest.raises(ValueError, match="different sheets"):
+            merge_patches([PatchFile(), PatchFile(sheet="Other")])
@@ -0,0 +1,69 @@
+"""Tests for patch_model and patch_io modules."""
+
+import json
+import pickle
+
+import pytest
+
+from app.patch_io import read_patch, write_patch
+from app.patch_model import InsertOperation, PatchFile, UpdateOperation
+
+
+def _data():
+    return {
+        "sheet": "試験項目",
+        "key_columns": ["Test ID"],
+        "operations": [
+            {"op": "update", "key": {"Test ID": "A"}, "set": {"前提条件": "p", "試験手順": "s"}},
+            {"op": "update", "key": {"Test ID": "B"}, "set": {"前提条件": "q", "試験手順": "t"}},
+            {"op": "insert", "after_key": {"Test ID": "A"}, "row": {"Test ID": "N1"}},
+            {"op": "update", "key": {"Test ID": "C"}},
+        ],
+    }
+
+
+class TestPatchModel:
+    def test_round_trip(self):
+        patch = PatchFile.from_dict(_data())
+        expected = _data()
+        expected["operations"][3]["set"] = {}
+        assert patch.to_dict() == expected
+        assert pickle.loads(pickle.dumps(patch)) == patch
+
+    def test_operations_share_interned_layout(self):
+        ops = PatchFile.from_dict(_data()).operations
+        assert ops[0].columns is ops[1].columns
+        assert ops[0].values == ("p", "s")
+        assert not hasattr(ops[0], "__dict__")
+
+    def test_row_values_mapping_view(self):
+        op = InsertOperation("A", {"Test ID": "N1", "試験手順": "s"})
+        assert op.row["試験手順"] == "s"
+        assert op.row.get("判定基準") is None
+        assert "Test ID" in op.row and dict(op.row) == {"Test ID": "N1", "試験手順": "s"}
+        assert UpdateOperation("X", op.row).values is op.values
+
+
+class TestPatchIO:
+    @pytest.mark.parametrize("name", ["patch.yml", "patch.jsonl"])
+    def test_round_trip_by_extension(self, tmp_path, name):
+        patch = PatchFile.from_dict(_data())
+        patch.sheet = "Other"
+        write_patch(patch, tmp_path / name)
+        assert read_patch(tmp_path / name) == patch
+
+    def test_jsonl_is_one_operation_per_line(self, tmp_path):
+        write_patch(PatchFile.from_dict(_data()), tmp_path / "patch.jsonl")
+        lines = (tmp_path / "patch.jsonl").read_text(encoding="utf-8").splitlines()
+        assert json.loads(lines[0]) == {"sheet": "試験項目", "key_columns": ["Test ID"]}
+        assert [json.loads(line)["op"] for line in lines[1:]] == [
+            "update", "update", "insert", "update",
+        ]
+        assert "試験手順" in lines[1]  # not \u-escaped
+
+    def test_converter(self, tmp_path):
+        from app import cli_convert_patch
+
+        write_patch(PatchFile.from_dict(_data()), tmp_path / "patch.jsonl")
+        cli_convert_patch.main([str(tmp_path / "patch.jsonl"), str(tmp_path / "patch.yml")])
+        assert read_patch(tmp_path / "patch.yml") == PatchFile.from_dict(_data())
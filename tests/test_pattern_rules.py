@@ -0,0 +1,82 @@
+"""Tests for pattern_rules module."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from app.pattern_rules import DEFAULT_RULES, PatternRule, RuleEngine, load_rules
+
+
+class TestRuleEngine:
+    def test_first_rule_in_priority_order_wins(self):
+        engine = RuleEngine(DEFAULT_RULES)
+        # capture-screenshot outranks verify-that even though it matches later in the line
+        assert engine.apply("Verify that you capture a screenshot") == (
+            "Verify that you スクリーンショットを取得する"
+        )
+        assert engine.apply("verify that it boots") == "it bootsを確認する"
+        assert engine.apply("Nothing to do") == "Nothing to do"
+        assert engine.lines == 3
+        assert engine.hits == {
+            "capture-screenshot": 1, "verify-that": 1, "verify": 0,
+            "ensure-that": 0, "ensure": 0,
+        }
+
+    def test_case_sensitivity_is_per_rule(self):
+        engine = RuleEngine([
+            PatternRule("exact", r"^OK$", "可", ignore_case=False),
+            PatternRule("any", r"ok", "おk"),
+        ])
+        assert engine.apply("OK") == "可"
+        assert engine.apply("ok") == "おk"
+
+    def test_rule_that_changes_nothing_does_not_stop_the_search(self):
+        engine = RuleEngine([
+            PatternRule("no-op", r"^Reboot", "Reboot"),
+            PatternRule("reboot", r"^Reboot\s+(.+)", r"\1を再起動する"),
+        ])
+        assert engine.apply("Reboot the device") == "the deviceを再起動する"
+        assert engine.hits == {"no-op": 0, "reboot": 1}
+
+    def test_prefix_dispatch_matches_trying_every_rule(self):
+        rules = [
+            *DEFAULT_RULES,
+            PatternRule("named", r"^(?P<verb>Tap)\s+(\w+)", r"\2をタップする"),
+            PatternRule("optional", r"^Re?boot", "再起動"),
+            PatternRule("alternation", r"^Open|Close", "操作"),
+            PatternRule("exact", r"^TAP", "tap", ignore_case=False),
+        ]
+        engine = RuleEngine(rules)
+        lines = [
+            "Verify that it works", "\u212aeep it", "ſtart", "Rboot now", "Reboot now",
+            "Tap OK", "TAP", "tap", "Please Close it", "Ensure ok", "", "ensure",
+        ]
+        for line in lines:
+            expected = line
+            for rule in rules:
+                flags = re.IGNORECASE if rule.ignore_case else 0
+                result = re.sub(rule.pattern, rule.replace, line, flags=flags)
+                if result != line:
+                    expected = result
+                    break
+            assert engine.apply(line) == expected, line
+
+    def test_case_folded_prefix_uses_re_equivalents(self):
+        engine = RuleEngine([PatternRule("start", r"^start\b", "開始")])
+        # U+017F LATIN SMALL LETTER LONG S matches "s" under re.IGNORECASE
+        assert engine.apply("\u017ftart now") == "開始 now"
+
+
+class TestLoadRules:
+    def test_shipped_rules_match_defaults(self):
+        rules = load_rules(Path(__file__).parent.parent / "config" / "rules.yml")
+        assert [(r.name, r.replace) for r in rules] == [
+            (r.name, r.replace) for r in DEFAULT_RULES
+        ]
+
+    def test_missing_pattern(self, tmp_path):
+        path = tmp_path / "rules.yml"
+        path.write_text("rules:\n  - name: x\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="rule 1"):
+            load_rules(path)
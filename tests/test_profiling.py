@@ -0,0 +1,77 @@
+"""Tests for profiling module (per-stage measurements, --profile/--metrics-out)."""
+
+import json
+import time
+
+from app import profiling
+from app.patch_model import InsertOperation, PatchFile, UpdateOperation
+from app.profiling import Profiler
+
+
+class TestProfiler:
+    def test_nested_stage_times_are_exclusive(self):
+        with Profiler(trace_memory=False) as profiler:
+            with profiling.stage("outer"):
+                with profiling.stage("inner"):
+                    time.sleep(0.05)
+                profiling.count("cells", 2)
+            with profiling.stage("inner"):
+                pass
+            profiling.count("cells")
+
+        assert list(profiler.stages) == ["outer", "inner"]
+        assert profiler.stages["inner"].calls == 2
+        assert profiler.stages["inner"].wall >= 0.05
+        assert profiler.stages["outer"].wall < 0.05
+        assert profiler.counters == {"cells": 3}
+        parts = sum(s.wall for s in profiler.stages.values()) + profiler.other().wall
+        assert abs(parts - profiler.total.wall) < 1e-9
+
+    def test_peak_memory_of_stage_includes_nested_stages(self):
+        with Profiler() as profiler:
+            with profiling.stage("outer"):
+                with profiling.stage("inner"):
+                    data = bytearray(8 * 1024 * 1024)
+                    del data
+            with profiling.stage("after"):
+                pass
+
+        stages = profiler.stages
+        assert stages["inner"].peak >= 8 * 1024 * 1024
+        assert stages["outer"].peak >= stages["inner"].peak
+        assert stages["after"].peak < 8 * 1024 * 1024
+        assert profiler.total.peak >= stages["inner"].peak
+
+    def test_hooks_do_nothing_without_an_active_profiler(self):
+        with profiling.stage("load"):
+            profiling.count("cells_read", 5)
+        assert profiling._active is None
+
+
+def test_patcher_metrics_out(tmp_path, capsys, items_workbook):
+    from app import cli_patcher
+    from app.patch_io import write_patch
+
+    items_workbook(["A", "B"]).save(tmp_path / "base.xlsx")
+    write_patch(PatchFile(operations=[
+        InsertOperation(after_test_id="A", row={"Test ID": "N1", "試験手順": "new"}),
+        UpdateOperation(test_id="B", set_values={"試験手順": "new B"}),
+    ]), tmp_path / "patch.yml")
+
+    cli_patcher.main([
+        "--base", str(tmp_path / "base.xlsx"),
+        "--patch", str(tmp_path / "patch.yml"),
+        "--output", str(tmp_path / "out.xlsx"),
+        "--report", str(tmp_path / "diff.md"),
+        "--profile", "--metrics-out", str(tmp_path / "metrics.json"),
+    ])
+
+    metrics = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+    assert metrics["command"] == "patch"
+    assert list(metrics["stages"]) == [
+        "read patch", "load", "apply", "header detection", "renumber", "save", "report",
+    ]
+    # Insert (2 cells) + update (1 cell) + renumbered No. cells (rows 3 and 4)
+    assert metrics["counters"]["cells_written"] == 5
+    assert metrics["total"]["peak_bytes"] > 0
+    assert "renumber" in capsys.readouterr().out
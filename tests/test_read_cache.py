@@ -0,0 +1,100 @@
+"""Tests for read_cache module."""
+
+import os
+
+import pytest
+
+from app import excel_read
+from app.read_cache import ReadCache
+
+
+@pytest.fixture
+def japanese_xlsx(tmp_path, items_workbook):
+    path = tmp_path / "japanese.xlsx"
+    items_workbook(["J-001"]).save(path)
+    return path
+
+
+class TestReadCache:
+    def test_miss_then_hit(self, tmp_path):
+        cache = ReadCache(tmp_path / "cache")
+        src = tmp_path / "src.bin"
+        src.write_bytes(b"abc")
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"rows": [("a", 1)]}
+
+        assert cache.get_or_compute(src, "k", {}, compute) == {"rows": [("a", 1)]}
+        assert cache.get_or_compute(src, "k", {}, compute) == {"rows": [("a", 1)]}
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_content_change_invalidates(self, tmp_path):
+        cache = ReadCache(tmp_path / "cache")
+        src = tmp_path / "src.bin"
+        src.write_bytes(b"abc")
+        cache.get_or_compute(src, "k", {}, lambda: 1)
+        src.write_bytes(b"abd")
+        assert cache.get_or_compute(src, "k", {}, lambda: 2) == 2
+
+    def test_params_are_part_of_key(self, tmp_path):
+        cache = ReadCache(tmp_path / "cache")
+        src = tmp_path / "src.bin"
+        src.write_bytes(b"abc")
+        cache.get_or_compute(src, "k", {"sheet": "A"}, lambda: "A")
+        assert cache.get_or_compute(src, "k", {"sheet": "B"}, lambda: "B") == "B"
+
+    def test_eviction_keeps_size_bound(self, tmp_path):
+        cache = ReadCache(tmp_path / "cache", max_bytes=2500)
+        for i in range(5):
+            src = tmp_path / f"src{i}.bin"
+            src.write_bytes(str(i).encode())
+            cache.get_or_compute(src, "k", {}, lambda: os.urandom(1000))
+        total = sum(p.stat().st_size for p in (tmp_path / "cache").glob("*.bin"))
+        assert total <= 2500
+
+    def test_warm_read_skips_openpyxl(self, tmp_path, japanese_xlsx, monkeypatch):
+        cache = ReadCache(tmp_path / "cache")
+        first = excel_read.read_shikenkomoku_test_ids(japanese_xlsx, cache=cache)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("workbook should not be opened")
+
+        monkeypatch.setattr(excel_read.openpyxl, "load_workbook", fail)
+        assert excel_read.read_shikenkomoku_test_ids(japanese_xlsx, cache=cache) == first
+
+    def test_reader_backend_is_part_of_key(self, tmp_path, japanese_xlsx):
+        cache = ReadCache(tmp_path / "cache")
+        excel_read.read_shikenkomoku_test_ids(japanese_xlsx, cache=cache)
+        excel_read.read_shikenkomoku_test_ids(japanese_xlsx, cache=cache, reader="fast")
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    def test_hit_survives_concurrent_eviction(self, tmp_path, monkeypatch):
+        cache = ReadCache(tmp_path / "cache")
+        src = tmp_path / "src.bin"
+        src.write_bytes(b"abc")
+        cache.get_or_compute(src, "k", {}, lambda: "value")
+
+        def evicted(path, *args, **kwargs):
+            raise FileNotFoundError(path)
+
+        monkeypatch.setattr(os, "utime", evicted)
+        assert cache.get_or_compute(src, "k", {}, lambda: "other") == "value"
+
+    def test_unwritable_cache_dir_is_skipped(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_bytes(b"")
+        cache = ReadCache(blocker / "cache")
+        src = tmp_path / "src.bin"
+        src.write_bytes(b"abc")
+        assert cache.get_or_compute(src, "k", {}, lambda: "value") == "value"
+        assert cache.misses == 1
+
+    def test_store_leaves_no_temporary_files(self, tmp_path):
+        cache = ReadCache(tmp_path / "cache")
+        src = tmp_path / "src.bin"
+        src.write_bytes(b"abc")
+        cache.get_or_compute(src, "k", {}, lambda: "value")
+        assert [p.suffix for p in (tmp_path / "cache").iterdir()] == [".bin"]
@@ -0,0 +1,37 @@
+"""Tests for test_items_table module."""
+
+import pytest
+
+from app.test_items_table import TestItemsTable
+
+
+def _table():
+    return TestItemsTable({
+        "Test ID": ["T-1", "T-2", "T-3"],
+        "Section": ["".join("Audio"), "".join("Audio"), "Video"],
+        "Remark": ["#MR", "", "#MR"],
+    })
+
+
+class TestTestItemsTable:
+    def test_columns_rows_and_index(self):
+        table = _table()
+        assert len(table) == 3
+        assert table.position("T-2") == 1 and table.position("X") is None
+        assert "T-3" in table
+        assert table.row(0) == {"Test ID": "T-1", "Section": "Audio", "Remark": "#MR"}
+        assert table.column("Check item") == ["", "", ""]
+
+    def test_equal_values_share_one_object(self):
+        sections = _table().column("Section")
+        assert sections[0] is sections[1]
+
+    def test_compress_keeps_order_and_reindexes(self):
+        table = _table().compress([True, False, True])
+        assert table.column("Test ID") == ["T-1", "T-3"]
+        assert table.position("T-3") == 1
+        assert TestItemsTable.from_rows(list(table.rows())).to_columns() == table.to_columns()
+
+    def test_rejects_ragged_columns(self):
+        with pytest.raises(ValueError, match="length"):
+            TestItemsTable({"Test ID": ["a"], "Remark": []})
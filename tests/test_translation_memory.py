@@ -0,0 +1,107 @@
+"""Tests for translation_memory module."""
+
+import sqlite3
+
+import pytest
+
+from app import translation_memory
+from app.translation_memory import TranslationMemory
+from app.translator import MemoryTranslator, RuleBasedTranslator
+
+
+class TestTranslationMemory:
+    def test_entries_are_per_version_and_pins_win(self, tmp_path):
+        with TranslationMemory(tmp_path / "tm.sqlite") as memory:
+            memory.store({"Reboot": "再起動", "Lock": "ロック"}, "v1")
+            memory.pin("Lock", "画面ロック")
+            assert memory.lookup(["Reboot", "Lock", "Other"], "v1") == {
+                "Reboot": "再起動", "Lock": "画面ロック",
+            }
+            assert memory.lookup(["Reboot", "Lock"], "v2") == {"Lock": "画面ロック"}
+            assert (memory.recalled, memory.pinned) == (3, 2)
+            assert memory.prune("v2") == 2
+            assert memory.unpin("Lock") and not memory.unpin("Lock")
+
+    def test_lookup_is_chunked(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(translation_memory, "_BATCH", 3)
+        with TranslationMemory(tmp_path / "tm.sqlite") as memory:
+            entries = {f"line {i}": f"行{i}" for i in range(10)}
+            memory.store(entries, "v1")
+            assert memory.lookup(list(entries), "v1") == entries
+
+    def test_other_schema_version_is_refused_and_pins_kept(self, tmp_path):
+        path = tmp_path / "tm.sqlite"
+        with TranslationMemory(path) as memory:
+            memory.pin("Lock", "画面ロック")
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA user_version = 2")
+        conn.close()
+
+        with pytest.raises(ValueError, match="user_version 2"):
+            TranslationMemory(path)
+
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA user_version = 1")
+        conn.close()
+        with TranslationMemory(path) as memory:
+            assert memory.pins() == {"Lock": "画面ロック"}
+
+    def test_foreign_files_are_refused(self, tmp_path):
+        other = tmp_path / "other.sqlite"
+        conn = sqlite3.connect(other)
+        conn.execute("CREATE TABLE data (x)")
+        conn.close()
+        with pytest.raises(ValueError, match="schema version"):
+            TranslationMemory(other)
+
+        text = tmp_path / "notes.txt"
+        text.write_text("not a database" * 20, encoding="utf-8")
+        with pytest.raises(ValueError, match="not a translation memory"):
+            TranslationMemory(text)
+        assert text.read_text(encoding="utf-8") == "not a database" * 20
+
+
+class TestTranslatorWithMemory:
+    def test_warm_run_recalls_instead_of_translating(self, tmp_path):
+        path = tmp_path / "tm.sqlite"
+        texts = ["1. Verify the screen\n2. Lock the screen", "- Lock the screen"]
+
+        with TranslationMemory(path) as memory:
+            cold = MemoryTranslator(RuleBasedTranslator(), memory)
+            first = cold.translate_batch(texts)
+            assert memory.stored == 2
+
+        with TranslationMemory(path) as memory:
+            memory.pin("Lock the screen", "画面をロックする")
+            engine = RuleBasedTranslator()
+            warm = MemoryTranslator(engine, memory)
+            second = warm.translate_batch(texts)
+            assert engine.rules.lines == 0
+            assert warm.fingerprint != cold.fingerprint  # the pin changes output
+        assert first[0].startswith("1. the screenを確認する")
+        assert second == [
+            "1. the screenを確認する\n2. 画面をロックする", "- 画面をロックする",
+        ]
+
+    def test_wraps_any_translator(self, tmp_path):
+        class Upper:
+            fingerprint = "upper-v1"
+            batches: list[list[str]] = []
+
+            def translate(self, text):
+                return text.upper()
+
+            def translate_batch(self, texts):
+                texts = list(texts)
+                self.batches.append(texts)
+                return [t.upper() for t in texts]
+
+        inner = Upper()
+        with TranslationMemory(tmp_path / "tm.sqlite") as memory:
+            memory.store({"known line": "既知"}, "upper-v1")
+            translator = MemoryTranslator(inner, memory)
+            assert translator.translate_batch(["1. known line\n2. new line", "", "  "]) == [
+                "1. 既知\n2. NEW LINE", "", "  ",
+            ]
+            assert inner.batches == [["2. new line"]]
+            assert memory.lookup(["new line"], "upper-v1") == {"new line": "NEW LINE"}
@@ -0,0 +1,39 @@
+"""Tests for translator module."""
+
+from app.translator import RuleBasedTranslator
+
+
+def _translator(tmp_path, **kwargs):
+    path = tmp_path / "glossary.yml"
+    path.write_text("terms:\n  device: 端末\n", encoding="utf-8")
+    return RuleBasedTranslator(path, **kwargs)
+
+
+class TestRuleBasedTranslator:
+    def test_repeated_lines_hit_the_memo(self, tmp_path):
+        translator = _translator(tmp_path)
+        text = "Verify the device\nVerify the device\nReboot"
+        assert translator.translate(text) == "the 端末を確認する\nthe 端末を確認する\nReboot"
+        assert translator.memo_info() == (1, 2)
+        assert translator.rules.lines == 2
+
+    def test_translate_batch_dedups_and_keeps_order(self, tmp_path):
+        translator = _translator(tmp_path)
+        texts = ["Verify device", "", "Reboot", "Verify device"]
+        assert translator.translate_batch(texts) == [
+            "端末を確認する", "", "Reboot", "端末を確認する",
+        ]
+        assert translator.memo_info() == (0, 2)
+
+    def test_memo_can_be_disabled(self, tmp_path):
+        translator = _translator(tmp_path, memo_size=0)
+        assert translator.translate("Reboot\nReboot") == "Reboot\nReboot"
+        assert translator.memo_info() == (0, 0)
+        assert translator.rules.lines == 2
+
+    def test_parallel_output_matches_serial(self, tmp_path):
+        texts = [f"Verify device {i}\n- Reboot" for i in range(20)] * 2
+        serial = _translator(tmp_path)
+        parallel = _translator(tmp_path, jobs=2)
+        assert parallel.translate_batch(texts) == serial.translate_batch(texts)
+        assert parallel.rules.hits["verify"] == 20
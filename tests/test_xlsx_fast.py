@@ -0,0 +1,78 @@
+"""Tests for xlsx_fast module (parity with openpyxl read-only mode)."""
+
+import datetime
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+from app.excel_read import read_shikenkomoku_test_ids, read_test_items
+from app.xlsx_fast import FastWorkbook
+
+SAMPLES = sorted((Path(__file__).parent.parent / "sample").glob("*.xlsx"))
+
+
+@pytest.fixture
+def mixed_xlsx(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["text", 1, 2.5, True, None, "=1+1"])
+    ws.append([])
+    ws.append([None, "x", None])
+    ws["A4"] = datetime.datetime(2026, 1, 30, 12, 0)
+    ws["C5"] = "last"
+    other = wb.create_sheet("試験項目")
+    other.append(["No.", "Test ID", "Test Title"])
+    other.append([1, "J-001", "a"])
+    path = tmp_path / "mixed.xlsx"
+    wb.save(path)
+    return path
+
+
+def _openpyxl_rows(path, sheet, **kwargs):
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    rows = list(wb[sheet].iter_rows(values_only=True, **kwargs))
+    wb.close()
+    return rows
+
+
+class TestFastWorkbook:
+    def test_sheetnames(self, mixed_xlsx):
+        with FastWorkbook(mixed_xlsx) as wb:
+            assert wb.sheetnames == ["Data", "試験項目"]
+
+    def test_missing_sheet(self, mixed_xlsx):
+        with FastWorkbook(mixed_xlsx) as wb:
+            with pytest.raises(KeyError):
+                wb["nope"]
+
+    @pytest.mark.parametrize("kwargs", [{}, {"max_col": 4}, {"min_row": 2, "max_row": 7}])
+    def test_rows_match_openpyxl(self, mixed_xlsx, kwargs):
+        with FastWorkbook(mixed_xlsx) as wb:
+            fast_rows = list(wb["Data"].iter_rows(**kwargs))
+        assert fast_rows == _openpyxl_rows(mixed_xlsx, "Data", **kwargs)
+
+    @pytest.mark.filterwarnings("ignore::UserWarning")
+    @pytest.mark.parametrize("path", SAMPLES, ids=lambda p: p.name)
+    def test_every_sample_sheet_matches_openpyxl(self, path):
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        with FastWorkbook(path) as fast:
+            for name in wb.sheetnames:
+                expected = list(wb[name].iter_rows(values_only=True))
+                assert list(fast[name].iter_rows()) == expected, name
+        wb.close()
+
+    def test_date_cell(self, mixed_xlsx):
+        with FastWorkbook(mixed_xlsx) as wb:
+            rows = list(wb["Data"].iter_rows())
+        assert rows[3][0] == datetime.datetime(2026, 1, 30, 12, 0)
+
+
+class TestReaderSelection:
+    def test_fast_reader_matches(self, mixed_xlsx):
+        assert read_shikenkomoku_test_ids(mixed_xlsx, reader="fast") == ["J-001"]
+
+    def test_unknown_reader(self, mixed_xlsx):
+        with pytest.raises(ValueError, match="Unknown reader"):
+            read_test_items(mixed_xlsx, reader="xlrd")
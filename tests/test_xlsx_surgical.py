@@ -0,0 +1,175 @@
+"""Tests for xlsx_surgical module (parity with the openpyxl writer)."""
+
+import io
+import zipfile
+
+import openpyxl
+import pytest
+from openpyxl.styles import Font
+
+from app.excel_write import apply_patch_to_sheet
+from app.patch_model import InsertOperation, PatchFile, UpdateOperation
+from app.xlsx_surgical import _SharedStrings, apply_patch_surgical, preview_patch
+
+
+@pytest.fixture
+def base_xlsx(tmp_path, items_workbook):
+    wb = items_workbook(["A", "B", None, "C"], preamble=True, extra={"判定": None})
+    ws = wb.active
+    for row in range(3, 7):
+        ws.cell(row=row, column=5).value = f"=B{row}"
+        ws.cell(row=row, column=3).font = Font(bold=True)
+    ws.row_dimensions[3].height = 30
+    ws.row_dimensions[4].height = 50
+    ws.merge_cells("F5:F6")
+    other = wb.create_sheet("Other")
+    other["A1"] = "untouched"
+    path = tmp_path / "base.xlsx"
+    wb.save(path)
+    return path
+
+
+def _patch():
+    return PatchFile(operations=[
+        InsertOperation(after_test_id="A", row={"Test ID": "N1", "試験手順": "手順 N1"}),
+        InsertOperation(after_test_id="N1", row={"Test ID": "N2"}),
+        UpdateOperation(test_id="C", set_values={"試験手順": "new C"}),
+        UpdateOperation(test_id="N2", set_values={"試験手順": "new N2"}),
+        UpdateOperation(test_id="MISSING", set_values={"試験手順": "x"}),
+    ])
+
+
+def _snapshot(path):
+    wb = openpyxl.load_workbook(path)
+    ws = wb["試験項目"]
+    cells = {
+        (c.row, c.column): (c.value, c.font.b)
+        for row in ws.iter_rows() for c in row
+        if c.value is not None or c.has_style
+    }
+    heights = {r: ws.row_dimensions[r].height for r in range(1, ws.max_row + 1)}
+    wb.close()
+    return cells, heights
+
+
+class _ListSink:
+    def __init__(self):
+        self.entries = []
+
+    def emit(self, entry):
+        self.entries.append(entry)
+
+
+class TestApplyPatchSurgical:
+    def test_matches_openpyxl_writer(self, base_xlsx, tmp_path):
+        wb = openpyxl.load_workbook(base_xlsx)
+        expected = apply_patch_to_sheet(wb["試験項目"], _patch())
+        wb.save(tmp_path / "openpyxl.xlsx")
+
+        result = apply_patch_surgical(base_xlsx, _patch(), tmp_path / "surgical.xlsx")
+
+        assert result == expected
+        assert _snapshot(tmp_path / "surgical.xlsx") == _snapshot(tmp_path / "openpyxl.xlsx")
+
+    def test_sink_order_matches_openpyxl_writer(self, base_xlsx, tmp_path):
+        # Updates out of sheet order, one repeated, around inserts and a warning
+        patch = PatchFile(operations=[
+            UpdateOperation(test_id="C", set_values={"試験手順": "new C"}),
+            InsertOperation(after_test_id="A", row={"Test ID": "N1"}),
+            UpdateOperation(test_id="B", set_values={"試験手順": "new B"}),
+            UpdateOperation(test_id="MISSING", set_values={"試験手順": "x"}),
+            UpdateOperation(test_id="A", set_values={"試験手順": "new A"}),
+            UpdateOperation(test_id="C", set_values={"判定": "OK"}),
+        ])
+        openpyxl_sink, surgical_sink, preview_sink = _ListSink(), _ListSink(), _ListSink()
+        wb = openpyxl.load_workbook(base_xlsx)
+        apply_patch_to_sheet(wb["試験項目"], patch, sink=openpyxl_sink)
+        apply_patch_surgical(base_xlsx, patch, tmp_path / "out.xlsx", sink=surgical_sink)
+        preview_patch(base_xlsx, patch, sink=preview_sink)
+
+        assert [(e["type"], e["test_id"]) for e in openpyxl_sink.entries] == [
+            ("insert", "N1"), ("warning", "MISSING"),
+            ("update", "C"), ("update", "B"), ("update", "A"), ("update", "C"),
+        ]
+        assert surgical_sink.entries == openpyxl_sink.entries
+        assert preview_sink.entries == openpyxl_sink.entries
+
+    def test_other_members_copied_byte_for_byte(self, base_xlsx, tmp_path):
+        out = tmp_path / "out.xlsx"
+        apply_patch_surgical(base_xlsx, _patch(), out)
+
+        with zipfile.ZipFile(base_xlsx) as src, zipfile.ZipFile(out) as dst:
+            assert dst.testzip() is None
+            changed = {
+                info.filename for info in dst.infolist()
+                if (info.CRC, info.compress_size)
+                != (src.getinfo(info.filename).CRC, src.getinfo(info.filename).compress_size)
+            }
+            # openpyxl-written fixtures use inline strings (no sharedStrings part)
+            assert changed == {"xl/worksheets/sheet1.xml", "xl/workbook.xml"}
+            assert b'fullCalcOnLoad="1"' in dst.read("xl/workbook.xml")
+
+    def test_ranges_follow_inserted_rows(self, base_xlsx, tmp_path):
+        out = tmp_path / "out.xlsx"
+        apply_patch_surgical(base_xlsx, _patch(), out)
+
+        wb = openpyxl.load_workbook(out)
+        ws = wb["試験項目"]
+        assert [str(r) for r in ws.merged_cells.ranges] == ["F7:F8"]
+        assert ws.dimensions == "A1:F8"
+        wb.close()
+
+    def test_no_changes_keeps_package(self, base_xlsx, tmp_path):
+        out = tmp_path / "out.xlsx"
+        patch = PatchFile(operations=[
+            UpdateOperation(test_id="MISSING", set_values={"試験手順": "x"}),
+        ])
+        result = apply_patch_surgical(base_xlsx, patch, out, renumber=False)
+
+        assert [e["type"] for e in result.diff_entries] == ["warning"]
+        with zipfile.ZipFile(base_xlsx) as src, zipfile.ZipFile(out) as dst:
+            for info in src.infolist():
+                assert dst.read(info.filename) == src.read(info.filename)
+
+
+class TestPreviewPatch:
+    def test_matches_real_run_without_writing(self, base_xlsx, tmp_path):
+        wb = openpyxl.load_workbook(base_xlsx)
+        expected = apply_patch_to_sheet(wb["試験項目"], _patch())
+
+        before = set(tmp_path.iterdir())
+        assert preview_patch(base_xlsx, _patch()) == expected
+        assert set(tmp_path.iterdir()) == before
+
+    def test_cli_dry_run_writes_report_only(self, base_xlsx, tmp_path):
+        from app import cli_patcher
+        from app.patch_io import write_patch
+
+        write_patch(_patch(), tmp_path / "patch.yml")
+        cli_patcher.main([
+            "--base", str(base_xlsx), "--patch", str(tmp_path / "patch.yml"),
+            "--output", str(tmp_path / "out.xlsx"),
+            "--report", str(tmp_path / "diff.md"), "--dry-run",
+        ])
+
+        assert not (tmp_path / "out.xlsx").exists()
+        report = (tmp_path / "diff.md").read_text(encoding="utf-8")
+        assert "- Updates: 2" in report and "- Inserts: 2" in report
+        assert "`old` → `new C`" in report
+
+
+class TestSharedStrings:
+    def test_appends_new_strings_and_counts(self):
+        src = io.BytesIO(
+            b'<?xml version="1.0"?><sst xmlns="x" count="3" uniqueCount="2">'
+            b"<si><t>a</t></si><si><t>b</t></si></sst>"
+        )
+        strings = _SharedStrings(existing=2)
+        assert [strings.index(t) for t in ["new", " pad ", "new"]] == [2, 3, 2]
+
+        xml = b"".join(strings.rewrite(src)).decode()
+        assert 'count="6" uniqueCount="4"' in xml
+        assert xml.endswith(
+            '<si><t>b</t></si><si><t>new</t></si>'
+            '<si><t xml:space="preserve"> pad </t></si></sst>'
+        )